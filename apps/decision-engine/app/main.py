@@ -1,18 +1,62 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
-from pydantic import BaseModel
+import importlib
+import sys
+from pathlib import Path
+from typing import Any
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, Field
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.append(str(SRC_PATH))
+
+decision_framework = importlib.import_module("decision_framework")
+forecasting = importlib.import_module("forecasting")
 
 app = FastAPI(title="Decision Engine")
+engine = decision_framework.DecisionIntelligenceEngine()
+forecaster = forecasting.ForecastEngine()
 
 
 class ForecastRequest(BaseModel):
     sku: str
     demand: list[int]
+    horizon: int | None = Field(default=None, ge=1)
+
+
+class ForecastBatchRequest(BaseModel):
+    series: dict[str, list[float]]
+    horizon: int = Field(default=14, ge=1)
 
 
 @app.post("/forecast")
 async def forecast(payload: ForecastRequest):
-    horizon = len(payload.demand)
-    avg = sum(payload.demand) / max(horizon, 1)
-    return {"sku": payload.sku, "forecast": [avg] * horizon}
+    horizon = payload.horizon or len(payload.demand)
+    try:
+        values, method = forecaster.forecast(
+            payload.sku, payload.demand, horizon
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return {"sku": payload.sku, "forecast": values, "method": method}
+
+
+@app.post("/forecast/batch")
+async def forecast_batch(payload: ForecastBatchRequest):
+    return forecaster.forecast_batch(payload.series, payload.horizon).to_dict()
+
+
+class HygieneBatchRequest(BaseModel):
+    decisions: list[dict[str, Any]]
+
+
+@app.post("/hygiene/batch")
+async def hygiene_batch(payload: HygieneBatchRequest):
+    return engine.enforce_decision_hygiene_batch(payload.decisions).to_dict()
+
+
+@app.get("/baselines")
+async def baselines():
+    return {"modules": engine.module_baselines()}
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+BIASES = (
+    "overconfidence",
+    "limited_alternatives",
+    "missing_data",
+    "time_pressure",
+)
+BIAS_BITS = {name: 1 << bit for bit, name in enumerate(BIASES)}
+# Flagged in the missing-field mask, after a template's required fields,
+# when a row's stakes are not a number.
+STAKES_FIELD = "stakes"
+
+
+@dataclass(slots=True, frozen=True)
+class TemplateSpec:
+    """Precomputed, immutable artifacts of one decision template.
+
+    Static alternatives are shared by every decision routed here, so their
+    impacts are held as read-only mappings.
+    """
+
+    key: str
+    required_fields: Tuple[str, ...]
+    criteria: Tuple[Any, ...]
+    alternatives: Optional[Tuple[Any, ...]]
+
+    @classmethod
+    def from_template(cls, key: str, template: Any) -> "TemplateSpec":
+        static = not getattr(template, "dynamic_alternatives", False)
+        return cls(
+            key=key,
+            required_fields=tuple(template.required_fields()),
+            criteria=tuple(template.define_criteria({})),
+            alternatives=(
+                tuple(
+                    replace(
+                        alternative,
+                        impact=MappingProxyType(dict(alternative.impact)),
+                    )
+                    for alternative in template.extract_alternatives({})
+                )
+                if static
+                else None
+            ),
+        )
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """Field behind each missing-mask bit, in bit order."""
+
+        return self.required_fields + (STAKES_FIELD,)
+
+    def missing(self, mask: int) -> List[str]:
+        return [
+            name for bit, name in enumerate(self.fields) if mask >> bit & 1
+        ]
+
+
+@dataclass(slots=True)
+class BatchHygieneResult:
+    """Column-oriented screening results, one row per raw decision.
+
+    ``missing_mask`` bit ``j`` is set when the row lacks
+    ``templates[template[i]].fields[j]``: a required field, or for the last
+    bit stakes that are not a number (reported at the 0.5 default).
+    ``bias_mask`` uses the bit order of ``BIASES``.
+    """
+
+    templates: List[TemplateSpec]
+    template: np.ndarray
+    missing_mask: np.ndarray
+    bias_mask: np.ndarray
+    noise_score: np.ndarray
+    stakes: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.template.size)
+
+    @property
+    def complete(self) -> np.ndarray:
+        return self.missing_mask == 0
+
+    def missing_fields(self, row: int) -> List[str]:
+        spec = self.templates[int(self.template[row])]
+        return spec.missing(int(self.missing_mask[row]))
+
+    def biases(self, row: int) -> List[str]:
+        mask = int(self.bias_mask[row])
+        return [name for name in BIASES if mask & BIAS_BITS[name]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "templates": [
+                {
+                    "key": spec.key,
+                    "required_fields": spec.required_fields,
+                    "fields": spec.fields,
+                }
+                for spec in self.templates
+            ],
+            "biases": list(BIASES),
+            "template": self.template.tolist(),
+            "missing_mask": self.missing_mask.tolist(),
+            "bias_mask": self.bias_mask.tolist(),
+            "noise_score": self._rounded(self.noise_score),
+            "stakes": self._rounded(self.stakes),
+            "complete": int(self.complete.sum()),
+            "total": len(self),
+        }
+
+    @staticmethod
+    def _rounded(values: np.ndarray) -> List[float]:
+        return np.round(values.astype(np.float64), 4).tolist()
+
+
+class BatchHygieneScreen:
+    """Template routing, field checks, bias and noise scoring for a backlog.
+
+    Each raw dict is touched once to pull the handful of fields the checks
+    need into columns; bias flags, noise and stakes are then computed with
+    array operations, and missing required fields are packed per row into
+    an integer bitmask against the routed template.
+    """
+
+    def __init__(
+        self, specs: Mapping[str, TemplateSpec], default_key: str
+    ) -> None:
+        self.templates = list(specs.values())
+        self._positions = {
+            spec.key: position for position, spec in enumerate(self.templates)
+        }
+        self._default = self._positions[default_key]
+        self._fields = sorted(
+            {name for spec in self.templates for name in spec.required_fields}
+        )
+
+    def screen(
+        self, raw_decisions: Sequence[Mapping[str, Any]]
+    ) -> BatchHygieneResult:
+        count = len(raw_decisions)
+        positions, default = self._positions, self._default
+        template = np.fromiter(
+            (
+                positions.get(
+                    raw.get("template")
+                    or raw.get("type")
+                    or f"{raw.get('module', '')}_decision",
+                    default,
+                )
+                for raw in raw_decisions
+            ),
+            dtype=np.int16,
+            count=count,
+        )
+
+        present = {
+            name: np.fromiter(
+                (name in raw for raw in raw_decisions), dtype=bool, count=count
+            )
+            for name in self._fields
+        }
+        missing_mask = np.zeros(count, dtype=np.uint32)
+        for position, spec in enumerate(self.templates):
+            rows = template == position
+            if not rows.any():
+                continue
+            for bit, name in enumerate(spec.required_fields):
+                missing_mask |= (
+                    (rows & ~present[name]).astype(np.uint32) << bit
+                )
+
+        overconfident = np.fromiter(
+            (
+                raw.get("owner_sentiment") == "overconfident"
+                for raw in raw_decisions
+            ),
+            dtype=bool,
+            count=count,
+        )
+        alternatives = np.fromiter(
+            (len(raw.get("alternatives") or ()) for raw in raw_decisions),
+            dtype=np.int32,
+            count=count,
+        )
+        has_data = np.fromiter(
+            (bool(raw.get("data_sources")) for raw in raw_decisions),
+            dtype=bool,
+            count=count,
+        )
+        rushed = np.fromiter(
+            (bool(raw.get("rush")) for raw in raw_decisions),
+            dtype=bool,
+            count=count,
+        )
+        bias_mask = (
+            overconfident.astype(np.uint8) * BIAS_BITS["overconfidence"]
+            | (alternatives < 2).astype(np.uint8)
+            * BIAS_BITS["limited_alternatives"]
+            | (~has_data).astype(np.uint8) * BIAS_BITS["missing_data"]
+            | rushed.astype(np.uint8) * BIAS_BITS["time_pressure"]
+        )
+        bias_count = (
+            overconfident.astype(np.int8)
+            + (alternatives < 2)
+            + ~has_data
+            + rushed
+        )
+
+        noise_floor = np.fromiter(
+            (raw.get("noise_floor", 0.2) for raw in raw_decisions),
+            dtype=np.float64,
+            count=count,
+        )
+        noise = np.clip(noise_floor + 0.15 * bias_count, 0, 1)
+        stakes = np.fromiter(
+            (
+                _as_float(raw.get("stakes", raw.get("financial_impact", 0.5)))
+                for raw in raw_decisions
+            ),
+            dtype=np.float64,
+            count=count,
+        )
+        invalid = np.isnan(stakes)
+        if invalid.any():
+            stakes_bit = np.array(
+                [len(spec.required_fields) for spec in self.templates],
+                dtype=np.uint32,
+            )[template]
+            missing_mask |= invalid.astype(np.uint32) << stakes_bit
+            stakes[invalid] = 0.5
+        return BatchHygieneResult(
+            templates=self.templates,
+            template=template,
+            missing_mask=missing_mask,
+            bias_mask=bias_mask.astype(np.uint8),
+            noise_score=noise.astype(np.float32),
+            stakes=np.clip(stakes, 0, 1).astype(np.float32),
+        )
+
+
+def _as_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass(slots=True)
+class PortfolioSelection:
+    """Initiatives funded at one budget level."""
+
+    budget: float
+    selected: List[str]
+    cost: float
+    value: float
+    upper_bound: float
+    exact: bool
+
+    @property
+    def gap(self) -> float:
+        """Relative distance to the bound; 0 for exact solutions."""
+
+        if self.upper_bound <= 0:
+            return 0.0
+        return float(
+            max(0.0, (self.upper_bound - self.value) / self.upper_bound)
+        )
+
+    def to_impact(self) -> Dict[str, Any]:
+        return {
+            "spend": round(self.cost, 2),
+            "value": round(self.value, 2),
+            "initiatives": self.selected,
+            "upper_bound": round(self.upper_bound, 2),
+            "optimality_gap": round(self.gap, 4),
+        }
+
+
+@dataclass(slots=True)
+class Portfolio:
+    names: List[str]
+    costs: np.ndarray
+    values: np.ndarray
+    skipped: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_decision(
+        cls,
+        initiatives: Sequence[Mapping[str, Any]],
+        roi_models: Optional[Mapping[str, Any]] = None,
+    ) -> "Portfolio":
+        """Initiative cost plus value from its own ``value`` or ROI model.
+
+        A ``roi_models`` entry may be a number (ROI multiple on cost) or a
+        mapping with ``value`` or ``roi``. Initiatives without a positive
+        cost and value are skipped.
+        """
+
+        models = roi_models or {}
+        names: List[str] = []
+        costs: List[float] = []
+        values: List[float] = []
+        skipped: List[str] = []
+        for position, initiative in enumerate(initiatives):
+            name = str(
+                initiative.get("name", initiative.get("id", position))
+            )
+            cost = float(initiative.get("cost", 0) or 0)
+            value = initiative.get("value")
+            model = models.get(name)
+            if value is None and isinstance(model, Mapping):
+                value = model.get("value")
+                if value is None and model.get("roi") is not None:
+                    value = cost * float(model["roi"])
+            elif value is None and model is not None:
+                value = cost * float(model)
+            if value is None:
+                value = cost * float(initiative.get("roi", 0) or 0)
+            if cost <= 0 or float(value) <= 0:
+                skipped.append(name)
+                continue
+            names.append(name)
+            costs.append(cost)
+            values.append(float(value))
+        return cls(
+            names=names,
+            costs=np.array(costs, dtype=np.float64),
+            values=np.array(values, dtype=np.float64),
+            skipped=skipped,
+        )
+
+
+class BudgetOptimizer:
+    """0/1 knapsack over initiatives, solved per budget level.
+
+    When ``items * ceiling / cost_unit <= exact_cells`` a DP over costs in
+    whole ``cost_unit`` steps is exact, and one table yields every frontier
+    level. Otherwise two heuristics run and the better one wins per level:
+    the same DP over coarser steps (costs rounded up, so it stays
+    feasible) while at least ``min_resolution`` steps fit, and the greedy
+    ratio order, i.e. the funded prefix plus every later initiative that
+    still fits, checked against the best single initiative. The LP
+    (Dantzig) relaxation, which equals the Lagrangian dual bound for a
+    single budget constraint, bounds how far either can be from optimal.
+    """
+
+    def __init__(
+        self,
+        cost_unit: float = 1.0,
+        exact_cells: int = 4_000_000,
+        min_resolution: int = 200,
+        frontier_levels: Sequence[float] = (0.25, 0.5, 0.75, 1.0),
+    ) -> None:
+        self.cost_unit = cost_unit
+        self.exact_cells = exact_cells
+        self.min_resolution = min_resolution
+        self.frontier_levels = tuple(frontier_levels)
+
+    def optimize(
+        self, portfolio: Portfolio, budget: float
+    ) -> PortfolioSelection:
+        return self.frontier(portfolio, budget, (1.0,))[-1]
+
+    def frontier(
+        self,
+        portfolio: Portfolio,
+        ceiling: float,
+        levels: Optional[Sequence[float]] = None,
+    ) -> List[PortfolioSelection]:
+        """Best selection at each fraction of ``ceiling``, dominated dropped.
+
+        A level is kept only when it funds more value than every cheaper
+        level before it.
+        """
+
+        budgets = sorted(
+            ceiling * level for level in (levels or self.frontier_levels)
+        )
+        items = len(portfolio.names)
+        if not items or ceiling <= 0:
+            return [
+                PortfolioSelection(budget, [], 0.0, 0.0, 0.0, True)
+                for budget in budgets[-1:]
+            ]
+        steps = int(math.floor(ceiling / self.cost_unit + 1e-9))
+        if steps * items <= self.exact_cells:
+            points = self._dynamic(portfolio, self.cost_unit, steps, budgets)
+        else:
+            points = self._greedy(portfolio, budgets)
+            steps = self.exact_cells // items
+            if steps >= self.min_resolution:
+                coarse = self._dynamic(
+                    portfolio, ceiling / steps, steps, budgets
+                )
+                for level, candidate in enumerate(coarse):
+                    if candidate.value > points[level].value:
+                        candidate.upper_bound = points[level].upper_bound
+                        candidate.exact = False
+                        points[level] = candidate
+
+        frontier: List[PortfolioSelection] = []
+        for point in points:
+            if not frontier or point.value > frontier[-1].value:
+                frontier.append(point)
+        return frontier
+
+    def _dynamic(
+        self,
+        portfolio: Portfolio,
+        unit: float,
+        capacity: int,
+        budgets: List[float],
+    ) -> List[PortfolioSelection]:
+        weights = np.maximum(
+            np.ceil(portfolio.costs / unit - 1e-9), 1
+        ).astype(np.int64)
+        values = portfolio.values
+        best = np.zeros(capacity + 1)
+        taken = np.zeros((weights.size, capacity + 1), dtype=bool)
+        for item, (weight, value) in enumerate(zip(weights, values)):
+            if weight > capacity:
+                continue
+            candidate = best[:-weight] + value
+            target = best[weight:]
+            better = candidate > target
+            taken[item, weight:] = better
+            target[better] = candidate[better]
+
+        points = []
+        for budget in budgets:
+            room = min(capacity, int(math.floor(budget / unit + 1e-9)))
+            chosen: List[int] = []
+            for item in range(weights.size - 1, -1, -1):
+                if taken[item, room]:
+                    chosen.append(item)
+                    room -= int(weights[item])
+            chosen.reverse()
+            points.append(
+                self._selection(portfolio, budget, chosen, 0.0, True)
+            )
+        return points
+
+    def _greedy(
+        self, portfolio: Portfolio, budgets: List[float]
+    ) -> List[PortfolioSelection]:
+        costs, values = portfolio.costs, portfolio.values
+        order = np.argsort(-(values / costs), kind="stable")
+        sorted_costs = costs[order]
+        sorted_values = values[order]
+        spent = np.cumsum(sorted_costs)
+        earned = np.cumsum(sorted_values)
+
+        points = []
+        for budget in budgets:
+            split = int(np.searchsorted(spent, budget, side="right"))
+            prefix_cost = float(spent[split - 1]) if split else 0.0
+            prefix_value = float(earned[split - 1]) if split else 0.0
+            bound = prefix_value
+            if split < order.size:
+                bound += (
+                    (budget - prefix_cost)
+                    * sorted_values[split]
+                    / sorted_costs[split]
+                )
+
+            chosen = list(order[:split])
+            room = budget - prefix_cost
+            value = prefix_value
+            # Fill leftover room in ratio order; only items cheaper than the
+            # room can fit, so skip the rest without a Python-level check.
+            tail = np.flatnonzero(sorted_costs[split:] <= room) + split
+            for position in tail:
+                cost = sorted_costs[position]
+                if cost <= room:
+                    chosen.append(order[position])
+                    room -= cost
+                    value += sorted_values[position]
+
+            fits = costs <= budget
+            if fits.any():
+                single = int(np.argmax(np.where(fits, values, -np.inf)))
+                if values[single] > value:
+                    chosen, value = [single], float(values[single])
+            points.append(
+                self._selection(
+                    portfolio, budget, chosen, bound, False, value
+                )
+            )
+        return points
+
+    @staticmethod
+    def _selection(
+        portfolio: Portfolio,
+        budget: float,
+        chosen: Sequence[int],
+        bound: float,
+        exact: bool,
+        value: Optional[float] = None,
+    ) -> PortfolioSelection:
+        index = np.fromiter(chosen, dtype=np.int64, count=len(chosen))
+        total = float(portfolio.values[index].sum())
+        return PortfolioSelection(
+            budget=budget,
+            selected=[portfolio.names[i] for i in index],
+            cost=float(portfolio.costs[index].sum()),
+            value=total if value is None else float(value),
+            upper_bound=max(bound, total),
+            exact=exact,
+        )
+
+
+def frontier_alternatives(
+    optimizer: BudgetOptimizer, decision: Mapping[str, Any]
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """``(name, impact)`` pairs for the efficient frontier of a decision."""
+
+    initiatives = decision.get("initiatives")
+    ceiling = float(decision.get("budget_ceiling", 0) or 0)
+    if not isinstance(initiatives, Sequence) or ceiling <= 0:
+        return []
+    portfolio = Portfolio.from_decision(
+        [item for item in initiatives if isinstance(item, Mapping)],
+        decision.get("roi_models")
+        if isinstance(decision.get("roi_models"), Mapping)
+        else None,
+    )
+    return [
+        (
+            f"portfolio_{round(100 * point.budget / ceiling)}pct",
+            point.to_impact(),
+        )
+        for point in optimizer.frontier(portfolio, ceiling)
+        if point.selected
+    ]
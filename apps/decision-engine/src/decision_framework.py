@@ -1,23 +1,75 @@
 from __future__ import annotations
 
+import importlib
+import sys
 import uuid
-from dataclasses import dataclass
-from typing import Any, Dict, List
+from collections import deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
 
 import numpy as np
 
+SRC_PATH = Path(__file__).resolve().parent
+if str(SRC_PATH) not in sys.path:
+    sys.path.append(str(SRC_PATH))
 
-@dataclass(slots=True)
+decision_index_module = importlib.import_module("decision_index")
+DecisionIndex = decision_index_module.DecisionIndex
+RetentionPolicy = decision_index_module.RetentionPolicy
+
+decision_journal_module = importlib.import_module("decision_journal")
+DecisionJournal = decision_journal_module.DecisionJournal
+JournalRecord = decision_journal_module.JournalRecord
+
+decision_scoring_module = importlib.import_module("decision_scoring")
+Scorecard = decision_scoring_module.Scorecard
+ScoringEngine = decision_scoring_module.ScoringEngine
+
+batch_hygiene_module = importlib.import_module("batch_hygiene")
+BIASES = batch_hygiene_module.BIASES
+BatchHygieneResult = batch_hygiene_module.BatchHygieneResult
+BatchHygieneScreen = batch_hygiene_module.BatchHygieneScreen
+TemplateSpec = batch_hygiene_module.TemplateSpec
+
+decision_similarity_module = importlib.import_module("decision_similarity")
+DecisionEncoder = decision_similarity_module.DecisionEncoder
+SimilarityIndex = decision_similarity_module.SimilarityIndex
+
+budget_optimizer_module = importlib.import_module("budget_optimizer")
+BudgetOptimizer = budget_optimizer_module.BudgetOptimizer
+frontier_alternatives = budget_optimizer_module.frontier_alternatives
+
+supplier_evaluation_module = importlib.import_module("supplier_evaluation")
+SupplierEvaluator = supplier_evaluation_module.SupplierEvaluator
+SupplierTable = supplier_evaluation_module.SupplierTable
+
+noise_audit_module = importlib.import_module("noise_audit")
+JudgePanel = noise_audit_module.JudgePanel
+NoiseAuditResult = noise_audit_module.NoiseAuditResult
+NoiseAuditor = noise_audit_module.NoiseAuditor
+
+# Noise component each bias feeds when the template has been audited.
+BIAS_NOISE_COMPONENTS = {
+    "overconfidence": "level",
+    "limited_alternatives": "pattern",
+    "missing_data": "stable_pattern",
+    "time_pressure": "occasion",
+}
+
+
+@dataclass(slots=True, frozen=True)
 class Alternative:
     name: str
     impact: Dict[str, Any]
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class Criterion:
     name: str
     weight: float
     description: str
+    higher_is_better: bool = True
 
 
 @dataclass(slots=True)
@@ -36,6 +88,8 @@ class OonruDecision:
     alternatives: List[Alternative]
     criteria: List[Criterion]
     noise_factors: List[NoiseFactor]
+    scorecard: Optional[Scorecard] = None
+    template: str = ""
 
 
 class DecisionIncompleteError(Exception):
@@ -47,6 +101,10 @@ class DecisionIncompleteError(Exception):
 
 
 class BaseDecisionTemplate:
+    # Templates whose alternatives read the raw decision cannot share a
+    # precomputed alternatives tuple.
+    dynamic_alternatives = False
+
     def required_fields(self) -> List[str]:
         raise NotImplementedError
 
@@ -89,7 +147,7 @@ class QAApprovalTemplate(BaseDecisionTemplate):
     ) -> List[Criterion]:
         return [
             Criterion("safety", 0.4, "Food safety compliance"),
-            Criterion("cost", 0.2, "Scrap or rework cost"),
+            Criterion("cost", 0.2, "Scrap or rework cost", False),
             Criterion("service", 0.3, "Impact to OTIF"),
             Criterion("brand", 0.1, "Reputation risk"),
         ]
@@ -113,9 +171,9 @@ class InventoryTransferTemplate(BaseDecisionTemplate):
     ) -> List[Criterion]:
         return [
             Criterion("service", 0.4, "Fulfill downstream orders"),
-            Criterion("cost", 0.3, "Freight and handling"),
-            Criterion("shrink", 0.2, "Temperature risk"),
-            Criterion("labor", 0.1, "Warehouse strain"),
+            Criterion("cost", 0.3, "Freight and handling", False),
+            Criterion("shrink", 0.2, "Temperature risk", False),
+            Criterion("labor", 0.1, "Warehouse strain", False),
         ]
 
 
@@ -139,11 +197,16 @@ class ProductionScheduleTemplate(BaseDecisionTemplate):
             Criterion("service", 0.5, "Meet order promise"),
             Criterion("labor", 0.2, "Crew availability"),
             Criterion("yield", 0.2, "Golden batch adherence"),
-            Criterion("cost", 0.1, "Incremental spend"),
+            Criterion("cost", 0.1, "Incremental spend", False),
         ]
 
 
 class SupplierSelectionTemplate(BaseDecisionTemplate):
+    dynamic_alternatives = True
+
+    def __init__(self, evaluator: Optional[SupplierEvaluator] = None) -> None:
+        self.evaluator = evaluator or SupplierEvaluator()
+
     def required_fields(self) -> List[str]:
         return ["suppliers", "quality_scores", "commercial_terms"]
 
@@ -154,20 +217,41 @@ class SupplierSelectionTemplate(BaseDecisionTemplate):
             Alternative("incumbent", {"cost_index": 1.0}),
             Alternative("challenger", {"cost_index": 0.96}),
             Alternative("dual_source", {"resilience": "high"}),
+        ] + [
+            Alternative(name, impact)
+            for name, impact in self.evaluate(decision).alternatives()
         ]
 
+    def evaluate(self, decision: Dict[str, Any]) -> Any:
+        suppliers, scores, terms = (
+            decision.get("suppliers"),
+            decision.get("quality_scores"),
+            decision.get("commercial_terms"),
+        )
+        table = SupplierTable.from_decision(
+            suppliers if isinstance(suppliers, list) else [],
+            scores if isinstance(scores, dict) else {},
+            terms if isinstance(terms, dict) else {},
+        )
+        return self.evaluator.evaluate(table, self.define_criteria(decision))
+
     def define_criteria(
         self, decision: Dict[str, Any]
     ) -> List[Criterion]:
         return [
             Criterion("quality", 0.35, "FSMA + sensory scoring"),
-            Criterion("cost", 0.25, "Delivered cost"),
+            Criterion("cost", 0.25, "Delivered cost", False),
             Criterion("resilience", 0.25, "Multi-source coverage"),
             Criterion("sustainability", 0.15, "Scope 3 impact"),
         ]
 
 
 class BudgetAllocationTemplate(BaseDecisionTemplate):
+    dynamic_alternatives = True
+
+    def __init__(self, optimizer: Optional[BudgetOptimizer] = None) -> None:
+        self.optimizer = optimizer or BudgetOptimizer()
+
     def required_fields(self) -> List[str]:
         return ["budget_ceiling", "initiatives", "roi_models"]
 
@@ -187,6 +271,9 @@ class BudgetAllocationTemplate(BaseDecisionTemplate):
                 "focused",
                 {"spend": 0.65 * decision.get("budget_ceiling", 0)},
             ),
+        ] + [
+            Alternative(name, impact)
+            for name, impact in frontier_alternatives(self.optimizer, decision)
         ]
 
     def define_criteria(
@@ -201,6 +288,8 @@ class BudgetAllocationTemplate(BaseDecisionTemplate):
 
 
 class HiringDecisionTemplate(BaseDecisionTemplate):
+    dynamic_alternatives = True
+
     def required_fields(self) -> List[str]:
         return ["candidates", "scorecards", "headcount_plan"]
 
@@ -221,14 +310,19 @@ class HiringDecisionTemplate(BaseDecisionTemplate):
     ) -> List[Criterion]:
         return [
             Criterion("capability", 0.4, "Skill alignment"),
-            Criterion("cost", 0.2, "Cash impact"),
+            Criterion("cost", 0.2, "Cash impact", False),
             Criterion("speed", 0.2, "Ramp time"),
             Criterion("culture", 0.2, "Team fit"),
         ]
 
 
 class DecisionIntelligenceEngine:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        retention: Optional[RetentionPolicy] = None,
+        journal: Optional[DecisionJournal] = None,
+        similar_k: int = 25,
+    ) -> None:
         self.templates: Dict[str, BaseDecisionTemplate] = {
             "qa_approval": QAApprovalTemplate(),
             "inventory_transfer": InventoryTransferTemplate(),
@@ -237,28 +331,133 @@ class DecisionIntelligenceEngine:
             "budget_allocation": BudgetAllocationTemplate(),
             "hiring_decision": HiringDecisionTemplate(),
         }
-        self.history: List[OonruDecision] = []
-        self.review_flags: List[Dict[str, Any]] = []
+        self.default_template_key = "qa_approval"
+        self.template_specs: Dict[str, TemplateSpec] = {
+            key: TemplateSpec.from_template(key, template)
+            for key, template in self.templates.items()
+        }
+        self.hygiene_screen = BatchHygieneScreen(
+            self.template_specs, self.default_template_key
+        )
+        self.retention = retention or RetentionPolicy()
+        self.index = DecisionIndex(self.retention)
+        self.history: Deque[OonruDecision] = deque(
+            maxlen=self.retention.max_history
+        )
+        self.review_flags: Deque[Dict[str, Any]] = deque(
+            maxlen=self.retention.max_history
+        )
+        self.scoring = ScoringEngine()
+        self.similar_k = similar_k
+        self.noise_auditor = NoiseAuditor()
+        self.noise_audits: Dict[str, NoiseAuditResult] = {}
+        self.encoder = DecisionEncoder(list(self.templates), BIASES)
+        self.similarity = SimilarityIndex(
+            self.encoder.dims, capacity=self.retention.max_history
+        )
+        self.journal = journal
+        if journal is not None:
+            self.restore_from_journal()
+
+    def restore_from_journal(self) -> int:
+        """Rebuild history, flags and module baselines from the journal."""
+
+        state = self.journal.replay()
+        for module, baseline in state.modules.items():
+            self.index.restore(
+                module,
+                baseline.count,
+                baseline.mean,
+                baseline.m2,
+                baseline.recent,
+            )
+        for record in state.history:
+            decision = self.decision_from_record(record)
+            self.history.append(decision)
+            self.similarity.append(self.encoder.encode(decision), decision)
+        self.review_flags.extend(record.detail for record in state.flags)
+        return state.records_scanned
+
+    @staticmethod
+    def decision_from_record(record: JournalRecord) -> OonruDecision:
+        detail = record.detail
+        return OonruDecision(
+            id=record.record_id,
+            module=record.module,
+            title=detail.get("title", "Untitled Decision"),
+            stakes=record.stakes,
+            alternatives=[
+                Alternative(**item) for item in detail.get("alternatives", [])
+            ],
+            criteria=[
+                Criterion(**item) for item in detail.get("criteria", [])
+            ],
+            noise_factors=[
+                NoiseFactor(**item)
+                for item in detail.get("noise_factors", [])
+            ],
+            template=detail.get("template", ""),
+        )
 
     def enforce_decision_hygiene(
         self, raw_decision: Dict[str, Any]
     ) -> OonruDecision:
-        template = self.select_template(raw_decision)
-        missing = template.check_requirements(raw_decision)
+        key = self.template_key(raw_decision)
+        template = self.templates.get(key)
+        if template is None:
+            key = self.default_template_key
+            template = self.templates[key]
+        spec = self.template_specs[key]
+        missing = [
+            req for req in spec.required_fields if req not in raw_decision
+        ]
         if missing:
             raise DecisionIncompleteError(missing)
         biases = self.detect_biases(raw_decision)
         self.calculate_noise_score(raw_decision, biases)
+        if spec.alternatives is None:
+            alternatives = template.extract_alternatives(raw_decision)
+        else:
+            alternatives = [
+                Alternative(alternative.name, dict(alternative.impact))
+                for alternative in spec.alternatives
+            ]
+        criteria = list(spec.criteria)
         decision = OonruDecision(
             id=self.generate_id(),
             module=raw_decision.get("module", "unknown"),
             title=raw_decision.get("title", "Untitled Decision"),
             stakes=self.calculate_stakes(raw_decision),
-            alternatives=template.extract_alternatives(raw_decision),
-            criteria=template.define_criteria(raw_decision),
-            noise_factors=self.identify_noise_factors(biases),
+            alternatives=alternatives,
+            criteria=criteria,
+            noise_factors=self.identify_noise_factors(biases, key),
+            scorecard=(
+                self.scoring.score(
+                    alternatives, criteria, raw_decision["scores"]
+                )
+                if raw_decision.get("scores")
+                else None
+            ),
+            template=key,
         )
         self.history.append(decision)
+        self.index.add(decision)
+        self.similarity.append(self.encoder.encode(decision), decision)
+        if self.journal is not None:
+            self.journal.append_decision(
+                decision.id,
+                decision.module,
+                decision.stakes,
+                {
+                    "title": decision.title,
+                    "template": decision.template,
+                    "alternatives": [asdict(a) for a in decision.alternatives],
+                    "criteria": [asdict(c) for c in decision.criteria],
+                    "noise_factors": [
+                        asdict(n) for n in decision.noise_factors
+                    ],
+                },
+            )
         return decision
 
     def cross_module_consistency(self, decision: OonruDecision) -> float:
@@ -268,15 +467,32 @@ class DecisionIntelligenceEngine:
             self.flag_for_review(decision, similar)
         return consistency
 
-    def select_template(
-        self, raw_decision: Dict[str, Any]
-    ) -> BaseDecisionTemplate:
-        key = (
+    def enforce_decision_hygiene_batch(
+        self, raw_decisions: List[Dict[str, Any]]
+    ) -> BatchHygieneResult:
+        """Screen a backlog without building or recording decisions.
+
+        Routing, required fields, biases, noise and stakes follow
+        ``enforce_decision_hygiene``; incomplete rows are reported in the
+        missing-field bitmask instead of raising.
+        """
+
+        return self.hygiene_screen.screen(raw_decisions)
+
+    def template_key(self, raw_decision: Dict[str, Any]) -> str:
+        return (
             raw_decision.get("template")
             or raw_decision.get("type")
             or f"{raw_decision.get('module', '')}_decision"
         )
-        return self.templates.get(key, QAApprovalTemplate())
+
+    def select_template(
+        self, raw_decision: Dict[str, Any]
+    ) -> BaseDecisionTemplate:
+        return self.templates.get(
+            self.template_key(raw_decision),
+            self.templates[self.default_template_key],
+        )
 
     def detect_biases(self, raw_decision: Dict[str, Any]) -> List[str]:
         biases: List[str] = []
@@ -300,15 +516,40 @@ class DecisionIntelligenceEngine:
         raw_decision["noise_score"] = score
         return float(score)
 
-    def identify_noise_factors(self, biases: List[str]) -> List[NoiseFactor]:
+    def run_noise_audit(
+        self,
+        template_key: str,
+        panel: JudgePanel,
+        cases: Optional[int] = None,
+    ) -> NoiseAuditResult:
+        """Audit a template with a judge panel; later severities use it."""
+
+        result = self.noise_auditor.audit(
+            self.template_specs[template_key], panel, cases
+        )
+        self.noise_audits[template_key] = result
+        return result
+
+    def identify_noise_factors(
+        self, biases: List[str], template_key: Optional[str] = None
+    ) -> List[NoiseFactor]:
         mapping = {
             "overconfidence": "historical success bias",
             "limited_alternatives": "insufficient exploration",
             "missing_data": "data gaps",
             "time_pressure": "deadline stress",
         }
+        audit = self.noise_audits.get(template_key)
         return [
-            NoiseFactor(bias, min(1.0, 0.3 + idx * 0.2), mapping[bias])
+            NoiseFactor(
+                bias,
+                (
+                    audit.severity(BIAS_NOISE_COMPONENTS[bias])
+                    if audit is not None
+                    else min(1.0, 0.3 + idx * 0.2)
+                ),
+                mapping[bias],
+            )
             for idx, bias in enumerate(biases)
         ]
 
@@ -319,32 +560,43 @@ class DecisionIntelligenceEngine:
         return float(np.clip(stakes, 0, 1))
 
     def find_similar_decisions(
-        self, decision: OonruDecision
+        self, decision: OonruDecision, k: Optional[int] = None
     ) -> List[OonruDecision]:
-        return [
-            hist for hist in self.history if hist.module == decision.module
-        ]
+        """The ``k`` nearest retained decisions by feature, across modules."""
+
+        k = self.similar_k if k is None else k
+        matches = self.similarity.search(self.encoder.encode(decision), k + 1)
+        return [peer for peer, _ in matches if peer.id != decision.id][:k]
 
     def calculate_consistency(
         self, decision: OonruDecision, similar: List[OonruDecision]
     ) -> float:
+        """How closely stakes agree with structurally similar decisions."""
+
         if not similar:
             return 1.0
         diffs = [abs(decision.stakes - peer.stakes) for peer in similar]
         mean_diff = np.mean(diffs)
         return float(np.clip(1 - mean_diff, 0, 1))
 
+    def module_baselines(self) -> List[Dict[str, Any]]:
+        """Stakes baseline of every module the engine has seen."""
+
+        return self.index.baselines()
+
     def flag_for_review(
         self, decision: OonruDecision, similar: List[OonruDecision]
     ) -> None:
-        self.review_flags.append(
-            {
-                "decision_id": decision.id,
-                "module": decision.module,
-                "reason": "Low cross-module consistency",
-                "comparison_sample": [peer.id for peer in similar],
-            }
-        )
+        flag = {
+            "decision_id": decision.id,
+            "module": decision.module,
+            "reason": "Low cross-module consistency",
+            "comparison_sample": [peer.id for peer in similar],
+            "module_baseline": self.index.baseline(decision.module),
+        }
+        self.review_flags.append(flag)
+        if self.journal is not None:
+            self.journal.append_flag(flag)
 
     def generate_id(self) -> str:
         return uuid.uuid4().hex
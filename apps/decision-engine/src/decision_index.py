@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass(slots=True, frozen=True)
+class RetentionPolicy:
+    """How much decision history the engine keeps in memory."""
+
+    max_history: int = 10_000
+    sample_size: int = 256
+
+    def __post_init__(self) -> None:
+        if self.max_history < 1 or self.sample_size < 1:
+            raise ValueError("Retention limits must be positive")
+
+
+@dataclass(slots=True)
+class ModuleStats:
+    module: str
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "module": self.module,
+            "count": self.count,
+            "mean_stakes": round(self.mean, 4),
+            "std_stakes": round(self.std, 4),
+        }
+
+
+@dataclass(slots=True)
+class _ModuleSlot:
+    stats: ModuleStats
+    stakes: np.ndarray
+    cursor: int = 0
+    filled: int = 0
+
+
+class DecisionIndex:
+    """Per-module stakes baselines: lifetime and recent.
+
+    Welford running mean/variance cover every decision a module has seen;
+    the last ``sample_size`` stakes sit in a fixed ring, so a baseline
+    report shows how recent decisions drift from the module's history
+    without its cost growing with that history.
+    """
+
+    def __init__(self, retention: Optional[RetentionPolicy] = None) -> None:
+        self.retention = retention or RetentionPolicy()
+        self._modules: Dict[str, _ModuleSlot] = {}
+
+    def __contains__(self, module: str) -> bool:
+        return module in self._modules
+
+    def modules(self) -> List[str]:
+        return list(self._modules)
+
+    def add(self, decision: Any) -> None:
+        slot = self._modules.get(decision.module)
+        if slot is None:
+            size = self.retention.sample_size
+            slot = _ModuleSlot(
+                stats=ModuleStats(decision.module), stakes=np.zeros(size)
+            )
+            self._modules[decision.module] = slot
+
+        stats = slot.stats
+        stats.count += 1
+        delta = decision.stakes - stats.mean
+        stats.mean += delta / stats.count
+        stats.m2 += delta * (decision.stakes - stats.mean)
+
+        slot.stakes[slot.cursor] = decision.stakes
+        slot.cursor = (slot.cursor + 1) % slot.stakes.size
+        slot.filled = min(slot.filled + 1, slot.stakes.size)
+
+    def restore(
+        self,
+        module: str,
+        count: int,
+        mean: float,
+        m2: float,
+        recent: Sequence[float],
+    ) -> None:
+        """Seed a module from persisted statistics and its recent stakes."""
+
+        size = self.retention.sample_size
+        tail = list(recent)[-size:]
+        slot = _ModuleSlot(
+            stats=ModuleStats(module, count, mean, m2), stakes=np.zeros(size)
+        )
+        slot.stakes[: len(tail)] = tail
+        slot.filled = len(tail)
+        slot.cursor = len(tail) % size
+        self._modules[module] = slot
+
+    def stats(self, module: str) -> Optional[ModuleStats]:
+        slot = self._modules.get(module)
+        return slot.stats if slot is not None else None
+
+    def baseline(self, module: str) -> Optional[Dict[str, Any]]:
+        """Lifetime stats plus the recent sample's mean and its drift.
+
+        ``drift`` is the recent mean's distance from the lifetime mean in
+        lifetime standard deviations (0 while the spread is unknown).
+        """
+
+        slot = self._modules.get(module)
+        if slot is None:
+            return None
+        stats = slot.stats
+        recent = (
+            float(slot.stakes[: slot.filled].mean())
+            if slot.filled
+            else stats.mean
+        )
+        std = stats.std
+        report = stats.to_dict()
+        report["recent_count"] = slot.filled
+        report["recent_mean_stakes"] = round(recent, 4)
+        report["drift"] = round((recent - stats.mean) / std, 4) if std else 0.0
+        return report
+
+    def baselines(self) -> List[Dict[str, Any]]:
+        return [self.baseline(module) for module in self._modules]
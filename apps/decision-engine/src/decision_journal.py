@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Tuple, Union
+
+# Frame: payload length, CRC32 of payload. Payload core: record kind,
+# stakes, module length, id length; then module, id and a JSON detail blob.
+FRAME = struct.Struct("<II")
+CORE = struct.Struct("<BdHH")
+
+DECISION = 1
+FLAG = 2
+# Detail holds baselines and retained offsets; replaces all state before it.
+SNAPSHOT = 3
+
+
+@dataclass(slots=True)
+class JournalRecord:
+    kind: int
+    record_id: str
+    module: str
+    stakes: float
+    detail: Dict[str, Any]
+
+
+@dataclass(slots=True)
+class ModuleBaseline:
+    """Stakes statistics plus the stakes of the module's recent sample."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    recent: Deque[float] = field(default_factory=deque)
+
+
+@dataclass(slots=True)
+class ReplayState:
+    modules: Dict[str, ModuleBaseline]
+    history: List[JournalRecord]
+    flags: List[JournalRecord]
+    records_scanned: int
+    elapsed_ms: float
+
+
+class DecisionJournal:
+    """Append-only, length-prefixed binary log of decisions and review flags.
+
+    Appends go through a buffered file and are fsynced in batches
+    (``fsync_every`` records or ``fsync_interval`` seconds). Every
+    ``snapshot_every`` records the log is compacted: the retained history
+    and flag records are copied to a new file followed by a snapshot
+    record of the module baselines and their new offsets, which then
+    atomically replaces the log. The log therefore stays bounded by
+    retention plus ``snapshot_every`` records, and so does startup. Replay
+    walks an mmap of the log reading just the fixed core of each record;
+    JSON detail is decoded once, only for the records the engine keeps.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_history: int = 10_000,
+        sample_size: int = 256,
+        fsync_every: int = 64,
+        fsync_interval: float = 1.0,
+        snapshot_every: int = 50_000,
+    ) -> None:
+        self.path = Path(path)
+        self.max_history = max_history
+        self.sample_size = sample_size
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+        self._baselines: Dict[str, ModuleBaseline] = {}
+        self._history: Deque[int] = deque(maxlen=max_history)
+        self._flags: Deque[int] = deque(maxlen=max_history)
+        self._unsynced = 0
+        self._since_snapshot = 0
+        self._last_sync = time.monotonic()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab")
+
+    # ----------------------------------------------------------------- writes
+    def append_decision(
+        self,
+        record_id: str,
+        module: str,
+        stakes: float,
+        detail: Dict[str, Any],
+    ) -> int:
+        offset = self._write(DECISION, record_id, module, stakes, detail)
+        self._observe(module, stakes)
+        self._history.append(offset)
+        self._after_append()
+        return offset
+
+    def append_flag(self, flag: Dict[str, Any]) -> int:
+        offset = self._write(
+            FLAG,
+            str(flag.get("decision_id", "")),
+            str(flag.get("module", "")),
+            0.0,
+            flag,
+        )
+        self._flags.append(offset)
+        self._after_append()
+        return offset
+
+    def sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def snapshot(self) -> None:
+        """Compact the log to retained records plus a snapshot record."""
+
+        self._file.flush()
+        retained = sorted(set(self._history) | set(self._flags))
+        moved: Dict[int, int] = {}
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(self.path, "rb") as source, open(tmp, "wb") as target:
+            for offset in retained:
+                source.seek(offset)
+                header = source.read(FRAME.size)
+                length, _ = FRAME.unpack(header)
+                moved[offset] = target.tell()
+                target.write(header)
+                target.write(source.read(length))
+            self._history = deque(
+                (moved[at] for at in self._history), maxlen=self.max_history
+            )
+            self._flags = deque(
+                (moved[at] for at in self._flags), maxlen=self.max_history
+            )
+            state = {
+                "modules": {
+                    module: {
+                        "count": base.count,
+                        "mean": base.mean,
+                        "m2": base.m2,
+                        "recent": list(base.recent),
+                    }
+                    for module, base in self._baselines.items()
+                },
+                "history": list(self._history),
+                "flags": list(self._flags),
+            }
+            target.write(self._encode(SNAPSHOT, "", "", 0.0, state))
+            target.flush()
+            os.fsync(target.fileno())
+        self._file.close()
+        os.replace(tmp, self.path)
+        self._sync_directory()
+        self._file = open(self.path, "ab")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._since_snapshot = 0
+
+    def _write(
+        self,
+        kind: int,
+        record_id: str,
+        module: str,
+        stakes: float,
+        detail: Dict[str, Any],
+    ) -> int:
+        offset = self._file.tell()
+        self._file.write(
+            self._encode(kind, record_id, module, stakes, detail)
+        )
+        return offset
+
+    @staticmethod
+    def _encode(
+        kind: int,
+        record_id: str,
+        module: str,
+        stakes: float,
+        detail: Dict[str, Any],
+    ) -> bytes:
+        module_raw = module.encode()
+        id_raw = record_id.encode()
+        blob = json.dumps(detail, separators=(",", ":"), default=str).encode()
+        payload = b"".join(
+            (
+                CORE.pack(kind, stakes, len(module_raw), len(id_raw)),
+                module_raw,
+                id_raw,
+                blob,
+            )
+        )
+        return FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+    def _sync_directory(self) -> None:
+        try:
+            handle = os.open(self.path.parent, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(handle)
+        finally:
+            os.close(handle)
+
+    def _baseline(self, module: str) -> ModuleBaseline:
+        base = self._baselines.get(module)
+        if base is None:
+            base = ModuleBaseline(recent=deque(maxlen=self.sample_size))
+            self._baselines[module] = base
+        return base
+
+    def _observe(self, module: str, stakes: float) -> None:
+        base = self._baseline(module)
+        base.count += 1
+        delta = stakes - base.mean
+        base.mean += delta / base.count
+        base.m2 += delta * (stakes - base.mean)
+        base.recent.append(stakes)
+
+    def _after_append(self) -> None:
+        self._unsynced += 1
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+        elif (
+            self._unsynced >= self.fsync_every
+            or time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self.sync()
+
+    # ----------------------------------------------------------------- replay
+    def replay(self) -> ReplayState:
+        """Rebuild baselines from the log; truncate torn writes."""
+
+        started = time.perf_counter()
+        self._file.flush()
+        self._baselines = {}
+        self._history = deque(maxlen=self.max_history)
+        self._flags = deque(maxlen=self.max_history)
+        size = self.path.stat().st_size
+        if not size:
+            return ReplayState({}, [], [], 0, 0.0)
+        with open(self.path, "rb") as handle, mmap.mmap(
+            handle.fileno(), 0, access=mmap.ACCESS_READ
+        ) as view:
+            end, scanned = self._scan(view, 0, size)
+            history = [self._decode(view, at) for at in self._history]
+            flags = [self._decode(view, at) for at in self._flags]
+        if end < size:
+            self._file.close()
+            with open(self.path, "r+b") as handle:
+                handle.truncate(end)
+            self._file = open(self.path, "ab")
+        return ReplayState(
+            modules=dict(self._baselines),
+            history=history,
+            flags=flags,
+            records_scanned=scanned,
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+
+    def _restore_snapshot(self, state: Dict[str, Any]) -> None:
+        self._baselines.clear()
+        for module, values in state["modules"].items():
+            self._baselines[module] = ModuleBaseline(
+                count=values["count"],
+                mean=values["mean"],
+                m2=values["m2"],
+                recent=deque(values["recent"], maxlen=self.sample_size),
+            )
+        self._history.clear()
+        self._history.extend(state["history"])
+        self._flags.clear()
+        self._flags.extend(state["flags"])
+
+    def _scan(
+        self, view: mmap.mmap, position: int, size: int
+    ) -> Tuple[int, int]:
+        frame_size = FRAME.size
+        core_size = CORE.size
+        unpack_frame = FRAME.unpack_from
+        unpack_core = CORE.unpack_from
+        crc32 = zlib.crc32
+        buffer = memoryview(view)
+        baselines: Dict[bytes, ModuleBaseline] = {}
+        history_append = self._history.append
+        flags_append = self._flags.append
+        scanned = 0
+        try:
+            while position + frame_size <= size:
+                length, checksum = unpack_frame(buffer, position)
+                body = position + frame_size
+                end = body + length
+                if end > size or crc32(buffer[body:end]) != checksum:
+                    break
+                kind, stakes, module_len, _ = unpack_core(buffer, body)
+                if kind == DECISION:
+                    start = body + core_size
+                    raw = bytes(buffer[start:start + module_len])
+                    base = baselines.get(raw)
+                    if base is None:
+                        base = self._baseline(raw.decode())
+                        baselines[raw] = base
+                    # Welford update, inlined: this loop runs per record.
+                    base.count += 1
+                    delta = stakes - base.mean
+                    base.mean += delta / base.count
+                    base.m2 += delta * (stakes - base.mean)
+                    base.recent.append(stakes)
+                    history_append(position)
+                elif kind == SNAPSHOT:
+                    baselines.clear()
+                    self._restore_snapshot(self._decode(view, position).detail)
+                else:
+                    flags_append(position)
+                position = end
+                scanned += 1
+        finally:
+            buffer.release()
+        return position, scanned
+
+    @staticmethod
+    def _decode(data: Any, offset: int) -> JournalRecord:
+        length, _ = FRAME.unpack_from(data, offset)
+        body = offset + FRAME.size
+        kind, stakes, module_len, id_len = CORE.unpack_from(data, body)
+        cursor = body + CORE.size
+        module = data[cursor:cursor + module_len].decode()
+        cursor += module_len
+        record_id = data[cursor:cursor + id_len].decode()
+        cursor += id_len
+        detail = json.loads(data[cursor:body + length])
+        return JournalRecord(kind, record_id, module, stakes, detail)
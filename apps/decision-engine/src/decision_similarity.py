@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import zlib
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+class DecisionEncoder:
+    """Maps a decision to a fixed-length float32 feature vector.
+
+    Layout: one severity slot per known noise label, a template one-hot
+    (last slot for unknown templates), then a hashed signature of criterion
+    names (weighted) and alternative names (averaged). Names are hashed
+    with CRC32 so vectors are stable across processes. Stakes are left out
+    on purpose: consistency compares stakes across neighbours, so they must
+    not also decide who the neighbours are.
+    """
+
+    def __init__(
+        self,
+        template_keys: Sequence[str],
+        noise_labels: Sequence[str],
+        signature_dims: int = 16,
+        noise_weight: float = 0.5,
+        template_weight: float = 1.0,
+        signature_weight: float = 0.5,
+    ) -> None:
+        self.template_keys = list(template_keys)
+        self.noise_labels = list(noise_labels)
+        self.signature_dims = signature_dims
+        self._templates = {key: i for i, key in enumerate(self.template_keys)}
+        self._noise = {label: i for i, label in enumerate(self.noise_labels)}
+        self._noise_at = 0
+        self._template_at = self._noise_at + len(self.noise_labels)
+        self._signature_at = self._template_at + len(self.template_keys) + 1
+        self.dims = self._signature_at + signature_dims
+        self.noise_weight = noise_weight
+        self.template_weight = template_weight
+        self.signature_weight = signature_weight
+        self._buckets: Dict[str, int] = {}
+
+    def encode(self, decision: Any) -> np.ndarray:
+        vector = np.zeros(self.dims, dtype=np.float32)
+        for factor in decision.noise_factors:
+            slot = self._noise.get(factor.label)
+            if slot is not None:
+                vector[self._noise_at + slot] = (
+                    self.noise_weight * factor.severity
+                )
+        template = self._templates.get(
+            getattr(decision, "template", ""), len(self.template_keys)
+        )
+        vector[self._template_at + template] = self.template_weight
+
+        signature = vector[self._signature_at:]
+        for criterion in decision.criteria:
+            signature[self._bucket(criterion.name)] += criterion.weight
+        if decision.alternatives:
+            share = 1.0 / len(decision.alternatives)
+            for alternative in decision.alternatives:
+                signature[self._bucket(alternative.name)] += share
+        norm = float(np.linalg.norm(signature))
+        if norm:
+            signature *= self.signature_weight / norm
+        return vector
+
+    def _bucket(self, name: str) -> int:
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = zlib.crc32(name.encode()) % self.signature_dims
+            self._buckets[name] = bucket
+        return bucket
+
+
+class SimilarityIndex:
+    """Exact k-nearest-neighbour search over a contiguous float32 matrix.
+
+    Rows are appended into a preallocated matrix that grows by doubling up
+    to ``capacity`` and then overwrites the oldest row, so memory follows
+    the engine's retention. Squared row norms are kept alongside; a query
+    scans ``block_rows`` rows at a time with one matrix-vector product and
+    an ``argpartition`` per block, merging per-block candidates at the end.
+    """
+
+    def __init__(
+        self,
+        dims: int,
+        capacity: int = 10_000,
+        block_rows: int = 16_384,
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("Similarity index capacity must be positive")
+        self.dims = dims
+        self.capacity = capacity
+        self.block_rows = block_rows
+        initial = min(capacity, 1024)
+        self._vectors = np.zeros((initial, dims), dtype=np.float32)
+        self._norms = np.zeros(initial, dtype=np.float32)
+        self._items: List[Any] = [None] * initial
+        self._cursor = 0
+        self._filled = 0
+
+    def __len__(self) -> int:
+        return self._filled
+
+    def append(self, vector: np.ndarray, item: Any) -> int:
+        if self._filled == self._vectors.shape[0] < self.capacity:
+            self._grow(min(self.capacity, self._filled * 2))
+        slot = self._cursor
+        self._vectors[slot] = vector
+        self._norms[slot] = float(np.dot(vector, vector))
+        self._items[slot] = item
+        self._cursor = (slot + 1) % self.capacity
+        self._filled = min(self._filled + 1, self.capacity)
+        return slot
+
+    def search(
+        self, vector: np.ndarray, k: int
+    ) -> List[Tuple[Any, float]]:
+        """The ``k`` nearest stored items with their Euclidean distances."""
+
+        filled = self._filled
+        if not filled or k < 1:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        query_norm = float(np.dot(query, query))
+        candidates: List[np.ndarray] = []
+        distances: List[np.ndarray] = []
+        for start in range(0, filled, self.block_rows):
+            stop = min(start + self.block_rows, filled)
+            block = self._norms[start:stop] - 2 * (
+                self._vectors[start:stop] @ query
+            )
+            if block.size > k:
+                top = np.argpartition(block, k - 1)[:k]
+            else:
+                top = np.arange(block.size)
+            candidates.append(top + start)
+            distances.append(block[top])
+        slots = np.concatenate(candidates)
+        squared = np.concatenate(distances) + query_norm
+        order = np.argsort(squared, kind="stable")[:k]
+        return [
+            (
+                self._items[int(slots[i])],
+                float(np.sqrt(max(float(squared[i]), 0.0))),
+            )
+            for i in order
+        ]
+
+    def _grow(self, rows: int) -> None:
+        vectors = np.zeros((rows, self.dims), dtype=np.float32)
+        vectors[: self._filled] = self._vectors[: self._filled]
+        norms = np.zeros(rows, dtype=np.float32)
+        norms[: self._filled] = self._norms[: self._filled]
+        self._vectors = vectors
+        self._norms = norms
+        self._items.extend([None] * (rows - len(self._items)))
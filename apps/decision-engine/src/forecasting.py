@@ -0,0 +1,466 @@
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+SES_ALPHAS = (0.1, 0.2, 0.3, 0.5, 0.8)
+HOLT_GRID = tuple(
+    (alpha, beta) for alpha in (0.2, 0.5, 0.8) for beta in (0.05, 0.2)
+)
+HOLT_WINTERS_GRID = tuple(
+    (alpha, beta, gamma)
+    for alpha in (0.2, 0.5)
+    for beta in (0.05, 0.2)
+    for gamma in (0.1, 0.3)
+)
+CROSTON_ALPHAS = (0.1, 0.2, 0.3)
+
+
+def _digest(values: np.ndarray) -> bytes:
+    return hashlib.blake2b(values.tobytes(), digest_size=16).digest()
+
+
+@dataclass(slots=True)
+class SkuState:
+    """Fitted recurrence state for one SKU, advanced in place on updates.
+
+    ``season`` is indexed by ``t % len(season)`` with ``t`` counted from
+    the first observation; ``since`` counts periods since the last
+    non-zero demand (Croston).
+    """
+
+    method: str
+    params: Tuple[float, ...]
+    level: float
+    trend: float
+    season: np.ndarray
+    interval: float
+    since: int
+    observed: int
+    digest: bytes
+    holdout_mae: float
+    updates: int = 0
+
+    def forecast(self, horizon: int) -> np.ndarray:
+        steps = np.arange(1, horizon + 1)
+        if self.method == "holt":
+            return self.level + steps * self.trend
+        if self.method == "holt_winters":
+            phase = (self.observed + steps - 1) % self.season.size
+            return self.level + steps * self.trend + self.season[phase]
+        if self.method == "croston":
+            rate = self.level / self.interval if self.interval else 0.0
+            return np.full(horizon, rate)
+        return np.full(horizon, self.level)
+
+    def update(self, values: np.ndarray) -> None:
+        for value in values.tolist():
+            if self.method == "ses":
+                alpha = self.params[0]
+                self.level = alpha * value + (1 - alpha) * self.level
+            elif self.method == "holt":
+                alpha, beta = self.params
+                level = alpha * value + (1 - alpha) * (self.level + self.trend)
+                self.trend = beta * (level - self.level) + (
+                    1 - beta
+                ) * self.trend
+                self.level = level
+            elif self.method == "holt_winters":
+                alpha, beta, gamma = self.params
+                phase = self.observed % self.season.size
+                level = alpha * (value - self.season[phase]) + (1 - alpha) * (
+                    self.level + self.trend
+                )
+                self.trend = beta * (level - self.level) + (
+                    1 - beta
+                ) * self.trend
+                self.season[phase] = gamma * (value - level) + (
+                    1 - gamma
+                ) * self.season[phase]
+                self.level = level
+            elif self.method == "croston":
+                alpha = self.params[0]
+                if value > 0:
+                    self.level = alpha * value + (1 - alpha) * self.level
+                    self.interval = alpha * self.since + (
+                        1 - alpha
+                    ) * self.interval
+                    self.since = 1
+                else:
+                    self.since += 1
+            else:
+                self.level += (value - self.level) / (self.observed + 1)
+            self.observed += 1
+        self.updates += len(values)
+
+
+@dataclass(slots=True)
+class BatchForecast:
+    skus: List[str]
+    forecasts: np.ndarray
+    methods: List[str]
+    refitted: int
+    updated: int
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "forecasts": {
+                sku: self.forecasts[row].round(4).tolist()
+                for row, sku in enumerate(self.skus)
+            },
+            "methods": dict(zip(self.skus, self.methods)),
+            "refitted": self.refitted,
+            "updated": self.updated,
+        }
+
+
+class ForecastEngine:
+    """Per-SKU method selection over SES, Holt, Holt-Winters and Croston.
+
+    Histories of equal length are stacked into a SKU x time matrix and
+    every method runs as one recurrence over time for all SKUs and all
+    parameter candidates at once. The last ``holdout`` periods pick each
+    SKU's method and parameters by mean absolute error; the winner is then
+    refit on the full history. Fitted state is cached per SKU, so a later
+    request whose history extends the cached one only advances the
+    recurrence over the new periods (a full refit happens after
+    ``refit_every`` such updates). Histories too short to hold out get a
+    provisional mean that is refit as soon as the history grows.
+    """
+
+    def __init__(
+        self,
+        season_length: int = 7,
+        holdout: Optional[int] = None,
+        refit_every: int = 28,
+        max_cached: int = 100_000,
+    ) -> None:
+        self.season_length = season_length
+        self.holdout = holdout
+        self.refit_every = refit_every
+        self.max_cached = max_cached
+        self._states: "OrderedDict[str, SkuState]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def state(self, sku: str) -> Optional[SkuState]:
+        return self._states.get(sku)
+
+    def forecast(
+        self, sku: str, history: Sequence[float], horizon: int
+    ) -> Tuple[List[float], str]:
+        batch = self.forecast_batch({sku: history}, horizon)
+        return batch.forecasts[0].tolist(), batch.methods[0]
+
+    def forecast_batch(
+        self, series: Mapping[str, Sequence[float]], horizon: int
+    ) -> BatchForecast:
+        if horizon < 1:
+            raise ValueError("horizon must be at least 1")
+        skus = list(series)
+        forecasts = np.zeros((len(skus), horizon))
+        methods: List[str] = [""] * len(skus)
+        pending: Dict[int, List[int]] = {}
+        histories: List[np.ndarray] = []
+        updated = 0
+
+        for row, sku in enumerate(skus):
+            history = np.asarray(series[sku], dtype=np.float64)
+            histories.append(history)
+            state = self._states.get(sku)
+            if state is not None and self._extends(state, history):
+                state.update(history[state.observed:])
+                state.digest = _digest(history)
+                self._states.move_to_end(sku)
+                forecasts[row] = state.forecast(horizon)
+                methods[row] = state.method
+                updated += 1
+            else:
+                pending.setdefault(history.size, []).append(row)
+
+        for length, rows in pending.items():
+            matrix = np.vstack([histories[row] for row in rows]).reshape(
+                len(rows), length
+            )
+            for row, state in zip(rows, self.fit(matrix)):
+                self._remember(skus[row], state)
+                forecasts[row] = state.forecast(horizon)
+                methods[row] = state.method
+        return BatchForecast(
+            skus=skus,
+            forecasts=forecasts,
+            methods=methods,
+            refitted=sum(len(rows) for rows in pending.values()),
+            updated=updated,
+        )
+
+    def fit(self, matrix: np.ndarray) -> List[SkuState]:
+        """Select and fit a method per row of a SKU x time matrix."""
+
+        count, length = matrix.shape
+        holdout = self.holdout or max(1, length // 5)
+        train = length - holdout
+        if train < 2:
+            return [self._mean_state(row) for row in matrix]
+
+        candidates = self._candidates(train)
+        total = sum(len(grid) for _, grid in candidates)
+        errors = np.full((total, count), np.inf)
+        actual = matrix[:, train:]
+        start = 0
+        for method, grid in candidates:
+            predicted = self._run(method, grid, matrix[:, :train], holdout)
+            errors[start:start + len(grid)] = np.abs(
+                predicted - actual
+            ).mean(axis=2)
+            start += len(grid)
+        best = errors.argmin(axis=0)
+        best_error = errors[best, np.arange(count)]
+
+        states: Dict[int, SkuState] = {}
+        start = 0
+        for method, grid in candidates:
+            stop = start + len(grid)
+            chosen = np.flatnonzero((best >= start) & (best < stop))
+            if chosen.size:
+                fitted = self._states_for(
+                    method, grid, matrix[chosen], best[chosen] - start
+                )
+                for row, state in zip(chosen.tolist(), fitted):
+                    state.holdout_mae = float(best_error[row])
+                    states[row] = state
+            start = stop
+        return [states[row] for row in range(count)]
+
+    # ------------------------------------------------------------ internals
+    def _candidates(
+        self, train: int
+    ) -> List[Tuple[str, Tuple[Tuple[float, ...], ...]]]:
+        candidates = [
+            ("ses", tuple((alpha,) for alpha in SES_ALPHAS)),
+            ("holt", HOLT_GRID),
+            ("croston", tuple((alpha,) for alpha in CROSTON_ALPHAS)),
+        ]
+        if train >= 2 * self.season_length:
+            candidates.append(("holt_winters", HOLT_WINTERS_GRID))
+        return candidates
+
+    def _run(
+        self,
+        method: str,
+        grid: Sequence[Tuple[float, ...]],
+        matrix: np.ndarray,
+        horizon: int,
+    ) -> np.ndarray:
+        """Forecasts of shape ``(len(grid), skus, horizon)``."""
+
+        params = np.array(grid, dtype=np.float64)
+        if method == "ses":
+            level = self._ses(matrix, params[:, 0])
+            return np.repeat(level[:, :, None], horizon, axis=2)
+        if method == "croston":
+            size, interval, _ = self._croston(matrix, params[:, 0])
+            rate = np.divide(
+                size, interval, out=np.zeros_like(size), where=interval > 0
+            )
+            return np.repeat(rate[:, :, None], horizon, axis=2)
+        steps = np.arange(1, horizon + 1)
+        if method == "holt":
+            level, trend = self._holt(matrix, params)
+            return level[:, :, None] + trend[:, :, None] * steps
+        level, trend, season = self._holt_winters(matrix, params)
+        phase = (matrix.shape[1] + steps - 1) % self.season_length
+        return (
+            level[:, :, None]
+            + trend[:, :, None] * steps
+            + season[:, :, phase]
+        )
+
+    def _states_for(
+        self,
+        method: str,
+        grid: Sequence[Tuple[float, ...]],
+        matrix: np.ndarray,
+        picks: np.ndarray,
+    ) -> List[SkuState]:
+        # Refit only the chosen parameter set per row on the full history.
+        params = np.array(grid, dtype=np.float64)[picks]
+        rows = np.arange(matrix.shape[0])
+        length = matrix.shape[1]
+        empty = np.zeros(0)
+        if method == "ses":
+            level = self._ses_rows(matrix, params[:, 0])
+            values = [(level[i], 0.0, empty, 0.0, 0) for i in rows]
+        elif method == "croston":
+            size, interval, since = self._croston_rows(matrix, params[:, 0])
+            values = [
+                (size[i], 0.0, empty, interval[i], int(since[i]))
+                for i in rows
+            ]
+        elif method == "holt":
+            level, trend = self._holt_rows(matrix, params)
+            values = [(level[i], trend[i], empty, 0.0, 0) for i in rows]
+        else:
+            level, trend, season = self._holt_winters_rows(matrix, params)
+            values = [
+                (level[i], trend[i], season[i].copy(), 0.0, 0) for i in rows
+            ]
+        return [
+            SkuState(
+                method=method,
+                params=tuple(params[i].tolist()),
+                level=float(level_),
+                trend=float(trend_),
+                season=season_,
+                interval=float(interval_),
+                since=since_,
+                observed=length,
+                digest=_digest(matrix[i]),
+                holdout_mae=0.0,
+            )
+            for i, (level_, trend_, season_, interval_, since_) in zip(
+                rows, values
+            )
+        ]
+
+    # Each recurrence has a ``_rows`` form taking one parameter set per row
+    # and a grid form that broadcasts the matrix over every candidate.
+    @classmethod
+    def _ses(cls, matrix: np.ndarray, alphas: np.ndarray) -> np.ndarray:
+        return cls._ses_rows(
+            np.broadcast_to(matrix, (alphas.size,) + matrix.shape),
+            alphas[:, None],
+        )
+
+    @staticmethod
+    def _ses_rows(matrix: np.ndarray, alphas: np.ndarray) -> np.ndarray:
+        level = matrix[..., 0].copy()
+        for t in range(1, matrix.shape[-1]):
+            level += alphas * (matrix[..., t] - level)
+        return level
+
+    @classmethod
+    def _croston(
+        cls, matrix: np.ndarray, alphas: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return cls._croston_rows(
+            np.broadcast_to(matrix, (alphas.size,) + matrix.shape),
+            alphas[:, None],
+        )
+
+    @staticmethod
+    def _croston_rows(
+        matrix: np.ndarray, alphas: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Initialise on the mean non-zero demand and mean demand interval.
+        positive = matrix > 0
+        hits = positive.sum(axis=-1)
+        size = np.divide(
+            np.where(positive, matrix, 0).sum(axis=-1),
+            hits,
+            out=np.zeros(matrix.shape[:-1]),
+            where=hits > 0,
+        )
+        interval = np.divide(
+            float(matrix.shape[-1]),
+            hits,
+            out=np.ones(matrix.shape[:-1]),
+            where=hits > 0,
+        )
+        since = np.ones(matrix.shape[:-1])
+        for t in range(matrix.shape[-1]):
+            demand = matrix[..., t]
+            hit = demand > 0
+            size = np.where(hit, size + alphas * (demand - size), size)
+            interval = np.where(
+                hit, interval + alphas * (since - interval), interval
+            )
+            since = np.where(hit, 1.0, since + 1)
+        return size, interval, since
+
+    @classmethod
+    def _holt(
+        cls, matrix: np.ndarray, params: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        return cls._holt_rows(
+            np.broadcast_to(matrix, (params.shape[0],) + matrix.shape),
+            params[:, None, :],
+        )
+
+    @staticmethod
+    def _holt_rows(
+        matrix: np.ndarray, params: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        alpha, beta = params[..., 0], params[..., 1]
+        level = matrix[..., 0].copy()
+        trend = matrix[..., 1] - matrix[..., 0]
+        for t in range(1, matrix.shape[-1]):
+            previous = level
+            level = alpha * matrix[..., t] + (1 - alpha) * (previous + trend)
+            trend = beta * (level - previous) + (1 - beta) * trend
+        return level, trend
+
+    def _holt_winters(
+        self, matrix: np.ndarray, params: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self._holt_winters_rows(
+            np.broadcast_to(matrix, (params.shape[0],) + matrix.shape),
+            params[:, None, :],
+        )
+
+    def _holt_winters_rows(
+        self, matrix: np.ndarray, params: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        m = self.season_length
+        alpha, beta, gamma = (params[..., i] for i in range(3))
+        first = matrix[..., :m].mean(axis=-1)
+        second = matrix[..., m:2 * m].mean(axis=-1)
+        level = first.copy()
+        trend = (second - first) / m
+        season = matrix[..., :m] - first[..., None]
+        for t in range(m, matrix.shape[-1]):
+            phase = t % m
+            value = matrix[..., t]
+            previous = level
+            level = alpha * (value - season[..., phase]) + (1 - alpha) * (
+                previous + trend
+            )
+            trend = beta * (level - previous) + (1 - beta) * trend
+            season[..., phase] = gamma * (value - level) + (
+                1 - gamma
+            ) * season[..., phase]
+        return level, trend, season
+
+    def _mean_state(self, history: np.ndarray) -> SkuState:
+        return SkuState(
+            method="mean",
+            params=(),
+            level=float(history.mean()) if history.size else 0.0,
+            trend=0.0,
+            season=np.zeros(0),
+            interval=0.0,
+            since=0,
+            observed=int(history.size),
+            digest=_digest(history),
+            holdout_mae=float("nan"),
+        )
+
+    def _extends(self, state: SkuState, history: np.ndarray) -> bool:
+        return (
+            state.method != "mean"
+            and history.size >= state.observed
+            and state.updates + history.size - state.observed
+            <= self.refit_every
+            and _digest(history[: state.observed]) == state.digest
+        )
+
+    def _remember(self, sku: str, state: SkuState) -> None:
+        self._states[sku] = state
+        self._states.move_to_end(sku)
+        while len(self._states) > self.max_cached:
+            self._states.popitem(last=False)
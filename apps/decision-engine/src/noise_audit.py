@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+COMPONENTS = ("level", "pattern", "stable_pattern", "occasion", "system")
+
+
+@dataclass(slots=True, frozen=True)
+class JudgeProfile:
+    """How one judge departs from the template's weighting.
+
+    ``level`` is a constant offset on every judgement, ``pattern`` the
+    standard deviation of the judge's personal criterion-weight deviations
+    and ``occasion`` the standard deviation of transient noise per
+    judgement.
+    """
+
+    level: float = 0.0
+    pattern: float = 0.0
+    occasion: float = 0.0
+
+
+@dataclass(slots=True)
+class JudgePanel:
+    level: np.ndarray
+    pattern: np.ndarray
+    occasion: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.level.size)
+
+    @classmethod
+    def from_profiles(cls, profiles: Sequence[JudgeProfile]) -> "JudgePanel":
+        return cls(
+            level=np.array([p.level for p in profiles], dtype=np.float32),
+            pattern=np.array([p.pattern for p in profiles], dtype=np.float32),
+            occasion=np.array(
+                [p.occasion for p in profiles], dtype=np.float32
+            ),
+        )
+
+    @classmethod
+    def sample(
+        cls,
+        judges: int,
+        level_sd: float = 0.05,
+        pattern_sd: float = 0.1,
+        occasion_sd: float = 0.03,
+        seed: int = 0,
+    ) -> "JudgePanel":
+        """Normal levels; exponential pattern and occasion spreads."""
+
+        rng = np.random.default_rng(seed)
+        return cls(
+            level=(rng.standard_normal(judges) * level_sd).astype(np.float32),
+            pattern=rng.exponential(pattern_sd, judges).astype(np.float32),
+            occasion=rng.exponential(occasion_sd, judges).astype(np.float32),
+        )
+
+
+@dataclass(slots=True)
+class NoiseAuditResult:
+    """Noise components as standard deviations on the judgement scale.
+
+    ``system**2 == level**2 + pattern**2`` and ``pattern**2 ==
+    stable_pattern**2 + occasion**2``; ``signal`` is the spread of the
+    true case values the judges were asked to score.
+    """
+
+    template: str
+    judges: int
+    cases: int
+    signal: float
+    level: float
+    pattern: float
+    stable_pattern: float
+    occasion: float
+    system: float
+
+    def share(self, component: str) -> float:
+        """Variance share of ``level``, ``stable_pattern`` or ``occasion``."""
+
+        total = self.level**2 + self.stable_pattern**2 + self.occasion**2
+        return getattr(self, component) ** 2 / total if total else 0.0
+
+    def severity(self, component: str) -> float:
+        """Noise-to-signal ratio of ``component``, capped at 1."""
+
+        if not self.signal:
+            return 1.0
+        return float(min(1.0, getattr(self, component) / self.signal))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "template": self.template,
+            "judges": self.judges,
+            "cases": self.cases,
+            "signal": round(self.signal, 5),
+            **{name: round(getattr(self, name), 5) for name in COMPONENTS},
+            "shares": {
+                name: round(self.share(name), 4)
+                for name in ("level", "stable_pattern", "occasion")
+            },
+        }
+
+
+class NoiseAuditor:
+    """Simulated noise audit of a decision template.
+
+    Each synthetic case draws a score in ``[0, 1]`` per template criterion;
+    its true value is the template-weighted sum. Judge ``j`` scores case
+    ``i`` as the true value plus its level, plus the case scores weighted
+    by the judge's own weight deviations (pattern, applied to the scores
+    centred on 0.5 so it does not leak into level), plus transient noise
+    (occasion). Every case is judged on two occasions, which is what lets
+    the audit separate stable pattern noise from occasion noise.
+    """
+
+    def __init__(self, cases: int = 10_000, seed: int = 0) -> None:
+        self.cases = cases
+        self.seed = seed
+
+    def audit(
+        self,
+        template: Any,
+        panel: JudgePanel,
+        cases: Optional[int] = None,
+    ) -> NoiseAuditResult:
+        cases = self.cases if cases is None else cases
+        judges = len(panel)
+        if judges < 2 or cases < 2:
+            raise ValueError("A noise audit needs at least 2 judges and cases")
+        weights = np.array(
+            [criterion.weight for criterion in template.criteria],
+            dtype=np.float32,
+        )
+        rng = np.random.default_rng(self.seed)
+        scores = rng.random((cases, weights.size), dtype=np.float32)
+        truth = scores @ weights
+        deviations = (
+            rng.standard_normal((weights.size, judges), dtype=np.float32)
+            * panel.pattern
+        )
+
+        # Stable part of every judgement: truth + level + pattern. Pattern
+        # acts on centred scores so it carries no per-judge mean shift.
+        stable = (scores - np.float32(0.5)) @ deviations
+        stable += truth[:, None]
+        stable += panel.level
+        first = rng.standard_normal((cases, judges), dtype=np.float32)
+        first *= panel.occasion
+        first += stable
+        second = rng.standard_normal((cases, judges), dtype=np.float32)
+        second *= panel.occasion
+        second += stable
+        del stable
+
+        second -= first
+        occasion_var = float(np.square(second).mean(dtype=np.float64)) / 2
+        del second
+
+        judge_means = first.mean(axis=0, dtype=np.float64)
+        case_means = first.mean(axis=1, dtype=np.float64)
+        grand = float(judge_means.mean())
+        level_var = float(judge_means.var())
+        first -= judge_means.astype(np.float32)
+        first -= case_means.astype(np.float32)[:, None]
+        first += np.float32(grand)
+        pattern_var = float(np.square(first).mean(dtype=np.float64))
+
+        return NoiseAuditResult(
+            template=getattr(template, "key", ""),
+            judges=judges,
+            cases=cases,
+            signal=float(truth.std(dtype=np.float64)),
+            level=math.sqrt(level_var),
+            pattern=math.sqrt(pattern_var),
+            stable_pattern=math.sqrt(max(pattern_var - occasion_var, 0.0)),
+            occasion=math.sqrt(occasion_var),
+            system=math.sqrt(level_var + pattern_var),
+        )
@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Column order of the supplier matrix; every column is "higher is better".
+OBJECTIVES = ("quality", "cost", "resilience", "sustainability")
+QUALITY, COST, RESILIENCE, SUSTAINABILITY = range(len(OBJECTIVES))
+
+
+def _number(value: Any, *keys: str) -> Optional[float]:
+    if isinstance(value, Mapping):
+        for key in keys:
+            if value.get(key) is not None:
+                return float(value[key])
+        return None
+    return None if value is None else float(value)
+
+
+@dataclass(slots=True)
+class SupplierTable:
+    """Suppliers as rows of raw objective values (cost kept positive)."""
+
+    ids: List[str]
+    quality: np.ndarray
+    cost: np.ndarray
+    resilience: np.ndarray
+    sustainability: np.ndarray
+    regions: np.ndarray
+    skipped: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_decision(
+        cls,
+        suppliers: Sequence[Any],
+        quality_scores: Optional[Mapping[str, Any]] = None,
+        commercial_terms: Optional[Mapping[str, Any]] = None,
+    ) -> "SupplierTable":
+        """Join the three decision inputs on supplier id.
+
+        ``suppliers`` holds ids or dicts (``id``/``name``, optional
+        ``resilience``, ``sustainability``, ``region``). Quality comes from
+        ``quality_scores`` or the supplier's ``quality``; cost from
+        ``commercial_terms`` (a number or a mapping with ``unit_cost``,
+        ``cost_index`` or ``price``) or the supplier's ``cost``. Suppliers
+        without both are skipped.
+        """
+
+        scores = quality_scores or {}
+        terms = commercial_terms or {}
+        rows: List[Tuple[str, float, float, float, float, str]] = []
+        skipped: List[str] = []
+        for supplier in suppliers:
+            if isinstance(supplier, Mapping):
+                info = supplier
+                supplier_id = str(info.get("id", info.get("name", "")))
+            else:
+                info = {}
+                supplier_id = str(supplier)
+            quality = _number(
+                scores.get(supplier_id, info.get("quality")), "score"
+            )
+            cost = _number(
+                terms.get(supplier_id, info.get("cost")),
+                "unit_cost",
+                "cost_index",
+                "price",
+            )
+            if quality is None or cost is None:
+                skipped.append(supplier_id)
+                continue
+            rows.append(
+                (
+                    supplier_id,
+                    quality,
+                    cost,
+                    float(info.get("resilience", 0.5)),
+                    float(info.get("sustainability", 0.5)),
+                    str(info.get("region", "")),
+                )
+            )
+        ids, quality, cost, resilience, sustainability, regions = (
+            zip(*rows) if rows else ((),) * 6
+        )
+        return cls(
+            ids=list(ids),
+            quality=np.array(quality, dtype=np.float64),
+            cost=np.array(cost, dtype=np.float64),
+            resilience=np.clip(np.array(resilience, dtype=np.float64), 0, 1),
+            sustainability=np.array(sustainability, dtype=np.float64),
+            regions=np.array(regions, dtype=object),
+            skipped=skipped,
+        )
+
+    def objectives(self) -> np.ndarray:
+        return np.column_stack(
+            (self.quality, -self.cost, self.resilience, self.sustainability)
+        )
+
+
+@dataclass(slots=True)
+class RankedSupplier:
+    supplier_id: str
+    score: float
+    quality: float
+    cost: float
+    resilience: float
+    sustainability: float
+
+
+@dataclass(slots=True)
+class SupplierPair:
+    primary: str
+    secondary: str
+    score: float
+    resilience: float
+
+
+@dataclass(slots=True)
+class SupplierEvaluation:
+    front: List[RankedSupplier]
+    pairs: List[SupplierPair]
+    evaluated: int
+    skipped: List[str]
+    pairs_scored: int
+
+    def alternatives(self, top: int = 3) -> List[Tuple[str, Dict[str, Any]]]:
+        """``(name, impact)`` pairs for the best front suppliers and pair."""
+
+        items: List[Tuple[str, Dict[str, Any]]] = [
+            (
+                f"supplier:{ranked.supplier_id}",
+                {
+                    "score": round(ranked.score, 4),
+                    "cost": ranked.cost,
+                    "quality": ranked.quality,
+                    "pareto": True,
+                },
+            )
+            for ranked in self.front[:top]
+        ]
+        if self.pairs:
+            best = self.pairs[0]
+            items.append(
+                (
+                    f"dual_source:{best.primary}+{best.secondary}",
+                    {
+                        "score": round(best.score, 4),
+                        "resilience": round(best.resilience, 4),
+                    },
+                )
+            )
+        return items
+
+
+def pareto_front(matrix: np.ndarray) -> np.ndarray:
+    """Indices of non-dominated rows (maximising every column).
+
+    Rows are visited in descending row-sum order. A row can only be
+    dominated by one with a strictly larger sum, i.e. one already visited,
+    and by transitivity by one already on the front, so each row is
+    checked against the current front only.
+    """
+
+    order = np.argsort(-matrix.sum(axis=1), kind="stable")
+    front = np.empty_like(matrix)
+    members = np.empty(matrix.shape[0], dtype=np.int64)
+    size = 0
+    for row in order:
+        candidate = matrix[row]
+        current = front[:size]
+        if size and np.any(
+            np.all(current >= candidate, axis=1)
+            & np.any(current > candidate, axis=1)
+        ):
+            continue
+        front[size] = candidate
+        members[size] = row
+        size += 1
+    return np.sort(members[:size])
+
+
+class SupplierEvaluator:
+    """Pareto front, weighted ranking and dual-source search for suppliers.
+
+    Quality, cost and sustainability are min-max normalised across the
+    evaluated suppliers; resilience is read as the probability the
+    supplier can deliver and stays on its raw ``[0, 1]`` scale. A
+    dual-source pair splits volume evenly, so its score is half of each
+    supplier's non-resilience score plus the weighted pair resilience,
+    ``1 - (1 - r_a)(1 - r_b)`` across regions and ``max(r_a, r_b)`` within
+    one. Since pair resilience is at most 1, pairs are scanned in order of
+    their separable part and whole ranges are pruned once
+    ``b_a + b_b + w_resilience`` cannot beat the current ``top_pairs``-th
+    best.
+    """
+
+    def __init__(self, top_pairs: int = 10) -> None:
+        self.top_pairs = top_pairs
+
+    def evaluate(
+        self, table: SupplierTable, criteria: Sequence[Any]
+    ) -> SupplierEvaluation:
+        weights = self.weights(criteria)
+        if not len(table):
+            return SupplierEvaluation([], [], 0, table.skipped, 0)
+        normalised = self.normalize(table.objectives())
+        normalised[:, RESILIENCE] = table.resilience
+        scores = normalised @ weights
+
+        front = pareto_front(table.objectives())
+        front = front[np.argsort(-scores[front], kind="stable")]
+        ranked = [
+            RankedSupplier(
+                supplier_id=table.ids[i],
+                score=float(scores[i]),
+                quality=float(table.quality[i]),
+                cost=float(table.cost[i]),
+                resilience=float(table.resilience[i]),
+                sustainability=float(table.sustainability[i]),
+            )
+            for i in front
+        ]
+        pairs, scored = self._pairs(table, normalised, weights)
+        return SupplierEvaluation(
+            front=ranked,
+            pairs=pairs,
+            evaluated=len(table),
+            skipped=table.skipped,
+            pairs_scored=scored,
+        )
+
+    @staticmethod
+    def weights(criteria: Sequence[Any]) -> np.ndarray:
+        by_name = {criterion.name: criterion.weight for criterion in criteria}
+        weights = np.array(
+            [by_name.get(name, 0.0) for name in OBJECTIVES], dtype=np.float64
+        )
+        total = weights.sum()
+        if total <= 0:
+            raise ValueError("Supplier evaluation needs positive weights")
+        return weights / total
+
+    @staticmethod
+    def normalize(matrix: np.ndarray) -> np.ndarray:
+        low = matrix.min(axis=0)
+        span = matrix.max(axis=0) - low
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(span > 0, (matrix - low) / span, 1.0)
+
+    def _pairs(
+        self,
+        table: SupplierTable,
+        normalised: np.ndarray,
+        weights: np.ndarray,
+    ) -> Tuple[List[SupplierPair], int]:
+        count = len(table)
+        if count < 2 or self.top_pairs < 1:
+            return [], 0
+        separable = weights.copy()
+        separable[RESILIENCE] = 0.0
+        half = (normalised @ separable) / 2
+        order = np.argsort(-half, kind="stable")
+        half = half[order]
+        resilience = table.resilience[order]
+        _, regions = np.unique(table.regions[order], return_inverse=True)
+        bonus = weights[RESILIENCE]
+
+        best: List[Tuple[float, int, int, float]] = []
+        threshold = -np.inf
+        scored = 0
+        # ``half`` is descending, so -half is ascending for searchsorted.
+        descending = -half
+        for a in range(count - 1):
+            if half[a] + half[a + 1] + bonus <= threshold:
+                break
+            stop = count
+            if np.isfinite(threshold):
+                floor = threshold - half[a] - bonus
+                stop = int(
+                    np.searchsorted(descending, -floor, side="left")
+                )
+            if stop <= a + 1:
+                continue
+            others = slice(a + 1, stop)
+            joint = np.where(
+                regions[others] == regions[a],
+                np.maximum(resilience[others], resilience[a]),
+                1 - (1 - resilience[others]) * (1 - resilience[a]),
+            )
+            pair_scores = half[a] + half[others] + bonus * joint
+            scored += pair_scores.size
+            keep = min(self.top_pairs, pair_scores.size)
+            top = np.argpartition(-pair_scores, keep - 1)[:keep]
+            for offset in top:
+                entry = (
+                    float(pair_scores[offset]),
+                    a,
+                    a + 1 + int(offset),
+                    float(joint[offset]),
+                )
+                if len(best) < self.top_pairs:
+                    heapq.heappush(best, entry)
+                elif entry[0] > best[0][0]:
+                    heapq.heapreplace(best, entry)
+            if len(best) == self.top_pairs:
+                threshold = best[0][0]
+
+        pairs = [
+            SupplierPair(
+                primary=table.ids[order[a]],
+                secondary=table.ids[order[b]],
+                score=score,
+                resilience=joint,
+            )
+            for score, a, b, joint in sorted(best, reverse=True)
+        ]
+        return pairs, scored
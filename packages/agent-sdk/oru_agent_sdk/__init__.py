@@ -1 +1,14 @@
 from .agent import BaseAgent, AgentContext  # noqa: F401
+from .genealogy import (  # noqa: F401
+    GenealogyTrace,
+    LotGenealogy,
+    shared_lot_genealogy,
+)
+from .supplier_quality import (  # noqa: F401
+    DEFAULT_PASS_RATE,
+    OUTCOME_STREAM,
+    SharedSupplierQualityIndex,
+    SupplierQualityIndex,
+    default_supplier_index,
+    test_outcome,
+)
@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+NODE_KINDS = ("lot", "shipment")
+EDGE_KINDS = ("consumed", "shipped")
+
+
+@dataclass(slots=True)
+class GenealogyTrace:
+    """Every node reached from ``origin``, with its hop distance."""
+
+    origin: str
+    direction: str
+    nodes: List[str]
+    kinds: List[str]
+    depth: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def lots(self) -> List[str]:
+        return [n for n, k in zip(self.nodes, self.kinds) if k == "lot"]
+
+    def shipments(self) -> List[str]:
+        return [
+            n for n, k in zip(self.nodes, self.kinds) if k == "shipment"
+        ]
+
+
+@dataclass(slots=True)
+class _CSR:
+    indptr: np.ndarray
+    indices: np.ndarray
+    kinds: np.ndarray
+
+
+class LotGenealogy:
+    """Lot-to-lot and lot-to-shipment links for recall tracing.
+
+    Lots and shipments get dense integer ids. Edges point the way material
+    flows (input lot -> produced lot, lot -> shipment) and are appended to
+    flat integer buffers; forward and reverse CSR layouts are rebuilt from
+    them lazily. Small deltas since the last build are served from an
+    overlay instead, so appends stay O(1) and traces do not wait on a
+    rebuild. Traces are level-synchronous BFS over whole frontiers.
+    """
+
+    def __init__(self, rebuild_ratio: float = 0.05, min_rebuild: int = 4096):
+        self.rebuild_ratio = rebuild_ratio
+        self.min_rebuild = min_rebuild
+        self._ids: Dict[str, int] = {}
+        self._labels: List[str] = []
+        self._node_kinds = array("b")
+        self._src = array("q")
+        self._dst = array("q")
+        self._edge_kinds = array("b")
+        self._built_edges = 0
+        self._forward: Optional[_CSR] = None
+        self._reverse: Optional[_CSR] = None
+        self._overlay: Optional[
+            Tuple[Dict[int, List[int]], Dict[int, List[int]]]
+        ] = None
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __contains__(self, node: str) -> bool:
+        return node in self._ids
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._src)
+
+    def node_id(self, node: str, kind: str = "lot") -> int:
+        """Dense id for ``node``, registering it on first sight."""
+
+        found = self._ids.get(node)
+        if found is not None:
+            return found
+        found = len(self._labels)
+        self._ids[node] = found
+        self._labels.append(node)
+        self._node_kinds.append(NODE_KINDS.index(kind))
+        return found
+
+    def record_consumption(self, input_lot: str, output_lot: str) -> None:
+        """``input_lot`` was consumed to make ``output_lot``."""
+
+        self._append(
+            self.node_id(input_lot), self.node_id(output_lot), "consumed"
+        )
+
+    def record_bom_consumption(
+        self, output_lot: str, input_lots: Iterable[str]
+    ) -> None:
+        target = self.node_id(output_lot)
+        for lot in input_lots:
+            self._append(self.node_id(lot), target, "consumed")
+
+    def record_shipment(self, lot: str, shipment: str) -> None:
+        self._append(
+            self.node_id(lot), self.node_id(shipment, "shipment"), "shipped"
+        )
+
+    def add_edges(
+        self,
+        sources: Iterable[str],
+        targets: Iterable[str],
+        kind: str = "consumed",
+    ) -> None:
+        """Bulk append, e.g. when loading history from the ERP."""
+
+        target_kind = "shipment" if kind == "shipped" else "lot"
+        code = EDGE_KINDS.index(kind)
+        for source, target in zip(sources, targets):
+            self._src.append(self.node_id(source))
+            self._dst.append(self.node_id(target, target_kind))
+            self._edge_kinds.append(code)
+        self._overlay = None
+
+    def forward(
+        self, lot: str, max_depth: Optional[int] = None
+    ) -> GenealogyTrace:
+        """Where did ``lot`` go: downstream lots and shipments."""
+
+        return self._trace(lot, "forward", max_depth)
+
+    def backward(
+        self, lot: str, max_depth: Optional[int] = None
+    ) -> GenealogyTrace:
+        """What went into ``lot``: every upstream input lot."""
+
+        return self._trace(lot, "backward", max_depth)
+
+    def compact(self) -> None:
+        """Fold all appended edges into the CSR layouts now."""
+
+        n_nodes = len(self._labels)
+        start = self._built_edges if self._forward is not None else 0
+        src = np.frombuffer(self._src, dtype=np.int64)[start:]
+        dst = np.frombuffer(self._dst, dtype=np.int64)[start:]
+        kinds = np.frombuffer(self._edge_kinds, dtype=np.int8)[start:]
+        self._forward = self._build(self._forward, src, dst, kinds, n_nodes)
+        self._reverse = self._build(self._reverse, dst, src, kinds, n_nodes)
+        self._built_edges = len(self._src)
+        self._overlay = None
+
+    # ------------------------------------------------------------ internals
+    def _append(self, source: int, target: int, kind: str) -> None:
+        self._src.append(source)
+        self._dst.append(target)
+        self._edge_kinds.append(EDGE_KINDS.index(kind))
+        self._overlay = None
+
+    @staticmethod
+    def _build(
+        base: Optional[_CSR],
+        heads: np.ndarray,
+        tails: np.ndarray,
+        kinds: np.ndarray,
+        n_nodes: int,
+    ) -> _CSR:
+        """Merge new edges into ``base`` (or build from scratch).
+
+        Only the new edges are sorted; existing adjacency is shifted into
+        its widened slots in one vectorized pass.
+        """
+
+        order = np.argsort(heads)
+        new_counts = np.bincount(heads, minlength=n_nodes)
+        old_counts = np.zeros(n_nodes, dtype=np.int64)
+        if base is not None:
+            old_counts[: len(base.indptr) - 1] = np.diff(base.indptr)
+        indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(old_counts + new_counts, out=indptr[1:])
+        indices = np.empty(indptr[-1], dtype=np.int64)
+        edge_kinds = np.empty(indptr[-1], dtype=np.int8)
+
+        if base is not None and base.indices.size:
+            old_heads = np.repeat(np.arange(n_nodes), old_counts)
+            shift = indptr[:-1] - np.append(
+                base.indptr[:-1],
+                np.full(n_nodes + 1 - len(base.indptr), base.indptr[-1]),
+            )
+            slots = np.arange(base.indices.size) + shift[old_heads]
+            indices[slots] = base.indices
+            edge_kinds[slots] = base.kinds
+
+        sorted_heads = heads[order]
+        group_start = np.cumsum(new_counts) - new_counts
+        slots = (
+            indptr[sorted_heads]
+            + old_counts[sorted_heads]
+            + np.arange(sorted_heads.size)
+            - group_start[sorted_heads]
+        )
+        indices[slots] = tails[order]
+        edge_kinds[slots] = kinds[order]
+        return _CSR(indptr, indices, edge_kinds)
+
+    def _refresh(self) -> None:
+        pending = len(self._src) - self._built_edges
+        if self._forward is None or pending > max(
+            self.min_rebuild, self.rebuild_ratio * self._built_edges
+        ):
+            self.compact()
+            return
+        if self._overlay is None:
+            forward: Dict[int, List[int]] = {}
+            reverse: Dict[int, List[int]] = {}
+            for position in range(self._built_edges, len(self._src)):
+                source, target = self._src[position], self._dst[position]
+                forward.setdefault(source, []).append(target)
+                reverse.setdefault(target, []).append(source)
+            self._overlay = (forward, reverse)
+
+    def _trace(
+        self, node: str, direction: str, max_depth: Optional[int]
+    ) -> GenealogyTrace:
+        if node not in self._ids:
+            raise KeyError(node)
+        self._refresh()
+        forward = direction == "forward"
+        csr = self._forward if forward else self._reverse
+        assert csr is not None
+        extra = (self._overlay or ({}, {}))[0 if forward else 1]
+        built_nodes = len(csr.indptr) - 1
+
+        n_nodes = len(self._labels)
+        depth = np.full(n_nodes, -1, dtype=np.int64)
+        claim = np.zeros(n_nodes, dtype=np.int64)
+        in_overlay = np.zeros(n_nodes, dtype=bool)
+        in_overlay[list(extra)] = True
+        origin = self._ids[node]
+        depth[origin] = 0
+        frontier = np.array([origin], dtype=np.int64)
+        levels: List[np.ndarray] = []
+        level = 0
+        while frontier.size and (max_depth is None or level < max_depth):
+            level += 1
+            known = frontier[frontier < built_nodes]
+            starts = csr.indptr[known]
+            counts = csr.indptr[known + 1] - starts
+            total = int(counts.sum())
+            shift = starts - np.cumsum(counts) + counts
+            reached = csr.indices[np.repeat(shift, counts) + np.arange(total)]
+            hits = frontier[in_overlay[frontier]]
+            if hits.size:
+                spill = [t for h in hits.tolist() for t in extra[h]]
+                reached = np.concatenate(
+                    [reached, np.asarray(spill, dtype=np.int64)]
+                )
+            reached = reached[depth[reached] < 0]
+            # Drop duplicates without sorting: the last writer owns a node.
+            claim[reached] = np.arange(reached.size)
+            frontier = reached[claim[reached] == np.arange(reached.size)]
+            depth[frontier] = level
+            levels.append(frontier)
+
+        found = (
+            np.concatenate(levels) if levels else np.zeros(0, dtype=np.int64)
+        )
+        labels = self._labels
+        node_kinds = np.frombuffer(self._node_kinds, dtype=np.int8)[found]
+        return GenealogyTrace(
+            origin=node,
+            direction=direction,
+            nodes=[labels[i] for i in found.tolist()],
+            kinds=[NODE_KINDS[k] for k in node_kinds.tolist()],
+            depth=depth[found],
+        )
+
+
+_shared_genealogy: Optional[LotGenealogy] = None
+
+
+def shared_lot_genealogy() -> LotGenealogy:
+    """Process-wide genealogy shared by QA, release and recall paths."""
+
+    global _shared_genealogy
+    if _shared_genealogy is None:
+        _shared_genealogy = LotGenealogy()
+    return _shared_genealogy
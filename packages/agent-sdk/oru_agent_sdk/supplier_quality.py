@@ -0,0 +1,389 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import (
+    Any,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+WINDOWS = (30, 90, 365)
+HORIZON_DAYS = max(WINDOWS)
+# Prior used where a supplier has no outcomes in the window yet.
+DEFAULT_PASS_RATE = 0.85
+
+PASS_STATUSES = frozenset({"pass", "passed", "approved"})
+FAIL_STATUSES = frozenset({"fail", "failed", "rejected"})
+
+# Redis stream every service appends QA outcomes to.
+OUTCOME_STREAM = "qa:supplier:outcomes"
+
+Timestamp = Union[date, datetime]
+
+
+@dataclass(slots=True)
+class _SupplierBuckets:
+    day: int
+    passes: List[int] = field(default_factory=lambda: [0] * HORIZON_DAYS)
+    totals: List[int] = field(default_factory=lambda: [0] * HORIZON_DAYS)
+    window_passes: Dict[int, int] = field(
+        default_factory=lambda: dict.fromkeys(WINDOWS, 0)
+    )
+    window_totals: Dict[int, int] = field(
+        default_factory=lambda: dict.fromkeys(WINDOWS, 0)
+    )
+    # batch id -> (day, passed, count) for outcomes still in the horizon.
+    batches: Dict[str, Tuple[int, bool, int]] = field(default_factory=dict)
+
+
+class SupplierQualityIndex:
+    """Per-supplier rolling QA pass rates kept in daily ring buffers.
+
+    Each supplier owns a 365-slot ring of pass/total counters indexed by day
+    ordinal plus running sums for the 30/90/365-day windows. Advancing the
+    clock only touches the days that fall out of a window, so recording and
+    lookups are amortised O(1). Outcomes recorded with a batch id replace
+    that batch's earlier outcome instead of counting twice.
+    """
+
+    def __init__(self, windows: Sequence[int] = WINDOWS) -> None:
+        unsupported = set(windows) - set(WINDOWS)
+        if unsupported:
+            raise ValueError(f"Unsupported windows: {sorted(unsupported)}")
+        self.windows = tuple(windows)
+        self._suppliers: Dict[str, _SupplierBuckets] = {}
+
+    def __contains__(self, supplier: str) -> bool:
+        return supplier in self._suppliers
+
+    def record(
+        self,
+        supplier: str,
+        passed: bool,
+        at: Optional[Timestamp] = None,
+        count: int = 1,
+        batch_id: Optional[str] = None,
+    ) -> None:
+        """Register ``count`` QA outcomes for ``supplier`` on day ``at``."""
+
+        day = self._ordinal(at)
+        state = self._suppliers.get(supplier)
+        if state is None:
+            state = _SupplierBuckets(day=day)
+            self._suppliers[supplier] = state
+        self._advance(state, day)
+        if batch_id is not None:
+            outcome = (day, passed, count)
+            previous = state.batches.get(batch_id)
+            if previous == outcome:
+                return
+            if previous is not None:
+                self._add(state, *previous, sign=-1)
+            state.batches[batch_id] = outcome
+        self._add(state, day, passed, count)
+
+    def record_tests(
+        self,
+        supplier: str,
+        tests: Mapping[str, Any],
+        at: Optional[Timestamp] = None,
+        batch_id: Optional[str] = None,
+    ) -> Optional[bool]:
+        """Record a batch outcome from a QA test map (see ``test_outcome``)."""
+
+        outcome = test_outcome(tests)
+        if outcome is not None:
+            self.record(supplier, outcome, at, batch_id=batch_id)
+        return outcome
+
+    def pass_rate(
+        self,
+        supplier: str,
+        window_days: int = HORIZON_DAYS,
+        as_of: Optional[Timestamp] = None,
+    ) -> Optional[float]:
+        """Pass rate over the window ending on ``as_of`` (default today).
+
+        A past ``as_of`` is answered from the day buckets as long as its
+        whole window is still retained; otherwise ``ValueError`` is raised.
+        """
+
+        passes, total = self._window(supplier, window_days, as_of)
+        return passes / total if total else None
+
+    def sample_size(
+        self,
+        supplier: str,
+        window_days: int = HORIZON_DAYS,
+        as_of: Optional[Timestamp] = None,
+    ) -> int:
+        return self._window(supplier, window_days, as_of)[1]
+
+    def snapshot(
+        self,
+        supplier: str,
+        as_of: Optional[Timestamp] = None,
+        default: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Lookup shaped like the copilot/orchestrator supplier history.
+
+        Windows without outcomes report ``default``; ``batches`` stays 0 so
+        callers can tell a prior from an observed rate.
+        """
+
+        rates = {}
+        for window in self.windows:
+            rate = self.pass_rate(supplier, window, as_of)
+            rates[window] = default if rate is None else rate
+        rolling = rates.get(HORIZON_DAYS)
+        return {
+            "supplier": supplier,
+            "rolling_pass_rate": _round(rolling),
+            "last_30_days": _round(rates.get(30)),
+            "last_90_days": _round(rates.get(90)),
+            "pass_rate": rolling,
+            "batches": self.sample_size(supplier, as_of=as_of),
+        }
+
+    def _window(
+        self, supplier: str, window_days: int, as_of: Optional[Timestamp]
+    ) -> Tuple[int, int]:
+        if window_days not in WINDOWS:
+            raise ValueError(f"Unsupported window: {window_days}")
+        state = self._suppliers.get(supplier)
+        if state is None:
+            return 0, 0
+        day = self._ordinal(as_of)
+        if day >= state.day:
+            self._advance(state, day)
+            return (
+                state.window_passes[window_days],
+                state.window_totals[window_days],
+            )
+        first = day - window_days + 1
+        if first <= state.day - HORIZON_DAYS:
+            raise ValueError(
+                f"{window_days}-day window as of {as_of} is older than the "
+                "retained history"
+            )
+        slots = [expired % HORIZON_DAYS for expired in range(first, day + 1)]
+        return (
+            sum(state.passes[slot] for slot in slots),
+            sum(state.totals[slot] for slot in slots),
+        )
+
+    @staticmethod
+    def _add(
+        state: _SupplierBuckets,
+        day: int,
+        passed: bool,
+        count: int,
+        sign: int = 1,
+    ) -> None:
+        age = state.day - day
+        if age >= HORIZON_DAYS:
+            return
+        slot = day % HORIZON_DAYS
+        hits = sign * count if passed else 0
+        state.passes[slot] += hits
+        state.totals[slot] += sign * count
+        for window in WINDOWS:
+            if age < window:
+                state.window_passes[window] += hits
+                state.window_totals[window] += sign * count
+
+    def _advance(self, state: _SupplierBuckets, day: int) -> None:
+        if day <= state.day:
+            return
+        oldest_kept = state.day - HORIZON_DAYS + 1
+        for window in WINDOWS:
+            first = max(state.day - window + 1, oldest_kept)
+            last = min(day - window, state.day)
+            for expired in range(first, last + 1):
+                slot = expired % HORIZON_DAYS
+                state.window_passes[window] -= state.passes[slot]
+                state.window_totals[window] -= state.totals[slot]
+        for fresh in range(state.day + 1, min(day, state.day + HORIZON_DAYS) + 1):
+            slot = fresh % HORIZON_DAYS
+            state.passes[slot] = 0
+            state.totals[slot] = 0
+        state.day = day
+        if state.batches:
+            oldest = day - HORIZON_DAYS
+            state.batches = {
+                batch: outcome
+                for batch, outcome in state.batches.items()
+                if outcome[0] > oldest
+            }
+
+    @staticmethod
+    def _ordinal(at: Optional[Timestamp]) -> int:
+        if at is None:
+            return datetime.utcnow().toordinal()
+        return at.toordinal()
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+
+class SharedSupplierQualityIndex:
+    """Supplier pass rates shared across services through a Redis stream.
+
+    Outcomes are appended to ``stream``; before answering, every process
+    folds the entries it has not applied yet into a local
+    ``SupplierQualityIndex``, so the copilot and the orchestrator QA paths
+    read one rolling history. Batch-keyed outcomes replace earlier ones,
+    which keeps replaying the stream idempotent. Without a Redis client
+    the index is local to the process.
+    """
+
+    def __init__(
+        self,
+        redis_client: Any = None,
+        stream: str = OUTCOME_STREAM,
+        max_entries: int = 200_000,
+        windows: Sequence[int] = WINDOWS,
+    ) -> None:
+        self.redis = redis_client
+        self.stream = stream
+        self.max_entries = max_entries
+        self.local = SupplierQualityIndex(windows)
+        self._last_id: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    def __contains__(self, supplier: str) -> bool:
+        return supplier in self.local
+
+    async def sync(self) -> int:
+        """Apply stream entries added since the last sync."""
+
+        if self.redis is None:
+            return 0
+        async with self._lock:
+            low = "-" if self._last_id is None else f"({self._last_id}"
+            entries = await self.redis.xrange(self.stream, min=low, max="+")
+            for entry_id, fields in entries:
+                raw = fields.get(b"outcome", fields.get("outcome"))
+                supplier, day, passed, count, batch_id = json.loads(raw)
+                self.local.record(
+                    supplier,
+                    passed,
+                    date.fromordinal(day),
+                    count=count,
+                    batch_id=batch_id,
+                )
+                self._last_id = (
+                    entry_id.decode()
+                    if isinstance(entry_id, bytes)
+                    else entry_id
+                )
+            return len(entries)
+
+    async def record(
+        self,
+        supplier: str,
+        passed: bool,
+        at: Optional[Timestamp] = None,
+        count: int = 1,
+        batch_id: Optional[str] = None,
+    ) -> None:
+        if self.redis is None:
+            self.local.record(supplier, passed, at, count, batch_id)
+            return
+        outcome = [
+            supplier,
+            SupplierQualityIndex._ordinal(at),
+            bool(passed),
+            count,
+            batch_id,
+        ]
+        await self.redis.xadd(
+            self.stream,
+            {"outcome": json.dumps(outcome)},
+            maxlen=self.max_entries,
+            approximate=True,
+        )
+        await self.sync()
+
+    async def record_tests(
+        self,
+        supplier: str,
+        tests: Mapping[str, Any],
+        at: Optional[Timestamp] = None,
+        batch_id: Optional[str] = None,
+    ) -> Optional[bool]:
+        outcome = test_outcome(tests)
+        if outcome is not None:
+            await self.record(supplier, outcome, at, batch_id=batch_id)
+        return outcome
+
+    async def pass_rate(
+        self,
+        supplier: str,
+        window_days: int = HORIZON_DAYS,
+        as_of: Optional[Timestamp] = None,
+    ) -> Optional[float]:
+        await self.sync()
+        return self.local.pass_rate(supplier, window_days, as_of)
+
+    async def snapshot(
+        self,
+        supplier: str,
+        as_of: Optional[Timestamp] = None,
+        default: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        await self.sync()
+        return self.local.snapshot(supplier, as_of, default)
+
+
+def test_outcome(tests: Mapping[str, Any]) -> Optional[bool]:
+    """Batch outcome of a QA test map, or ``None`` while tests are pending.
+
+    Accepts both ``{"micro": "pass"}`` and ``{"micro": {"status": ...}}``
+    shapes. A batch fails if any test failed and passes once every test
+    passed.
+    """
+
+    statuses = [
+        str(
+            value.get("status") if isinstance(value, Mapping) else value
+        ).lower()
+        for value in tests.values()
+    ]
+    if not statuses:
+        return None
+    if any(status in FAIL_STATUSES for status in statuses):
+        return False
+    if all(status in PASS_STATUSES for status in statuses):
+        return True
+    return None
+
+
+_default_index: Optional[SharedSupplierQualityIndex] = None
+
+
+def default_supplier_index(
+    redis_client: Any = None,
+) -> SharedSupplierQualityIndex:
+    """The rolling index shared by the copilot and orchestrator QA paths.
+
+    One instance per process, backed by the ``OUTCOME_STREAM`` Redis
+    stream that every service reads and appends to; the first caller that
+    supplies a Redis client connects it. Until then outcomes stay local.
+    """
+
+    global _default_index
+    if _default_index is None:
+        _default_index = SharedSupplierQualityIndex(redis_client)
+    elif _default_index.redis is None and redis_client is not None:
+        _default_index.redis = redis_client
+    return _default_index
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+
+class BudgetHierarchy:
+    """Cost-centre tree with subtree planned/actual totals kept current.
+
+    The tree lives in a parent-index array (``-1`` for roots) plus an
+    ``ancestors`` matrix holding each node's own index followed by its
+    ancestor chain, padded with ``-1``. Rolled-up totals are built once;
+    each batch of postings then adds its amounts to every node on each
+    posting's chain with one scatter, so a roll-up never re-sums leaves.
+    The matrix is nodes x (depth + 1), sized for shallow cost-centre trees.
+    """
+
+    def __init__(self, nodes: Sequence[Mapping[str, Any]]) -> None:
+        self.ids: List[str] = [str(node["id"]) for node in nodes]
+        self.index: Dict[str, int] = {
+            node_id: position for position, node_id in enumerate(self.ids)
+        }
+        if len(self.index) != len(self.ids):
+            raise ValueError("Cost-centre ids must be unique")
+        size = len(self.ids)
+        self.parent = np.full(size, -1, dtype=np.int64)
+        for position, node in enumerate(nodes):
+            parent = node.get("parent")
+            if parent is None or parent == "":
+                continue
+            if str(parent) not in self.index:
+                raise ValueError(f"Unknown parent cost centre: {parent}")
+            self.parent[position] = self.index[str(parent)]
+        self._check_acyclic(self.parent)
+        self.ancestors = self._chains(self.parent)
+        self.depth = (self.ancestors >= 0).sum(axis=1) - 1
+
+        own_planned = np.array(
+            [float(node.get("planned", 0.0)) for node in nodes]
+        )
+        own_actual = np.array(
+            [float(node.get("actual", 0.0)) for node in nodes]
+        )
+        self.planned = self._roll_up(own_planned)
+        self.actual = self._roll_up(own_actual)
+        self.postings = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def post_actuals(
+        self, postings: Iterable[Tuple[str, float]]
+    ) -> int:
+        """Add actuals to cost centres and all their ancestors."""
+
+        return self._post(self.actual, postings)
+
+    def post_planned(
+        self, postings: Iterable[Tuple[str, float]]
+    ) -> int:
+        return self._post(self.planned, postings)
+
+    def rollup(self, threshold: float) -> Dict[str, Any]:
+        """Variance and threshold breaches for every node, column-wise."""
+
+        variance = self.actual - self.planned
+        pct = np.divide(
+            variance,
+            self.planned,
+            out=np.zeros_like(variance),
+            where=self.planned != 0,
+        )
+        breach = np.abs(pct) > threshold
+        roots = np.flatnonzero(self.parent < 0)
+        return {
+            "ids": self.ids,
+            "parent": [
+                self.ids[p] if p >= 0 else None for p in self.parent.tolist()
+            ],
+            "depth": self.depth.tolist(),
+            "planned": self.planned.round(2).tolist(),
+            "actual": self.actual.round(2).tolist(),
+            "variance": variance.round(2).tolist(),
+            "variance_pct": pct.round(4).tolist(),
+            "status": np.where(variance > 0, "over", "under").tolist(),
+            "breach": breach.tolist(),
+            "breaches": [self.ids[i] for i in np.flatnonzero(breach)],
+            "totals": {
+                "planned": round(float(self.planned[roots].sum()), 2),
+                "actual": round(float(self.actual[roots].sum()), 2),
+            },
+        }
+
+    def _post(
+        self, target: np.ndarray, postings: Iterable[Tuple[str, float]]
+    ) -> int:
+        pairs = list(postings)
+        if not pairs:
+            return 0
+        try:
+            nodes = np.array([self.index[str(node)] for node, _ in pairs])
+        except KeyError as exc:
+            raise ValueError(f"Unknown cost centre: {exc.args[0]}") from exc
+        amounts = np.array([float(amount) for _, amount in pairs])
+        chains = self.ancestors[nodes]
+        mask = chains >= 0
+        np.add.at(
+            target,
+            chains[mask],
+            np.broadcast_to(amounts[:, None], chains.shape)[mask],
+        )
+        self.postings += len(pairs)
+        return len(pairs)
+
+    def _roll_up(self, own: np.ndarray) -> np.ndarray:
+        mask = self.ancestors >= 0
+        rows = np.broadcast_to(own[:, None], self.ancestors.shape)
+        return np.bincount(
+            self.ancestors[mask], weights=rows[mask], minlength=own.size
+        )
+
+    @staticmethod
+    def _check_acyclic(parent: np.ndarray) -> None:
+        """Reject cycles in O(n log n) without building any chains.
+
+        Pointer doubling: after log2(n) squarings each jump spans at least
+        n parents, which only a node on or leading into a cycle can make.
+        """
+
+        jump = parent.copy()
+        steps = 1
+        while steps < parent.size:
+            jump = np.where(jump >= 0, jump[jump], -1)
+            steps *= 2
+        if (jump >= 0).any():
+            raise ValueError("Cost-centre hierarchy contains a cycle")
+
+    @staticmethod
+    def _chains(parent: np.ndarray) -> np.ndarray:
+        """Self plus ancestors per node; pointer-chases all nodes at once."""
+
+        columns = [np.arange(parent.size)]
+        current = parent.copy()
+        while (current >= 0).any():
+            columns.append(current)
+            current = np.where(current >= 0, parent[current], -1)
+        return np.column_stack(columns)
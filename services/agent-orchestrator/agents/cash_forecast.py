@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Sequence, Tuple, Union
+
+import numpy as np
+
+METHODS = ("regression", "holt")
+
+
+def series_matrix(
+    series: Mapping[str, Sequence[Any]],
+) -> Tuple[List[str], np.ndarray]:
+    """Right-align ragged per-entity histories into an entity x period matrix.
+
+    Items may be numbers or ``{"net": ...}`` dicts like the single-entity
+    action's history; missing leading periods are NaN.
+    """
+
+    entities = list(series)
+    width = max((len(values) for values in series.values()), default=0)
+    matrix = np.full((len(entities), width), np.nan)
+    for row, entity in enumerate(entities):
+        values = [
+            item.get("net", 0) if isinstance(item, Mapping) else item
+            for item in series[entity]
+        ]
+        if values:
+            matrix[row, width - len(values):] = np.asarray(
+                values, dtype=np.float64
+            )
+    return entities, matrix
+
+
+@dataclass(slots=True)
+class CashForecastBatch:
+    """Column-oriented forecast, one row per entity."""
+
+    entities: List[str]
+    forecast: np.ndarray
+    slope: np.ndarray
+    residual_sd: np.ndarray
+    floor: np.ndarray
+    observed: np.ndarray
+    method: str
+
+    @property
+    def buffer_gap(self) -> np.ndarray:
+        return self.forecast[:, 0] - self.floor
+
+    @property
+    def min_gap(self) -> np.ndarray:
+        return self.forecast.min(axis=1) - self.floor
+
+    @property
+    def breach(self) -> np.ndarray:
+        return self.min_gap < 0
+
+    @property
+    def first_breach(self) -> np.ndarray:
+        """Index of the first period below the floor, -1 when none."""
+
+        below = self.forecast < self.floor[:, None]
+        return np.where(below.any(axis=1), below.argmax(axis=1), -1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        breach = self.breach
+        return {
+            "entities": self.entities,
+            "method": self.method,
+            "forecast": self.forecast.round(2).tolist(),
+            "slope": self.slope.round(4).tolist(),
+            "residual_sd": self.residual_sd.round(4).tolist(),
+            "buffer_gap": self.buffer_gap.round(2).tolist(),
+            "min_gap": self.min_gap.round(2).tolist(),
+            "breach": breach.tolist(),
+            "first_breach": self.first_breach.tolist(),
+            "recommendation": np.where(
+                breach, "secure credit line", "monitor"
+            ).tolist(),
+            "observed": self.observed.tolist(),
+            "breaches": int(breach.sum()),
+        }
+
+
+class CashFlowForecaster:
+    """Forecasts every entity's cash position from one NaN-padded matrix.
+
+    ``regression`` fits an ordinary least-squares line to each entity's
+    last ``window`` observed periods at once (missing periods are masked
+    out of the sums) and extrapolates it. ``holt`` runs Holt's linear
+    smoothing as one recurrence over periods for all entities, skipping
+    NaNs. Entities without history forecast their ``baseline``.
+    """
+
+    def __init__(
+        self, window: int = 6, alpha: float = 0.3, beta: float = 0.1
+    ) -> None:
+        if window < 2:
+            raise ValueError("Regression window must cover 2 periods")
+        self.window = window
+        self.alpha = alpha
+        self.beta = beta
+
+    def forecast(
+        self,
+        entities: Sequence[str],
+        matrix: np.ndarray,
+        horizon: int,
+        floors: Union[float, Mapping[str, float], np.ndarray],
+        baseline: float,
+        method: str = "regression",
+        default_floor: float = 0.0,
+    ) -> CashForecastBatch:
+        if method not in METHODS:
+            raise ValueError(f"Unknown forecast method: {method}")
+        if horizon < 1:
+            raise ValueError("Forecast horizon must be at least 1 period")
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if len(entities):
+            matrix = matrix.reshape(len(entities), -1)
+        else:
+            matrix = np.zeros((0, 0))
+        if method == "holt":
+            level, slope, residual_sd, observed = self._holt(matrix)
+        else:
+            level, slope, residual_sd, observed = self._regression(matrix)
+        empty = observed == 0
+        level[empty] = baseline
+        slope[empty] = 0.0
+        steps = np.arange(horizon)
+        forecast = level[:, None] + slope[:, None] * steps
+        return CashForecastBatch(
+            entities=list(entities),
+            forecast=forecast,
+            slope=slope,
+            residual_sd=residual_sd,
+            floor=self._floors(entities, floors, default_floor),
+            observed=observed,
+            method=method,
+        )
+
+    def _regression(
+        self, matrix: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        tail = matrix[:, -self.window:]
+        width = tail.shape[1]
+        mask = ~np.isnan(tail)
+        values = np.where(mask, tail, 0.0)
+        count = mask.sum(axis=1)
+        safe = np.maximum(count, 1)
+        x = np.arange(width, dtype=np.float64)
+        x_mean = (mask * x).sum(axis=1) / safe
+        y_mean = values.sum(axis=1) / safe
+        dx = np.where(mask, x - x_mean[:, None], 0.0)
+        dy = np.where(mask, values - y_mean[:, None], 0.0)
+        sxx = (dx * dx).sum(axis=1)
+        slope = np.divide(
+            (dx * dy).sum(axis=1),
+            sxx,
+            out=np.zeros_like(sxx),
+            where=sxx > 0,
+        )
+        # Forecast period 0 is the one right after the window.
+        level = y_mean + slope * (width - x_mean)
+        residual = np.where(mask, dy - slope[:, None] * dx, 0.0)
+        dof = np.maximum(count - 2, 1)
+        residual_sd = np.sqrt((residual * residual).sum(axis=1) / dof)
+        return level, slope, residual_sd, count
+
+    def _holt(
+        self, matrix: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        alpha, beta = self.alpha, self.beta
+        rows = matrix.shape[0]
+        level = np.full(rows, np.nan)
+        trend = np.zeros(rows)
+        error_sq = np.zeros(rows)
+        errors = np.zeros(rows)
+        for column in matrix.T:
+            seen = ~np.isnan(column)
+            fresh = seen & np.isnan(level)
+            level = np.where(fresh, column, level)
+            active = seen & ~fresh
+            predicted = level + trend
+            error = np.where(active, column - predicted, 0.0)
+            error_sq += error * error
+            errors += active
+            updated = predicted + alpha * error
+            trend = np.where(
+                active, trend + beta * (updated - level - trend), trend
+            )
+            level = np.where(active, updated, level)
+        observed = (~np.isnan(matrix)).sum(axis=1)
+        residual_sd = np.sqrt(error_sq / np.maximum(errors, 1))
+        return (
+            np.nan_to_num(level + trend),
+            trend,
+            residual_sd,
+            observed,
+        )
+
+    @staticmethod
+    def _floors(
+        entities: Sequence[str],
+        floors: Union[float, Mapping[str, float], np.ndarray],
+        default: float,
+    ) -> np.ndarray:
+        if isinstance(floors, Mapping):
+            return np.array(
+                [float(floors.get(entity, default)) for entity in entities]
+            )
+        return np.broadcast_to(
+            np.asarray(floors, dtype=np.float64), (len(entities),)
+        ).copy()
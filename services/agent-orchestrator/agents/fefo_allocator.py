@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+HELD_STATUSES = frozenset({"qa_hold"})
+NO_EXPIRY = date.max.toordinal()
+
+StockKey = Tuple[str, Optional[str]]
+
+
+def _day(value: Any) -> int:
+    if value is None or value == "":
+        return NO_EXPIRY
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(str(value)[:10]).toordinal()
+
+
+@dataclass(slots=True)
+class FEFOResult:
+    """Pick list for one allocation pass plus what could not be served."""
+
+    allocations: List[Dict[str, Any]] = field(default_factory=list)
+    shortages: List[Dict[str, Any]] = field(default_factory=list)
+    expired_lots: List[str] = field(default_factory=list)
+
+    @property
+    def fill_rate(self) -> float:
+        allocated = sum(a["quantity"] for a in self.allocations)
+        short = sum(s["short"] for s in self.shortages)
+        total = allocated + short
+        return allocated / total if total else 1.0
+
+
+class FEFOAllocator:
+    """First-expired-first-out picking over per-SKU, per-facility lot heaps.
+
+    Each ``(sku, facilityId)`` owns a min-heap of ``[expiry_day, seq, batch,
+    remaining]`` entries. Lots on QA hold never enter a heap. A line whose
+    customer needs more remaining shelf life pops the too-short lots aside
+    and pushes them back afterwards, so they stay available for the next
+    line that can take them.
+    """
+
+    def __init__(self) -> None:
+        self._heaps: Dict[StockKey, List[List[Any]]] = {}
+        self._seq = 0
+        self.held_lots: List[str] = []
+
+    def __len__(self) -> int:
+        return sum(len(heap) for heap in self._heaps.values())
+
+    def load(self, lots: Iterable[Mapping[str, Any]]) -> None:
+        pending: Dict[StockKey, List[List[Any]]] = {}
+        for lot in lots:
+            if lot.get("qaStatus") in HELD_STATUSES:
+                self.held_lots.append(lot.get("batchNumber"))
+                continue
+            quantity = float(lot.get("quantity", 0))
+            if quantity <= 0:
+                continue
+            key = (lot["sku"], lot.get("facilityId"))
+            self._seq += 1
+            pending.setdefault(key, []).append(
+                [
+                    _day(lot.get("expiryDate")),
+                    self._seq,
+                    lot.get("batchNumber"),
+                    quantity,
+                ]
+            )
+        for key, entries in pending.items():
+            heap = self._heaps.get(key)
+            if heap:
+                heap.extend(entries)
+            else:
+                heap = entries
+                self._heaps[key] = heap
+            heapq.heapify(heap)
+
+    def available(self, sku: str, facility_id: Optional[str] = None) -> float:
+        heap = self._heaps.get((sku, facility_id), ())
+        return sum(entry[3] for entry in heap)
+
+    def allocate(
+        self,
+        order_lines: Iterable[Mapping[str, Any]],
+        as_of: Optional[date] = None,
+        min_shelf_life: Optional[Mapping[str, int]] = None,
+    ) -> FEFOResult:
+        """Serve ``order_lines`` in the given order against the heaps.
+
+        A lot is eligible for a line when it expires at least
+        ``min_shelf_life[customerId]`` days (or the line's own
+        ``minShelfLifeDays``) after ``as_of``; lots already expired on
+        ``as_of`` are dropped from stock as they surface.
+        """
+
+        today = (as_of or date.today()).toordinal()
+        shelf_life = min_shelf_life or {}
+        result = FEFOResult()
+        allocations = result.allocations
+        heappop, heappush = heapq.heappop, heapq.heappush
+
+        for position, line in enumerate(order_lines):
+            need = float(line.get("quantity", 0))
+            if need <= 0:
+                continue
+            heap = self._heaps.get((line["sku"], line.get("facilityId")))
+            min_days = line.get("minShelfLifeDays")
+            if min_days is None:
+                min_days = shelf_life.get(line.get("customerId"), 0)
+            earliest = today + int(min_days)
+            line_id = line.get("lineId", position)
+            stashed: List[List[Any]] = []
+
+            while need > 0 and heap:
+                entry = heap[0]
+                if entry[0] < today:
+                    heappop(heap)
+                    result.expired_lots.append(entry[2])
+                    continue
+                if entry[0] < earliest:
+                    stashed.append(heappop(heap))
+                    continue
+                take = entry[3] if entry[3] < need else need
+                allocations.append(
+                    {
+                        "orderId": line.get("orderId"),
+                        "lineId": line_id,
+                        "sku": line["sku"],
+                        "facilityId": line.get("facilityId"),
+                        "batchNumber": entry[2],
+                        "quantity": take,
+                        "expiryDate": (
+                            None
+                            if entry[0] == NO_EXPIRY
+                            else date.fromordinal(entry[0]).isoformat()
+                        ),
+                    }
+                )
+                need -= take
+                entry[3] -= take
+                if entry[3] <= 0:
+                    heappop(heap)
+
+            for entry in stashed:
+                heappush(heap, entry)
+            if need > 0:
+                result.shortages.append(
+                    {
+                        "orderId": line.get("orderId"),
+                        "lineId": line_id,
+                        "sku": line["sku"],
+                        "facilityId": line.get("facilityId"),
+                        "short": need,
+                        "reason": (
+                            "shelf_life"
+                            if stashed
+                            else "insufficient_stock"
+                        ),
+                    }
+                )
+        return result
@@ -3,7 +3,11 @@ from __future__ import annotations
 import statistics
 from typing import Any, Dict, List, Optional
 
+import numpy as np
+
 from .base_agent import BaseAgent
+from .budget_hierarchy import BudgetHierarchy
+from .cash_forecast import CashFlowForecaster, series_matrix
 
 
 class FinanceAgent(BaseAgent):
@@ -21,6 +25,8 @@ class FinanceAgent(BaseAgent):
             "variance_threshold": 0.08,
         }
         self.settings = defaults | (config or {})
+        self.cash_forecaster = CashFlowForecaster()
+        self.budget_hierarchy: Optional[BudgetHierarchy] = None
 
     async def execute_action(
         self,
@@ -30,7 +36,11 @@ class FinanceAgent(BaseAgent):
     ) -> Dict[str, Any]:
         handlers = {
             "forecast_cash_flow": self.forecast_cash_flow,
+            "forecast_cash_flow_batch": self.forecast_cash_flow_batch,
             "evaluate_budget": self.evaluate_budget,
+            "load_budget_hierarchy": self.load_budget_hierarchy,
+            "post_budget_actuals": self.post_budget_actuals,
+            "budget_variance_rollup": self.budget_variance_rollup,
             "assess_risk": self.assess_risk,
         }
         if action not in handlers:
@@ -73,6 +83,58 @@ class FinanceAgent(BaseAgent):
             "reasoning": "Derived from short-term net cash history",
         }
 
+    async def forecast_cash_flow_batch(
+        self,
+        parameters: Dict[str, Any],
+        _context: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Forecast many entities from ``matrix`` + ``entities`` or ``series``.
+
+        ``cash_floor`` may be a number or a per-entity mapping; entities
+        missing from the mapping use the configured floor.
+        """
+
+        if "matrix" in parameters:
+            entities = [str(e) for e in parameters.get("entities", [])]
+            matrix = np.asarray(parameters["matrix"], dtype=np.float64)
+        else:
+            entities, matrix = series_matrix(parameters.get("series", {}))
+        if not entities:
+            matrix = np.zeros((0, 0))
+        if matrix.ndim != 2 or matrix.shape[0] != len(entities):
+            return {
+                "success": False,
+                "error": "matrix must have one row per entity",
+            }
+        try:
+            batch = self.cash_forecaster.forecast(
+                entities,
+                matrix,
+                horizon=parameters.get("horizon_days", 14),
+                floors=parameters.get(
+                    "cash_floor", self.settings["cash_floor"]
+                ),
+                baseline=parameters.get(
+                    "baseline", self.settings["cash_floor"]
+                ),
+                method=parameters.get("method", "regression"),
+                default_floor=self.settings["cash_floor"],
+            )
+            data = batch.to_dict()
+        except ValueError as exc:
+            return {"success": False, "error": str(exc)}
+
+        return {
+            "success": True,
+            "data": data,
+            "confidence": 0.78 if batch.observed.any() else 0.65,
+            "requires_approval": data["breaches"] > 0,
+            "reasoning": (
+                f"{batch.method} fit across {len(entities)} entities; "
+                f"{data['breaches']} projected below cash floor"
+            ),
+        }
+
     async def evaluate_budget(
         self,
         parameters: Dict[str, Any],
@@ -99,6 +161,79 @@ class FinanceAgent(BaseAgent):
             "reasoning": "Variance calculated against configured tolerance",
         }
 
+    async def load_budget_hierarchy(
+        self,
+        parameters: Dict[str, Any],
+        _context: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        try:
+            hierarchy = BudgetHierarchy(parameters.get("nodes", []))
+        except (KeyError, ValueError) as exc:
+            return {"success": False, "error": str(exc)}
+        self.budget_hierarchy = hierarchy
+        return {
+            "success": True,
+            "data": {
+                "nodes": len(hierarchy),
+                "max_depth": int(hierarchy.depth.max(initial=0)),
+            },
+            "confidence": 0.9,
+            "reasoning": "Cost-centre tree indexed for incremental roll-up",
+        }
+
+    async def post_budget_actuals(
+        self,
+        parameters: Dict[str, Any],
+        _context: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        if self.budget_hierarchy is None:
+            return {"success": False, "error": "No budget hierarchy loaded"}
+        try:
+            postings = [
+                (item["cost_centre"], item["amount"])
+                for item in parameters.get("postings", [])
+            ]
+        except (KeyError, TypeError):
+            return {
+                "success": False,
+                "error": "Postings need cost_centre and amount",
+            }
+        try:
+            posted = self.budget_hierarchy.post_actuals(postings)
+        except ValueError as exc:
+            return {"success": False, "error": str(exc)}
+        return {
+            "success": True,
+            "data": {
+                "posted": posted,
+                "total_postings": self.budget_hierarchy.postings,
+            },
+            "confidence": 0.9,
+            "reasoning": "Actuals added to each cost centre's ancestors",
+        }
+
+    async def budget_variance_rollup(
+        self,
+        parameters: Dict[str, Any],
+        _context: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        if self.budget_hierarchy is None:
+            return {"success": False, "error": "No budget hierarchy loaded"}
+        threshold = parameters.get(
+            "variance_threshold", self.settings["variance_threshold"]
+        )
+        rollup = self.budget_hierarchy.rollup(threshold)
+        return {
+            "success": True,
+            "data": rollup,
+            "confidence": 0.84,
+            "requires_approval": bool(rollup["breaches"]),
+            "reasoning": (
+                f"{len(rollup['breaches'])} of {len(rollup['ids'])} cost "
+                "centres outside configured tolerance"
+            ),
+        }
+
     async def assess_risk(
         self,
         parameters: Dict[str, Any],
@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import random
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+Slot = Tuple[float, float, str]
+
+
+class SlotConflictError(ValueError):
+    def __init__(self, conflicts: List[Slot]):
+        ids = ", ".join(slot[2] for slot in conflicts)
+        super().__init__(f"Slot overlaps existing bookings: {ids}")
+        self.conflicts = conflicts
+
+
+class _Node:
+    __slots__ = (
+        "start",
+        "end",
+        "order_id",
+        "priority",
+        "left",
+        "right",
+        "min_start",
+        "max_end",
+        "max_gap",
+    )
+
+    def __init__(
+        self, start: float, end: float, order_id: str, priority: float
+    ) -> None:
+        self.start = start
+        self.end = end
+        self.order_id = order_id
+        self.priority = priority
+        self.left: Optional[_Node] = None
+        self.right: Optional[_Node] = None
+        self.min_start = start
+        self.max_end = end
+        self.max_gap = 0.0
+
+
+def _update(node: _Node) -> _Node:
+    left, right = node.left, node.right
+    gap = 0.0
+    if left is not None:
+        node.min_start = left.min_start
+        gap = left.max_gap
+        before = node.start - left.max_end
+        if before > gap:
+            gap = before
+    else:
+        node.min_start = node.start
+    if right is not None:
+        node.max_end = right.max_end
+        if right.max_gap > gap:
+            gap = right.max_gap
+        after = right.min_start - node.end
+        if after > gap:
+            gap = after
+    else:
+        node.max_end = node.end
+    node.max_gap = gap
+    return node
+
+
+def _split(
+    node: Optional[_Node], key: float
+) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Split into (start < key, start >= key)."""
+
+    if node is None:
+        return None, None
+    if node.start < key:
+        left, right = _split(node.right, key)
+        node.right = left
+        return _update(node), right
+    left, right = _split(node.left, key)
+    node.left = right
+    return left, _update(node)
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return _update(left)
+    right.left = _merge(left, right.left)
+    return _update(right)
+
+
+def _insert(node: Optional[_Node], new: _Node) -> _Node:
+    if node is None:
+        return new
+    if new.priority > node.priority:
+        new.left, new.right = _split(node, new.start)
+        return _update(new)
+    if new.start < node.start:
+        node.left = _insert(node.left, new)
+    else:
+        node.right = _insert(node.right, new)
+    return _update(node)
+
+
+def _delete(
+    node: Optional[_Node], start: float
+) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Remove the booking starting at ``start``; returns (tree, removed)."""
+
+    if node is None:
+        return None, None
+    if start < node.start:
+        node.left, removed = _delete(node.left, start)
+    elif start > node.start:
+        node.right, removed = _delete(node.right, start)
+    else:
+        return _merge(node.left, node.right), node
+    return _update(node), removed
+
+
+def _fit(
+    node: Optional[_Node], not_before: float, duration: float, prev_end: float
+) -> Tuple[Optional[float], float]:
+    """Earliest start >= ``not_before`` inside this subtree, if any.
+
+    Walks the single root-to-leaf path that straddles ``not_before``; whole
+    subtrees to its right are answered from their gap augmentation.
+    Returns ``(start, end_of_last_booking_seen)``.
+    """
+
+    if node is None:
+        return None, prev_end
+    if node.start < not_before:
+        end = node.end if node.end > prev_end else prev_end
+        return _fit(node.right, not_before, duration, end)
+    found, prev_end = _fit(node.left, not_before, duration, prev_end)
+    if found is not None:
+        return found, prev_end
+    begin = prev_end if prev_end > not_before else not_before
+    if node.start - begin >= duration:
+        return begin, prev_end
+    right = node.right
+    if right is None:
+        return None, node.end
+    if right.min_start - node.end >= duration:
+        return node.end, node.end
+    gap_start = _first_gap(right, duration)
+    if gap_start is not None:
+        return gap_start, gap_start
+    return None, right.max_end
+
+
+def _first_gap(node: Optional[_Node], duration: float) -> Optional[float]:
+    """End time of the first booking followed by a gap >= ``duration``."""
+
+    if node is None or node.max_gap < duration:
+        return None
+    found = _first_gap(node.left, duration)
+    if found is not None:
+        return found
+    if node.left is not None and node.start - node.left.max_end >= duration:
+        return node.left.max_end
+    if node.right is not None and node.right.min_start - node.end >= duration:
+        return node.end
+    return _first_gap(node.right, duration)
+
+
+class LineCalendar:
+    """Bookings for one production line in a gap-augmented treap.
+
+    Slots are half-open ``[start, end)`` epoch seconds keyed by start. Every
+    node tracks the largest free gap inside its subtree, so earliest-fit,
+    conflict checks, insertion and removal are O(log n) expected.
+    """
+
+    def __init__(self, line_id: str, seed: Optional[int] = None) -> None:
+        self.line_id = line_id
+        self._root: Optional[_Node] = None
+        self._starts: Dict[str, float] = {}
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self._starts
+
+    def earliest_fit(self, not_before: float, duration: float) -> float:
+        if duration <= 0:
+            raise ValueError("duration must be positive")
+        found, last_end = _fit(
+            self._root, not_before, duration, float("-inf")
+        )
+        if found is not None:
+            return found
+        return last_end if last_end > not_before else not_before
+
+    def conflicts(self, start: float, end: float) -> List[Slot]:
+        """Bookings overlapping ``[start, end)``."""
+
+        found: List[Slot] = []
+        self._collect(self._root, start, end, found)
+        return found
+
+    def book(
+        self,
+        order_id: str,
+        duration: float,
+        not_before: float,
+    ) -> Slot:
+        """Insert at the earliest slot that fits on or after ``not_before``."""
+
+        if order_id in self._starts:
+            raise ValueError(f"{order_id} already booked on {self.line_id}")
+        start = self.earliest_fit(not_before, duration)
+        return self._place(order_id, start, start + duration)
+
+    def insert(self, order_id: str, start: float, end: float) -> Slot:
+        if end <= start:
+            raise ValueError("end must be after start")
+        if order_id in self._starts:
+            raise ValueError(f"{order_id} already booked on {self.line_id}")
+        overlapping = self.conflicts(start, end)
+        if overlapping:
+            raise SlotConflictError(overlapping)
+        return self._place(order_id, start, end)
+
+    def get(self, order_id: str) -> Optional[Slot]:
+        start = self._starts.get(order_id)
+        if start is None:
+            return None
+        node = self._root
+        while node is not None:
+            if start < node.start:
+                node = node.left
+            elif start > node.start:
+                node = node.right
+            else:
+                return (node.start, node.end, node.order_id)
+        return None
+
+    def remove(self, order_id: str) -> Optional[Slot]:
+        start = self._starts.pop(order_id, None)
+        if start is None:
+            return None
+        self._root, removed = _delete(self._root, start)
+        if removed is None:
+            return None
+        return (removed.start, removed.end, removed.order_id)
+
+    def reschedule(
+        self,
+        order_id: str,
+        not_before: float,
+        duration: Optional[float] = None,
+    ) -> Slot:
+        """Move a booking to the earliest fit on or after ``not_before``."""
+
+        current = self.remove(order_id)
+        if current is None:
+            raise KeyError(order_id)
+        length = duration if duration is not None else current[1] - current[0]
+        return self.book(order_id, length, not_before)
+
+    def slots(self) -> Iterator[Slot]:
+        stack: List[_Node] = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield (node.start, node.end, node.order_id)
+            node = node.right
+
+    def snapshot(self) -> List[List[object]]:
+        return [list(slot) for slot in self.slots()]
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        line_id: str,
+        slots: Sequence[Sequence[object]],
+        seed: Optional[int] = None,
+    ) -> "LineCalendar":
+        """Rebuild in O(n) from sorted, non-overlapping slots."""
+
+        calendar = cls(line_id, seed)
+        ordered = sorted(
+            (float(start), float(end), str(order_id))
+            for start, end, order_id in slots
+        )
+        # Balanced shape from the sorted slots; priorities are handed out in
+        # level order from a descending draw so the heap property holds.
+        priorities = sorted(
+            (calendar._random.random() for _ in ordered), reverse=True
+        )
+        level_order: List[_Node] = []
+        queue: List[Tuple[int, int, Optional[_Node], bool]] = [
+            (0, len(ordered), None, False)
+        ]
+        cursor = 0
+        while cursor < len(queue):
+            lo, hi, parent, is_right = queue[cursor]
+            cursor += 1
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            start, end, order_id = ordered[mid]
+            node = _Node(start, end, order_id, priorities[len(level_order)])
+            level_order.append(node)
+            if parent is None:
+                calendar._root = node
+            elif is_right:
+                parent.right = node
+            else:
+                parent.left = node
+            calendar._starts[order_id] = start
+            queue.append((lo, mid, node, False))
+            queue.append((mid + 1, hi, node, True))
+        for node in reversed(level_order):
+            _update(node)
+        return calendar
+
+    def _place(self, order_id: str, start: float, end: float) -> Slot:
+        node = _Node(start, end, order_id, self._random.random())
+        self._root = _insert(self._root, node)
+        self._starts[order_id] = start
+        return (start, end, order_id)
+
+    def _collect(
+        self,
+        node: Optional[_Node],
+        start: float,
+        end: float,
+        found: List[Slot],
+    ) -> None:
+        if node is None or node.max_end <= start or node.min_start >= end:
+            return
+        self._collect(node.left, start, end, found)
+        if node.start < end and node.end > start:
+            found.append((node.start, node.end, node.order_id))
+        self._collect(node.right, start, end, found)
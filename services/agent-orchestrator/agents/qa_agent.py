@@ -1,13 +1,27 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Any, Dict, Optional
 
 from .base_agent import BaseAgent
+from .supplier_quality import DEFAULT_PASS_RATE, default_supplier_index
 
 
 class QAAgent(BaseAgent):
     """Quality assurance agent that evaluates batch readiness."""
 
+    def __init__(
+        self,
+        agent_id: str,
+        redis_client: Any = None,
+        config: Optional[Dict[str, Any]] = None,
+        supplier_index: Any = None,
+    ) -> None:
+        super().__init__(agent_id, "qa", redis_client, config)
+        self.supplier_index = supplier_index or default_supplier_index(
+            redis_client
+        )
+
     async def execute_action(
         self,
         action: str,
@@ -45,12 +59,28 @@ class QAAgent(BaseAgent):
         else:
             decision = "pending"
             confidence = 0.6
+
+        supplier = parameters.get("supplier")
+        supplier_history = None
+        if supplier:
+            if decision != "pending":
+                tested_at = parameters.get("tested_at")
+                await self.supplier_index.record(
+                    supplier,
+                    decision == "approve",
+                    datetime.fromisoformat(tested_at) if tested_at else None,
+                    batch_id=parameters.get("batch_id"),
+                )
+            supplier_history = await self.supplier_index.snapshot(
+                supplier, default=DEFAULT_PASS_RATE
+            )
         return {
             "success": True,
             "data": {
                 "decision": decision,
                 "failed_tests": failed,
                 "passed_tests": passed,
+                "supplier_history": supplier_history,
             },
             "confidence": confidence,
             "requires_approval": decision != "approve",
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import importlib
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+SDK_PATH = REPO_ROOT / "packages" / "agent-sdk"
+if SDK_PATH.exists() and str(SDK_PATH) not in sys.path:
+    sys.path.append(str(SDK_PATH))
+
+supplier_quality_module = importlib.import_module(
+    "oru_agent_sdk.supplier_quality"
+)
+DEFAULT_PASS_RATE = supplier_quality_module.DEFAULT_PASS_RATE
+SharedSupplierQualityIndex = (
+    supplier_quality_module.SharedSupplierQualityIndex
+)
+SupplierQualityIndex = supplier_quality_module.SupplierQualityIndex
+default_supplier_index = supplier_quality_module.default_supplier_index
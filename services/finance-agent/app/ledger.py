@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+import os
+import struct
+import time
+import zlib
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_EVEN, Decimal
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+# Frame: payload length, CRC32 of payload. The payload starts with a kind
+# byte; accounts carry their id and UTF-8 name, entries their sequence,
+# timestamp, line count and idempotency key followed by (account, cents)
+# lines.
+FRAME = struct.Struct("<II")
+ACCOUNT = struct.Struct("<BI")
+ENTRY = struct.Struct("<BQdHH")
+LINE = struct.Struct("<Iq")
+
+ACCOUNT_RECORD = 1
+ENTRY_RECORD = 2
+
+# Line amounts are stored as signed 64-bit cents.
+MIN_CENTS = -(1 << 63)
+MAX_CENTS = (1 << 63) - 1
+
+Line = Union[Tuple[str, Any], Mapping[str, Any]]
+
+
+class LedgerError(ValueError):
+    pass
+
+
+class UnbalancedEntryError(LedgerError):
+    def __init__(self, index: int, imbalance_cents: int):
+        super().__init__(
+            f"Entry {index} does not balance: off by {imbalance_cents} cents"
+        )
+        self.index = index
+        self.imbalance_cents = imbalance_cents
+
+
+def to_cents(amount: Any) -> int:
+    """Whole cents for ``amount``; rejects non-finite and int64 overflow."""
+
+    try:
+        if isinstance(amount, int):
+            cents = amount * 100
+        elif isinstance(amount, float):
+            cents = round(amount * 100)
+        else:
+            cents = int(
+                (Decimal(str(amount)) * 100).quantize(
+                    Decimal(1), rounding=ROUND_HALF_EVEN
+                )
+            )
+    except (ArithmeticError, ValueError) as exc:
+        raise LedgerError(f"Invalid amount: {amount!r}") from exc
+    if not MIN_CENTS <= cents <= MAX_CENTS:
+        raise LedgerError(f"Amount out of range: {amount!r}")
+    return cents
+
+
+@dataclass(slots=True)
+class PostingResult:
+    posted: int = 0
+    duplicates: List[str] = field(default_factory=list)
+    first_sequence: Optional[int] = None
+    last_sequence: Optional[int] = None
+
+
+@dataclass(slots=True)
+class _Checkpoint:
+    entries: int
+    balances: List[int]
+
+
+class Ledger:
+    """Double-entry ledger in integer cents with an append-only journal.
+
+    Every entry must have at least two lines summing to zero. Current
+    balances are a list indexed by interned account id; every entry and
+    line is also kept in compact columnar arrays, and every
+    ``checkpoint_every`` entries a copy of all balances is stored, so a
+    point-in-time balance is a checkpoint lookup plus a scan of at most
+    ``checkpoint_every`` entries. Entry timestamps must not decrease.
+
+    With a ``path``, records are framed and CRC-checked and buffered while
+    a batch is applied; the batch is written and fsynced once before
+    ``post_many`` returns, so an acknowledged entry is always durable and
+    posting in batches amortises the fsync. Opening an existing journal
+    replays it and truncates a torn tail.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path, None] = None,
+        checkpoint_every: int = 4096,
+    ) -> None:
+        self.path = Path(path) if path is not None else None
+        self.checkpoint_every = checkpoint_every
+        self._accounts: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._balances: List[int] = []
+        self._keys: Dict[str, int] = {}
+        self._timestamps = array("d")
+        self._line_ends = array("Q")
+        self._line_accounts = array("I")
+        self._line_amounts = array("q")
+        self._checkpoints: List[_Checkpoint] = [_Checkpoint(0, [])]
+        self._checkpoint_entries = array("Q", [0])
+        self._buffer = bytearray()
+        self._file = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.path.exists():
+                self._replay()
+            self._file = open(self.path, "ab")
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    @property
+    def accounts(self) -> List[str]:
+        return list(self._names)
+
+    # ---------------------------------------------------------------- writes
+    def post(
+        self,
+        lines: Sequence[Line],
+        idempotency_key: Optional[str] = None,
+        timestamp: Optional[float] = None,
+    ) -> PostingResult:
+        return self.post_many(
+            [
+                {
+                    "lines": lines,
+                    "idempotency_key": idempotency_key,
+                    "timestamp": timestamp,
+                }
+            ]
+        )
+
+    def post_many(
+        self, entries: Iterable[Mapping[str, Any]]
+    ) -> PostingResult:
+        """Validate a batch, then post it; nothing is posted on error.
+
+        Entries whose idempotency key was already posted, or repeats within
+        the batch, are skipped and reported in ``duplicates``. Accounts first
+        seen in the batch are only interned once it has validated.
+        """
+
+        result = PostingResult()
+        pending: List[Tuple[float, Optional[str], List[Tuple[int, int]]]] = []
+        seen = self._keys
+        batch_keys = set()
+        known = self._accounts
+        new_accounts: Dict[str, int] = {}
+
+        def account_id(name: str) -> int:
+            existing = known.get(name)
+            if existing is not None:
+                return existing
+            return new_accounts.setdefault(
+                name, len(self._names) + len(new_accounts)
+            )
+
+        last = self._timestamps[-1] if self._timestamps else float("-inf")
+        now = time.time()
+
+        for index, entry in enumerate(entries):
+            key = entry.get("idempotency_key")
+            if key is not None:
+                if key in seen or key in batch_keys:
+                    result.duplicates.append(key)
+                    continue
+                batch_keys.add(key)
+            stamp = entry.get("timestamp")
+            stamp = max(now, last) if stamp is None else float(stamp)
+            if stamp < last:
+                raise LedgerError(
+                    f"Entry {index} is older than the last posted entry"
+                )
+            last = stamp
+            lines = [
+                (
+                    account_id(line["account"]),
+                    to_cents(line["amount"]),
+                )
+                if isinstance(line, Mapping)
+                else (account_id(line[0]), to_cents(line[1]))
+                for line in entry["lines"]
+            ]
+            if len(lines) < 2:
+                raise LedgerError(f"Entry {index} needs at least two lines")
+            imbalance = sum(cents for _, cents in lines)
+            if imbalance:
+                raise UnbalancedEntryError(index, imbalance)
+            pending.append((stamp, key, lines))
+
+        if pending:
+            # Provisional ids were handed out in insertion order, so
+            # interning in the same order reproduces them.
+            for name in new_accounts:
+                self._account_id(name)
+            result.first_sequence = len(self._timestamps) + 1
+            for stamp, key, lines in pending:
+                self._apply(stamp, key, lines, journal=True)
+            result.last_sequence = len(self._timestamps)
+            result.posted = len(pending)
+            self.sync()
+        return result
+
+    def sync(self) -> None:
+        if self._file is not None and self._buffer:
+            self._file.write(self._buffer)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._buffer.clear()
+
+    def close(self) -> None:
+        if self._file is not None and not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    # ----------------------------------------------------------------- reads
+    def balance(self, account: str, as_of: Optional[float] = None) -> int:
+        """Balance in cents, now or after every entry stamped <= ``as_of``."""
+
+        account_id = self._accounts.get(account)
+        if account_id is None:
+            return 0
+        if as_of is None:
+            return self._balances[account_id]
+
+        entries = bisect_right(self._timestamps, as_of)
+        position = bisect_right(self._checkpoint_entries, entries) - 1
+        checkpoint = self._checkpoints[position]
+        base = checkpoint.balances
+        total = base[account_id] if account_id < len(base) else 0
+        start = (
+            self._line_ends[checkpoint.entries - 1]
+            if checkpoint.entries
+            else 0
+        )
+        stop = self._line_ends[entries - 1] if entries else 0
+        accounts = self._line_accounts[start:stop]
+        amounts = self._line_amounts[start:stop]
+        return total + sum(
+            cents
+            for owner, cents in zip(accounts, amounts)
+            if owner == account_id
+        )
+
+    def sequence_of(self, idempotency_key: str) -> Optional[int]:
+        return self._keys.get(idempotency_key)
+
+    # ------------------------------------------------------------- internals
+    def _account_id(self, name: str) -> int:
+        account_id = self._accounts.get(name)
+        if account_id is None:
+            account_id = len(self._names)
+            self._accounts[name] = account_id
+            self._names.append(name)
+            self._balances.append(0)
+            if self.path is not None:
+                self._frame(
+                    ACCOUNT.pack(ACCOUNT_RECORD, account_id) + name.encode()
+                )
+        return account_id
+
+    def _apply(
+        self,
+        stamp: float,
+        key: Optional[str],
+        lines: List[Tuple[int, int]],
+        journal: bool,
+    ) -> None:
+        # Columns first: they are the typed arrays that can refuse a value.
+        for account_id, cents in lines:
+            self._line_accounts.append(account_id)
+            self._line_amounts.append(cents)
+        balances = self._balances
+        for account_id, cents in lines:
+            balances[account_id] += cents
+        self._timestamps.append(stamp)
+        self._line_ends.append(len(self._line_amounts))
+        sequence = len(self._timestamps)
+        if key is not None:
+            self._keys[key] = sequence
+        if journal and self.path is not None:
+            key_raw = key.encode() if key is not None else b""
+            self._frame(
+                b"".join(
+                    (
+                        ENTRY.pack(
+                            ENTRY_RECORD,
+                            sequence,
+                            stamp,
+                            len(lines),
+                            len(key_raw),
+                        ),
+                        key_raw,
+                        *[LINE.pack(a, c) for a, c in lines],
+                    )
+                )
+            )
+        if sequence % self.checkpoint_every == 0:
+            self._checkpoints.append(_Checkpoint(sequence, balances.copy()))
+            self._checkpoint_entries.append(sequence)
+
+    def _frame(self, payload: bytes) -> None:
+        self._buffer += FRAME.pack(len(payload), zlib.crc32(payload))
+        self._buffer += payload
+
+    def _replay(self) -> None:
+        data = self.path.read_bytes()
+        size = len(data)
+        view = memoryview(data)
+        position = 0
+        frame_size = FRAME.size
+        while position + frame_size <= size:
+            length, checksum = FRAME.unpack_from(view, position)
+            body = position + frame_size
+            end = body + length
+            if end > size or zlib.crc32(view[body:end]) != checksum:
+                break
+            kind = view[body]
+            if kind == ACCOUNT_RECORD:
+                _, account_id = ACCOUNT.unpack_from(view, body)
+                name = bytes(view[body + ACCOUNT.size:end]).decode()
+                if account_id != len(self._names):
+                    break
+                self._accounts[name] = account_id
+                self._names.append(name)
+                self._balances.append(0)
+            elif kind == ENTRY_RECORD:
+                _, _, stamp, count, key_len = ENTRY.unpack_from(view, body)
+                cursor = body + ENTRY.size
+                key = (
+                    bytes(view[cursor:cursor + key_len]).decode()
+                    if key_len
+                    else None
+                )
+                cursor += key_len
+                lines = [
+                    LINE.unpack_from(view, cursor + i * LINE.size)
+                    for i in range(count)
+                ]
+                self._apply(stamp, key, lines, journal=False)
+            else:
+                break
+            position = end
+        view.release()
+        if position < size:
+            with open(self.path, "r+b") as handle:
+                handle.truncate(position)
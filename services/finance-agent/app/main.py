@@ -1,9 +1,26 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 
-app = FastAPI(title="Finance Agent")
+from .ledger import Ledger, LedgerError
+
+# Single-sided postings from /ledger are balanced against this account.
+SUSPENSE_ACCOUNT = "SUSPENSE"
+
+ledger_store = Ledger(os.environ.get("LEDGER_JOURNAL_PATH"))
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    yield
+    ledger_store.close()
+
+
+app = FastAPI(title="Finance Agent", lifespan=lifespan)
 
 
 class LedgerEntry(BaseModel):
@@ -11,6 +28,47 @@ class LedgerEntry(BaseModel):
     amount: float
 
 
+class JournalEntry(BaseModel):
+    lines: list[LedgerEntry]
+    idempotency_key: str | None = None
+    timestamp: float | None = None
+
+
+class JournalBatch(BaseModel):
+    entries: list[JournalEntry]
+
+
 @app.post("/ledger")
 async def ledger(payload: LedgerEntry):
+    try:
+        ledger_store.post(
+            [
+                (payload.account, payload.amount),
+                (SUSPENSE_ACCOUNT, -payload.amount),
+            ]
+        )
+    except LedgerError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
     return {"account": payload.account, "amount": payload.amount}
+
+
+@app.post("/ledger/entries")
+async def post_entries(payload: JournalBatch):
+    try:
+        result = ledger_store.post_many(
+            [entry.model_dump() for entry in payload.entries]
+        )
+    except LedgerError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return {
+        "posted": result.posted,
+        "duplicates": result.duplicates,
+        "first_sequence": result.first_sequence,
+        "last_sequence": result.last_sequence,
+    }
+
+
+@app.get("/ledger/balances/{account}")
+async def balance(account: str, as_of: float | None = None):
+    cents = ledger_store.balance(account, as_of)
+    return {"account": account, "balance": cents / 100, "as_of": as_of}
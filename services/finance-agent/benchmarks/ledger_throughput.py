@@ -0,0 +1,80 @@
+"""Posting throughput of the finance ledger.
+
+Run from the service root: ``python benchmarks/ledger_throughput.py``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SERVICE_ROOT = Path(__file__).resolve().parents[1]
+if str(SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(SERVICE_ROOT))
+
+from app.ledger import Ledger  # noqa: E402
+
+
+def build_entries(count: int, accounts: int, seed: int) -> list:
+    rng = random.Random(seed)
+    names = [f"ACC-{i:05d}" for i in range(accounts)]
+    entries = []
+    for i in range(count):
+        debit, credit = rng.sample(names, 2)
+        amount = rng.randint(1, 1_000_000) / 100
+        entries.append(
+            {
+                "lines": [(debit, amount), (credit, -amount)],
+                "idempotency_key": f"bench-{i}",
+                "timestamp": 1_700_000_000 + i * 0.01,
+            }
+        )
+    return entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=500_000)
+    parser.add_argument("--accounts", type=int, default=5_000)
+    parser.add_argument("--batch", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    entries = build_entries(args.entries, args.accounts, args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = Ledger(Path(tmp) / "ledger.journal")
+        started = time.perf_counter()
+        for start in range(0, len(entries), args.batch):
+            ledger.post_many(entries[start:start + args.batch])
+        ledger.close()
+        elapsed = time.perf_counter() - started
+
+        queries = 10_000
+        rng = random.Random(args.seed)
+        names = ledger.accounts
+        first = entries[0]["timestamp"]
+        last = entries[-1]["timestamp"]
+        query_started = time.perf_counter()
+        for _ in range(queries):
+            ledger.balance(rng.choice(names), rng.uniform(first, last))
+        query_elapsed = time.perf_counter() - query_started
+
+        replay_started = time.perf_counter()
+        replayed = Ledger(Path(tmp) / "ledger.journal")
+        replay_elapsed = time.perf_counter() - replay_started
+        assert len(replayed) == len(ledger)
+        replayed.close()
+
+    print(f"entries posted:        {args.entries:,}")
+    print(f"entries/sec:           {args.entries / elapsed:,.0f}")
+    print(f"postings (lines)/sec:  {2 * args.entries / elapsed:,.0f}")
+    print(f"as-of query (us):      {1e6 * query_elapsed / queries:,.1f}")
+    print(f"replay (s):            {replay_elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,3 +23,28 @@ def test_ledger_requires_amount():
     assert response.status_code == 422
     body = response.json()
     assert body["detail"][0]["loc"][-1] == "amount"
+
+
+def test_bulk_entries_and_balance():
+    entries = [
+        {
+            "lines": [
+                {"account": "CASH-1", "amount": 40.0},
+                {"account": "AP-1", "amount": -40.0},
+            ],
+            "idempotency_key": "bulk-1",
+        }
+    ]
+    response = client.post("/ledger/entries", json={"entries": entries})
+    assert response.status_code == 200
+    assert response.json()["posted"] == 1
+    repeat = client.post("/ledger/entries", json={"entries": entries})
+    assert repeat.json()["duplicates"] == ["bulk-1"]
+    balance = client.get("/ledger/balances/CASH-1")
+    assert balance.json()["balance"] == 40.0
+
+
+def test_bulk_entries_reject_unbalanced():
+    entries = [{"lines": [{"account": "CASH-2", "amount": 1.0}]}]
+    response = client.post("/ledger/entries", json={"entries": entries})
+    assert response.status_code == 422
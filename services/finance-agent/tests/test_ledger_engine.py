@@ -0,0 +1,142 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+SERVICE_ROOT = Path(__file__).resolve().parents[1]
+if str(SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(SERVICE_ROOT))
+
+from app.ledger import (  # noqa: E402
+    Ledger,
+    LedgerError,
+    UnbalancedEntryError,
+)
+
+
+def entry(debit, credit, amount, key=None, timestamp=None):
+    return {
+        "lines": [(debit, amount), (credit, -amount)],
+        "idempotency_key": key,
+        "timestamp": timestamp,
+    }
+
+
+def test_balances_in_cents():
+    ledger = Ledger()
+    ledger.post_many(
+        [
+            entry("cash", "revenue", 0.1, timestamp=1),
+            entry("cash", "revenue", 0.2, timestamp=2),
+        ]
+    )
+    assert ledger.balance("cash") == 30
+    assert ledger.balance("revenue") == -30
+    assert ledger.balance("unknown") == 0
+
+
+def test_unbalanced_batch_posts_nothing():
+    ledger = Ledger()
+    batch = [
+        entry("cash", "revenue", 10),
+        {"lines": [("cash", 5), ("revenue", -4)]},
+    ]
+    with pytest.raises(UnbalancedEntryError) as info:
+        ledger.post_many(batch)
+    assert info.value.index == 1
+    assert info.value.imbalance_cents == 100
+    assert len(ledger) == 0
+    assert ledger.balance("cash") == 0
+
+
+@pytest.mark.parametrize(
+    "amount", [1e18, -(10**17), float("nan"), float("inf"), "1e30", "abc"]
+)
+def test_out_of_range_amounts_post_nothing(amount):
+    ledger = Ledger()
+    ledger.post_many([entry("cash", "revenue", 5)])
+    with pytest.raises(LedgerError):
+        ledger.post_many(
+            [entry("a", "b", 1), {"lines": [("A", amount), ("S", -1)]}]
+        )
+    with pytest.raises(LedgerError):
+        ledger.post_many([{"lines": [("A", amount), ("SUSPENSE", amount)]}])
+    assert len(ledger) == 1
+    assert ledger.accounts == ["cash", "revenue"]
+    assert ledger.balance("A") == 0
+    assert ledger.balance("cash") == 500
+
+
+def test_rejected_batch_interns_no_accounts(tmp_path):
+    path = tmp_path / "ledger.journal"
+    ledger = Ledger(path)
+    ledger.post_many([entry("cash", "ap", 1)])
+    size = path.stat().st_size
+    with pytest.raises(UnbalancedEntryError):
+        ledger.post_many(
+            [entry("x", "y", 1), {"lines": [("x", 1), ("z", -2)]}]
+        )
+    assert ledger.accounts == ["cash", "ap"]
+    assert path.stat().st_size == size
+    ledger.post_many([entry("y", "cash", 2)])
+    assert ledger.accounts == ["cash", "ap", "y"]
+    assert Ledger(path).balance("y") == 200
+
+
+def test_idempotency_keys_skip_repeats():
+    ledger = Ledger()
+    first = ledger.post_many(
+        [entry("cash", "ap", 5, "k1"), entry("cash", "ap", 5, "k1")]
+    )
+    second = ledger.post_many([entry("cash", "ap", 5, "k1")])
+    assert first.posted == 1
+    assert first.duplicates == ["k1"]
+    assert second.posted == 0
+    assert ledger.balance("cash") == 500
+    assert ledger.sequence_of("k1") == 1
+
+
+def test_timestamps_must_not_go_backwards():
+    ledger = Ledger()
+    ledger.post_many([entry("cash", "ap", 1, timestamp=10)])
+    with pytest.raises(LedgerError):
+        ledger.post_many([entry("cash", "ap", 1, timestamp=9)])
+
+
+def test_point_in_time_balance_across_checkpoints():
+    ledger = Ledger(checkpoint_every=3)
+    ledger.post_many(
+        [entry("cash", "revenue", i, timestamp=i) for i in range(1, 11)]
+    )
+    for as_of in range(0, 12):
+        expected = sum(range(1, min(as_of, 10) + 1)) * 100
+        assert ledger.balance("cash", as_of) == expected
+
+
+def test_acknowledged_entries_are_durable(tmp_path):
+    path = tmp_path / "ledger.journal"
+    Ledger(path).post([("A", 5), ("B", -5)], "k1")
+    restored = Ledger(path)
+    assert len(restored) == 1
+    assert restored.sequence_of("k1") == 1
+    assert restored.balance("A") == 500
+
+
+def test_journal_replay_and_torn_tail(tmp_path):
+    path = tmp_path / "ledger.journal"
+    ledger = Ledger(path)
+    ledger.post_many(
+        [entry("cash", "ar", i, f"k{i}", timestamp=i) for i in range(1, 6)]
+    )
+    ledger.close()
+    with open(path, "ab") as handle:
+        handle.write(b"\x20\x00\x00\x00partial")
+
+    restored = Ledger(path)
+    assert len(restored) == 5
+    assert restored.balance("cash") == 1500
+    assert restored.balance("ar", 2) == -300
+    assert restored.post_many([entry("cash", "ar", 1, "k3")]).posted == 0
+    restored.post_many([entry("cash", "ar", 1, "k6", timestamp=6)])
+    restored.close()
+    assert Ledger(path).balance("cash") == 1600
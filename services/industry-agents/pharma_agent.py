@@ -16,6 +16,7 @@ if SDK_PATH.exists() and str(SDK_PATH) not in sys.path:
 agent_sdk_module = importlib.import_module("oru_agent_sdk")
 AgentContext = agent_sdk_module.AgentContext
 BaseAgent = agent_sdk_module.BaseAgent
+shared_lot_genealogy = agent_sdk_module.shared_lot_genealogy
 
 
 @dataclass(slots=True)
@@ -87,6 +88,7 @@ class PharmaComplianceAgent(BaseAgent):
             },
         )
         super().__init__(context=context)
+        self.genealogy = shared_lot_genealogy()
 
     async def validate_batch_release(self, batch_id: str) -> Decision:
         """Validate batch for release per FDA requirements."""
@@ -99,6 +101,11 @@ class PharmaComplianceAgent(BaseAgent):
             "dissolution": "pass",
         }
         deviations_open = 0
+        input_lots = (
+            self.genealogy.backward(batch_id).lots()
+            if batch_id in self.genealogy
+            else []
+        )
         status = (
             "release_ready"
             if electronic_signatures_ok and deviations_open == 0
@@ -123,6 +130,7 @@ class PharmaComplianceAgent(BaseAgent):
                 "quality_tests": quality_tests,
                 "electronic_signatures": electronic_signatures_ok,
                 "deviations": deviations_open,
+                "input_lots": input_lots,
             },
         )
 
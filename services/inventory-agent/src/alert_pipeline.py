@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Tuple
+
+Fingerprint = Tuple[str, str, str]
+
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+
+@dataclass(slots=True)
+class AlertDigest:
+    """Periodic roll-up of low-severity alerts."""
+
+    window_start: datetime
+    window_end: datetime
+    alerts: List[Any]
+    occurrences: Dict[Fingerprint, int]
+    type: str = "ALERT_DIGEST"
+    severity: str = "low"
+
+    @property
+    def message(self) -> str:
+        total = sum(self.occurrences.values())
+        return (
+            f"{len(self.alerts)} alerts ({total} occurrences) since "
+            f"{self.window_start.isoformat(timespec='minutes')}"
+        )
+
+
+@dataclass(slots=True)
+class DispatchReport:
+    delivered: Dict[str, int] = field(default_factory=dict)
+    suppressed: int = 0
+    digested: int = 0
+    digests_sent: int = 0
+
+
+class AlertTransport(Protocol):
+    async def send_batch(self, channel: str, batch: List[Any]) -> None:
+        ...
+
+
+class LocalTransport:
+    """In-process transport that records batches; used for tests and dev."""
+
+    def __init__(self) -> None:
+        self.batches: List[Tuple[str, List[Any]]] = []
+
+    async def send_batch(self, channel: str, batch: List[Any]) -> None:
+        await asyncio.sleep(0)
+        self.batches.append((channel, list(batch)))
+
+    @property
+    def sent(self) -> List[Any]:
+        return [alert for _, batch in self.batches for alert in batch]
+
+
+class AlertPipeline:
+    """Deduplicates, digests and batches copilot alerts per channel."""
+
+    def __init__(
+        self,
+        channels: Iterable[str],
+        transports: Optional[Dict[str, AlertTransport]] = None,
+        suppression_window: timedelta = timedelta(hours=1),
+        digest_interval: timedelta = timedelta(hours=1),
+        digest_severities: Iterable[str] = ("low", "medium"),
+        max_fingerprints: int = 50_000,
+        batch_size: int = 100,
+    ) -> None:
+        self.channels = list(channels)
+        transports = transports or {}
+        self.transports: Dict[str, AlertTransport] = {
+            channel: transports.get(channel) or LocalTransport()
+            for channel in self.channels
+        }
+        self.suppression_window = suppression_window
+        self.digest_interval = digest_interval
+        self.digest_severities = frozenset(digest_severities)
+        self.max_fingerprints = max_fingerprints
+        self.batch_size = batch_size
+        self._seen: "OrderedDict[Fingerprint, Tuple[datetime, int]]" = (
+            OrderedDict()
+        )
+        self._digest: "OrderedDict[Fingerprint, Any]" = OrderedDict()
+        self._digest_counts: Dict[Fingerprint, int] = {}
+        self._digest_started: Optional[datetime] = None
+
+    def fingerprint(self, alert: Any) -> Fingerprint:
+        """Key alerts by type, SKU and facility."""
+
+        if alert.item is not None:
+            return (alert.type, alert.item.sku, alert.item.facility_id)
+        if alert.items:
+            skus = ",".join(sorted({item.sku for item in alert.items}))
+            facilities = ",".join(
+                sorted({item.facility_id for item in alert.items})
+            )
+            return (alert.type, skus, facilities)
+        if alert.affected_inventory:
+            skus = ",".join(
+                sorted({entry.sku for entry in alert.affected_inventory})
+            )
+            locations = ",".join(
+                sorted({entry.location for entry in alert.affected_inventory})
+            )
+            return (alert.type, skus, locations)
+        return (alert.type, "", "")
+
+    def admit(self, alert: Any, now: datetime) -> bool:
+        """Return False when an equal or lower severity repeat is in window."""
+
+        key = self.fingerprint(alert)
+        rank = SEVERITY_RANK.get(alert.severity, 0)
+        previous = self._seen.get(key)
+        if previous is not None:
+            last_sent, last_rank = previous
+            if now - last_sent < self.suppression_window and rank <= last_rank:
+                self._seen.move_to_end(key)
+                return False
+        self._seen[key] = (now, rank)
+        self._seen.move_to_end(key)
+        while len(self._seen) > self.max_fingerprints:
+            self._seen.popitem(last=False)
+        return True
+
+    async def process(
+        self, alerts: Iterable[Any], now: Optional[datetime] = None
+    ) -> DispatchReport:
+        now = now or datetime.utcnow()
+        report = DispatchReport()
+        immediate: List[Any] = []
+        for alert in alerts:
+            if not self.admit(alert, now):
+                report.suppressed += 1
+                self._count_repeat(alert)
+                continue
+            if alert.severity in self.digest_severities:
+                self._add_to_digest(alert, now)
+                report.digested += 1
+            else:
+                immediate.append(alert)
+
+        digest = self.flush_digest(now)
+        if digest is not None:
+            immediate.append(digest)
+            report.digests_sent = 1
+        report.delivered = await self.deliver(immediate)
+        return report
+
+    def flush_digest(
+        self, now: Optional[datetime] = None, force: bool = False
+    ) -> Optional[AlertDigest]:
+        """Close the digest window once ``digest_interval`` has elapsed."""
+
+        now = now or datetime.utcnow()
+        if not self._digest or self._digest_started is None:
+            return None
+        if not force and now - self._digest_started < self.digest_interval:
+            return None
+        digest = AlertDigest(
+            window_start=self._digest_started,
+            window_end=now,
+            alerts=list(self._digest.values()),
+            occurrences=dict(self._digest_counts),
+        )
+        self._digest.clear()
+        self._digest_counts.clear()
+        self._digest_started = None
+        return digest
+
+    async def deliver(self, alerts: List[Any]) -> Dict[str, int]:
+        """Send ``alerts`` to every channel in ``batch_size`` chunks."""
+
+        if not alerts:
+            return {channel: 0 for channel in self.channels}
+        batches = [
+            alerts[start:start + self.batch_size]
+            for start in range(0, len(alerts), self.batch_size)
+        ]
+        await asyncio.gather(
+            *(
+                self.transports[channel].send_batch(channel, batch)
+                for channel in self.channels
+                for batch in batches
+            )
+        )
+        return {channel: len(alerts) for channel in self.channels}
+
+    def _count_repeat(self, alert: Any) -> None:
+        # A suppressed repeat is not re-queued, but the open digest still
+        # reports how often its fingerprint fired.
+        key = self.fingerprint(alert)
+        if key in self._digest_counts:
+            self._digest_counts[key] += 1
+
+    def _add_to_digest(self, alert: Any, now: datetime) -> None:
+        if self._digest_started is None:
+            self._digest_started = now
+        key = self.fingerprint(alert)
+        self._digest[key] = alert
+        self._digest.move_to_end(key)
+        self._digest_counts[key] = self._digest_counts.get(key, 0) + 1
+        while len(self._digest) > self.max_fingerprints:
+            dropped, _ = self._digest.popitem(last=False)
+            self._digest_counts.pop(dropped, None)
@@ -3,21 +3,38 @@ from __future__ import annotations
 import asyncio
 import importlib
 import sys
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-import pandas as pd
+import numpy as np
 
 REPO_ROOT = Path(__file__).resolve().parents[3]
 SDK_PATH = REPO_ROOT / "packages" / "agent-sdk"
 if SDK_PATH.exists() and str(SDK_PATH) not in sys.path:
     sys.path.append(str(SDK_PATH))
 
+SRC_PATH = Path(__file__).resolve().parent
+if str(SRC_PATH) not in sys.path:
+    sys.path.append(str(SRC_PATH))
+
 agent_sdk_module = importlib.import_module("oru_agent_sdk")
 AgentContext = agent_sdk_module.AgentContext
 BaseAgent = agent_sdk_module.BaseAgent
+DEFAULT_PASS_RATE = agent_sdk_module.DEFAULT_PASS_RATE
+SharedSupplierQualityIndex = agent_sdk_module.SharedSupplierQualityIndex
+SupplierQualityIndex = agent_sdk_module.SupplierQualityIndex
+default_supplier_index = agent_sdk_module.default_supplier_index
+shared_lot_genealogy = agent_sdk_module.shared_lot_genealogy
+
+stockout_engine_module = importlib.import_module("stockout_engine")
+StockoutProjection = stockout_engine_module.StockoutProjection
+StockoutProjectionEngine = stockout_engine_module.StockoutProjectionEngine
+
+alert_pipeline_module = importlib.import_module("alert_pipeline")
+AlertPipeline = alert_pipeline_module.AlertPipeline
+DispatchReport = alert_pipeline_module.DispatchReport
 
 
 @dataclass(slots=True)
@@ -29,6 +46,10 @@ class InventoryItem:
     temperature_zone: str
     predicted_date: Optional[datetime] = None
     daily_demand: float = 0.0
+    stockout_probability: Optional[float] = None
+    stockout_quantiles: Dict[float, Optional[datetime]] = field(
+        default_factory=dict
+    )
 
 
 @dataclass(slots=True)
@@ -63,13 +84,21 @@ class Alert:
     affected_inventory: Optional[List[TemperatureExcursion]] = None
     compliance_risk: bool = False
     predicted_stockout_date: Optional[datetime] = None
+    stockout_probability: Optional[float] = None
+    stockout_quantiles: Optional[Dict[float, Optional[datetime]]] = None
     recommended_order_qty: Optional[float] = None
 
 
 class InventoryCoPilot(BaseAgent):
     """Phase 1 monitoring and alerting agent for F&B inventory"""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        alert_pipeline: Optional[Any] = None,
+        supplier_index: Optional[Any] = None,
+        genealogy: Optional[Any] = None,
+        redis_client: Optional[Any] = None,
+    ) -> None:
         context = AgentContext(
             name="inventory-copilot-v1",
             queue="inventory.copilot",
@@ -81,6 +110,19 @@ class InventoryCoPilot(BaseAgent):
             },
         )
         super().__init__(context=context)
+        self.stockout_engine = StockoutProjectionEngine(threshold_days=7)
+        # Redis-backed so pass rates match the orchestrator's QA agent.
+        self.supplier_index = supplier_index or default_supplier_index(
+            redis_client
+        )
+        self.genealogy = genealogy or shared_lot_genealogy()
+        self.alert_pipeline = alert_pipeline or AlertPipeline(
+            channels=context.metadata["alert_channels"],
+            suppression_window=timedelta(hours=4),
+            digest_interval=timedelta(
+                seconds=context.metadata["monitoring_interval"] * 12
+            ),
+        )
 
     async def monitor_inventory(self) -> List[Alert]:
         """Phase 1: Detect operational issues and route alerts to humans."""
@@ -146,33 +188,63 @@ class InventoryCoPilot(BaseAgent):
                     severity="medium",
                     item=item,
                     predicted_stockout_date=item.predicted_date,
+                    stockout_probability=item.stockout_probability,
+                    stockout_quantiles=item.stockout_quantiles or None,
                     recommended_order_qty=self.calculate_reorder(item),
-                    message="{sku} will stock out by {date}".format(
-                        sku=item.sku,
-                        date=(
-                            item.predicted_date.date()
-                            if item.predicted_date
-                            else "N/A"
-                        ),
-                    ),
+                    message=self.stockout_message(item),
                 )
             )
 
         return alerts
 
+    async def run_monitoring_cycle(self) -> DispatchReport:
+        """Monitor once and fan alerts out through the dedup pipeline."""
+
+        alerts = await self.monitor_inventory()
+        return await self.alert_pipeline.process(alerts)
+
     async def suggest_qa_approval(self, qa_hold: QAHold) -> Dict[str, Any]:
         """Assist QA managers with review flows."""
 
         await asyncio.sleep(0)
         return {
             "test_results_summary": self.summarize_tests(qa_hold),
-            "historical_pass_rate": self.get_supplier_history(qa_hold),
+            "historical_pass_rate": await self.get_supplier_history(qa_hold),
             "risk_assessment": self.assess_risk(qa_hold),
             "recommendation": self.generate_recommendation(qa_hold),
+            "recall_scope": self.trace_hold(qa_hold),
             "confidence": 0.85,
             "requires_human_approval": True,
         }
 
+    async def record_qa_outcome(
+        self, qa_hold: QAHold, at: Optional[datetime] = None
+    ) -> Optional[bool]:
+        """Feed a completed hold's test results into the supplier index."""
+
+        return await self.supplier_index.record_tests(
+            qa_hold.supplier, qa_hold.tests, at, batch_id=qa_hold.batch_id
+        )
+
+    def trace_hold(self, qa_hold: QAHold) -> Dict[str, Any]:
+        """Upstream inputs and downstream lots/shipments of a held batch."""
+
+        if qa_hold.batch_id not in self.genealogy:
+            return {
+                "batch_id": qa_hold.batch_id,
+                "input_lots": [],
+                "downstream_lots": [],
+                "shipments": [],
+            }
+        upstream = self.genealogy.backward(qa_hold.batch_id)
+        downstream = self.genealogy.forward(qa_hold.batch_id)
+        return {
+            "batch_id": qa_hold.batch_id,
+            "input_lots": upstream.lots(),
+            "downstream_lots": downstream.lots(),
+            "shipments": downstream.shipments(),
+        }
+
     async def check_qa_hold_duration(self) -> List[QAHold]:
         await asyncio.sleep(0)
         now = datetime.utcnow()
@@ -222,32 +294,80 @@ class InventoryCoPilot(BaseAgent):
             )
         ]
 
-    async def predict_stockouts(self) -> List[InventoryItem]:
+    async def load_demand_snapshot(self) -> Dict[str, Any]:
+        """Catalog-wide on-hand and demand columns for stockout projection."""
+
         await asyncio.sleep(0)
-        df = pd.DataFrame(
-            [
-                {"sku": "YEAST-BLK", "qty": 90, "daily_demand": 40},
-                {"sku": "TOMATO-PUREE", "qty": 330, "daily_demand": 60},
-            ]
+        return {
+            "sku": ["YEAST-BLK", "TOMATO-PUREE"],
+            "facility_id": ["AUTO", "AUTO"],
+            "qty": [90.0, 330.0],
+            "daily_demand": [40.0, 60.0],
+            "demand_std": [8.0, 12.0],
+        }
+
+    async def predict_stockouts(self) -> List[InventoryItem]:
+        snapshot = await self.load_demand_snapshot()
+        projection = self.stockout_engine.project(
+            skus=snapshot["sku"],
+            on_hand=snapshot["qty"],
+            daily_demand=snapshot["daily_demand"],
+            demand_std=snapshot.get("demand_std"),
+            facility_ids=snapshot.get("facility_id"),
         )
-        df["days_left"] = (df["qty"] / df["daily_demand"]).round(1)
+        return self.materialize_stockouts(projection)
+
+    def materialize_stockouts(
+        self, projection: StockoutProjection
+    ) -> List[InventoryItem]:
+        """Build ``InventoryItem`` objects for below-threshold rows only."""
+
         forecasts: List[InventoryItem] = []
-        for row in df.itertuples():
-            predicted_date = datetime.utcnow() + timedelta(
-                days=float(row.days_left)
-            )
+        for idx in np.flatnonzero(projection.at_risk):
             forecasts.append(
                 InventoryItem(
-                    sku=row.sku,
-                    facility_id="AUTO",
-                    quantity=float(row.qty),
-                    days_until_expiry=int(row.days_left),
+                    sku=str(projection.skus[idx]),
+                    facility_id=str(projection.facility_ids[idx]),
+                    quantity=float(projection.on_hand[idx]),
+                    days_until_expiry=int(projection.days_left[idx]),
                     temperature_zone="ambient",
-                    predicted_date=predicted_date,
-                    daily_demand=float(row.daily_demand),
+                    predicted_date=projection.predicted_datetime(idx),
+                    daily_demand=float(projection.daily_demand[idx]),
+                    stockout_probability=(
+                        None
+                        if projection.stockout_probability is None
+                        else round(
+                            float(projection.stockout_probability[idx]), 4
+                        )
+                    ),
+                    stockout_quantiles=projection.quantile_datetimes(idx),
                 )
             )
-        return [item for item in forecasts if item.days_until_expiry < 7]
+        return forecasts
+
+    def stockout_message(self, item: InventoryItem) -> str:
+        """Predicted date plus, when demand variance is known, its spread."""
+
+        date = item.predicted_date.date() if item.predicted_date else "N/A"
+        message = f"{item.sku} will stock out by {date}"
+        if item.stockout_probability is not None:
+            message += (
+                f" ({item.stockout_probability:.0%} chance within "
+                f"{self.stockout_engine.threshold_days:g}d"
+            )
+            quantiles = sorted(
+                (quantile, at)
+                for quantile, at in item.stockout_quantiles.items()
+                if at is not None
+            )
+            if len(quantiles) > 1:
+                (low, earliest), (high, latest) = quantiles[0], quantiles[-1]
+                message += (
+                    f"; P{low * 100:g}-P{high * 100:g} "
+                    f"{earliest.date()} to {latest.date()}"
+                )
+            message += ")"
+        return message
 
     def calculate_reorder(self, item: InventoryItem) -> float:
         safety_factor = 1.35
@@ -262,13 +382,10 @@ class InventoryCoPilot(BaseAgent):
             "packaging": qa_hold.tests.get("packaging", "not_run"),
         }
 
-    def get_supplier_history(self, qa_hold: QAHold) -> Dict[str, float]:
-        history = pd.Series([0.98, 0.94, 0.91, 0.97])
-        return {
-            "supplier": qa_hold.supplier,
-            "rolling_pass_rate": round(history.mean(), 2),
-            "last_30_days": 0.93,
-        }
+    async def get_supplier_history(self, qa_hold: QAHold) -> Dict[str, Any]:
+        return await self.supplier_index.snapshot(
+            qa_hold.supplier, default=DEFAULT_PASS_RATE
+        )
 
     def assess_risk(self, qa_hold: QAHold) -> Dict[str, Any]:
         delta = datetime.utcnow() - qa_hold.hold_started_at
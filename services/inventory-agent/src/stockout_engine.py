@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from statistics import NormalDist
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+SECONDS_PER_DAY = 86_400
+
+
+def _normal_cdf(x: np.ndarray) -> np.ndarray:
+    """Vectorized standard normal CDF (Abramowitz-Stegun 7.1.26)."""
+
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (
+        0.254829592
+        + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429)))
+    )
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+@dataclass(slots=True)
+class StockoutProjection:
+    """Column-oriented projection for a full catalog snapshot."""
+
+    reference: datetime
+    skus: np.ndarray
+    facility_ids: np.ndarray
+    on_hand: np.ndarray
+    daily_demand: np.ndarray
+    days_left: np.ndarray
+    predicted_dates: np.ndarray
+    at_risk: np.ndarray
+    stockout_probability: Optional[np.ndarray] = None
+    quantile_dates: Dict[float, np.ndarray] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return int(self.skus.shape[0])
+
+    def predicted_datetime(self, idx: int) -> Optional[datetime]:
+        value = self.predicted_dates[idx]
+        if np.isnat(value):
+            return None
+        return value.astype("datetime64[us]").astype(datetime)
+
+    def quantile_datetimes(self, idx: int) -> Dict[float, Optional[datetime]]:
+        result: Dict[float, Optional[datetime]] = {}
+        for quantile, dates in self.quantile_dates.items():
+            value = dates[idx]
+            result[quantile] = (
+                None
+                if np.isnat(value)
+                else value.astype("datetime64[us]").astype(datetime)
+            )
+        return result
+
+
+class StockoutProjectionEngine:
+    """Projects days-of-cover for every SKU in one vectorized pass."""
+
+    def __init__(
+        self,
+        threshold_days: float = 7.0,
+        quantiles: Sequence[float] = (0.1, 0.5, 0.9),
+    ) -> None:
+        self.threshold_days = threshold_days
+        self.quantiles = tuple(quantiles)
+        self._z_scores = {
+            quantile: NormalDist().inv_cdf(1 - quantile)
+            for quantile in self.quantiles
+        }
+
+    def project(
+        self,
+        skus: Sequence[str],
+        on_hand: Sequence[float],
+        daily_demand: Sequence[float],
+        demand_std: Optional[Sequence[float]] = None,
+        facility_ids: Optional[Sequence[str]] = None,
+        reference: Optional[datetime] = None,
+    ) -> StockoutProjection:
+        """Compute days-left, predicted dates and the below-threshold mask.
+
+        ``demand_std`` is the standard deviation of the daily demand rate. When
+        supplied, each row also gets the probability of stocking out inside the
+        threshold window and the dates by which a stockout has happened with
+        the configured quantile probabilities.
+        """
+
+        reference = reference or datetime.utcnow()
+        sku_arr = np.asarray(skus, dtype=object)
+        qty = np.asarray(on_hand, dtype=np.float64)
+        demand = np.asarray(daily_demand, dtype=np.float64)
+        if facility_ids is None:
+            facility_arr = np.full(sku_arr.shape[0], "AUTO", dtype=object)
+        else:
+            facility_arr = np.asarray(facility_ids, dtype=object)
+
+        days_left = self._days_left(qty, demand)
+        ref64 = np.datetime64(reference, "s")
+        predicted_dates = self._to_dates(ref64, days_left)
+        at_risk = days_left < self.threshold_days
+
+        probability: Optional[np.ndarray] = None
+        quantile_dates: Dict[float, np.ndarray] = {}
+        if demand_std is not None:
+            sigma = np.asarray(demand_std, dtype=np.float64)
+            probability = self._stockout_probability(qty, demand, sigma)
+            for quantile, z_score in self._z_scores.items():
+                rate = demand + z_score * sigma
+                quantile_days = self._days_left(qty, rate)
+                quantile_dates[quantile] = self._to_dates(ref64, quantile_days)
+
+        return StockoutProjection(
+            reference=reference,
+            skus=sku_arr,
+            facility_ids=facility_arr,
+            on_hand=qty,
+            daily_demand=demand,
+            days_left=days_left,
+            predicted_dates=predicted_dates,
+            at_risk=at_risk,
+            stockout_probability=probability,
+            quantile_dates=quantile_dates,
+        )
+
+    def _days_left(self, qty: np.ndarray, rate: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            days = np.where(rate > 0, qty / rate, np.inf)
+        return np.round(np.maximum(days, 0.0), 1)
+
+    def _to_dates(self, ref64: np.datetime64, days: np.ndarray) -> np.ndarray:
+        finite = np.isfinite(days)
+        seconds = np.where(finite, days * SECONDS_PER_DAY, 0).astype(np.int64)
+        dates = ref64 + seconds.astype("timedelta64[s]")
+        dates[~finite] = np.datetime64("NaT")
+        return dates
+
+    def _stockout_probability(
+        self, qty: np.ndarray, demand: np.ndarray, sigma: np.ndarray
+    ) -> np.ndarray:
+        """P(rate > qty / threshold) for a normally distributed demand rate."""
+
+        critical_rate = qty / self.threshold_days
+        safe_sigma = np.where(sigma > 0, sigma, 1.0)
+        z = (critical_rate - demand) / safe_sigma
+        probability = 1.0 - _normal_cdf(z)
+        deterministic = (demand > critical_rate).astype(np.float64)
+        return np.where(sigma > 0, probability, deterministic)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Hashable, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def frame_fingerprint(frame: pd.DataFrame) -> str:
+    """Content hash of a frame: values, index, column names and dtypes."""
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(frame.columns)).encode())
+    digest.update(repr([str(dtype) for dtype in frame.dtypes]).encode())
+    if len(frame):
+        hashed = pd.util.hash_pandas_object(frame, index=True)
+        digest.update(hashed.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class InventoryAvailabilityIndex:
+    """On-hand quantity per component code, aggregated once per snapshot.
+
+    Codes are held in a hashed ``pd.Index`` so a whole BOM resolves with a
+    single ``get_indexer`` call instead of one boolean mask per component.
+    """
+
+    def __init__(self, codes: pd.Index, quantities: np.ndarray) -> None:
+        self.codes = codes
+        self.quantities = quantities
+        self._padded = np.append(quantities, 0.0)
+
+    @classmethod
+    def from_frame(
+        cls,
+        inventory: pd.DataFrame,
+        code_column: str = "code",
+        qty_column: str = "qty",
+    ) -> "InventoryAvailabilityIndex":
+        if inventory.empty:
+            return cls(pd.Index([], dtype=object), np.zeros(0))
+        totals = inventory.groupby(code_column, sort=False)[qty_column].sum()
+        return cls(
+            pd.Index(totals.index),
+            totals.to_numpy(dtype=np.float64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def positions(self, codes: Iterable[str]) -> np.ndarray:
+        """Index positions for ``codes``; ``-1`` where a code is unknown."""
+
+        return self.codes.get_indexer(pd.Index(list(codes)))
+
+    def lookup(self, codes: Iterable[str]) -> np.ndarray:
+        """Vectorized availability for ``codes`` (0 for unknown codes)."""
+
+        return self._padded[self.positions(codes)]
+
+    def available(self, code: str) -> float:
+        position = self.codes.get_indexer([code])[0]
+        return float(self.quantities[position]) if position >= 0 else 0.0
+
+
+class AvailabilityIndexCache:
+    """Keeps the index of the current snapshot alive across orders.
+
+    Callers that version their inventory pass a ``snapshot`` key; the
+    frame is then never read again until the key changes, so an in-place
+    update must come with a new key. Without a key the frame's content
+    fingerprint is used, which costs one hashing pass per lookup.
+    """
+
+    def __init__(self) -> None:
+        self._key: Optional[Tuple[str, Hashable]] = None
+        self._index: Optional[InventoryAvailabilityIndex] = None
+
+    def get(
+        self,
+        inventory: pd.DataFrame,
+        snapshot: Optional[Hashable] = None,
+    ) -> InventoryAvailabilityIndex:
+        if snapshot is not None:
+            key: Tuple[str, Hashable] = ("snapshot", snapshot)
+        else:
+            key = ("content", frame_fingerprint(inventory))
+        if self._key != key or self._index is None:
+            self._index = InventoryAvailabilityIndex.from_frame(inventory)
+            self._key = key
+        return self._index
+
+    def clear(self) -> None:
+        self._key = None
+        self._index = None
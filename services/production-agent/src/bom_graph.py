@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+Requirements = Dict[str, float]
+
+
+class BOMCycleError(ValueError):
+    def __init__(self, path: List[str]):
+        message = f"BOM cycle detected: {' -> '.join(path)}"
+        super().__init__(message)
+        self.path = path
+
+
+class BOMNotFoundError(ValueError):
+    def __init__(self, item: str):
+        super().__init__(f"No BOM registered for {item}")
+        self.item = item
+
+
+@dataclass(slots=True)
+class BOMRevision:
+    """One revision of a (sub-)assembly recipe.
+
+    ``components`` use ``BOMComponent`` semantics: ``quantity_per_batch`` is
+    consumed per ``output_qty`` units of ``item`` before yield losses.
+    """
+
+    item: str
+    revision: str
+    components: List[Any]
+    output_qty: float = 1.0
+    yield_pct: float = 1.0
+
+
+class BOMGraph:
+    """Multi-level BOM with memoized per-unit requirement vectors.
+
+    The exploded leaf requirements of every sub-assembly are cached by
+    ``(item, revision)`` so shared intermediates are resolved once. Registering
+    a new revision drops the cached vectors of the item and every ancestor.
+    Revisions are validated before they are stored, so a bad yield or a
+    cycle is rejected at ``register`` and the graph always stays acyclic.
+    """
+
+    def __init__(self) -> None:
+        self._active: Dict[str, BOMRevision] = {}
+        self._parents: Dict[str, Set[str]] = defaultdict(set)
+        self._cache: Dict[Tuple[str, str], Requirements] = {}
+        self._leaves: Dict[str, Any] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._active
+
+    def register(self, revision: BOMRevision) -> None:
+        if not 0 < revision.yield_pct <= 1:
+            raise ValueError(
+                f"{revision.item} rev {revision.revision}: yield_pct must be "
+                f"in (0, 1], got {revision.yield_pct}"
+            )
+        if not revision.output_qty > 0:
+            raise ValueError(
+                f"{revision.item} rev {revision.revision}: output_qty must be "
+                f"positive, got {revision.output_qty}"
+            )
+        path = self._path_to(revision.item, revision.components)
+        if path is not None:
+            raise BOMCycleError([revision.item] + path)
+        previous = self._active.get(revision.item)
+        if previous is not None:
+            for component in previous.components:
+                self._parents[component.code].discard(revision.item)
+            self._cache.pop((previous.item, previous.revision), None)
+        self._active[revision.item] = revision
+        for component in revision.components:
+            self._parents[component.code].add(revision.item)
+            self._leaves.setdefault(component.code, component)
+        self.invalidate(revision.item)
+
+    def _path_to(
+        self, target: str, components: List[Any]
+    ) -> Optional[List[str]]:
+        """Sub-assembly path from one of ``components`` down to ``target``."""
+
+        stack = [
+            (component.code, [component.code]) for component in components
+        ]
+        seen: Set[str] = set()
+        while stack:
+            current, path = stack.pop()
+            if current == target:
+                return path
+            if current in seen:
+                continue
+            seen.add(current)
+            active = self._active.get(current)
+            if active is not None:
+                stack.extend(
+                    (component.code, path + [component.code])
+                    for component in active.components
+                )
+        return None
+
+    def revision(self, item: str) -> Optional[BOMRevision]:
+        return self._active.get(item)
+
+    def invalidate(self, item: str) -> None:
+        """Drop cached vectors for ``item`` and everything built from it."""
+
+        stack = [item]
+        seen: Set[str] = set()
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            active = self._active.get(current)
+            if active is not None:
+                self._cache.pop((current, active.revision), None)
+            stack.extend(self._parents.get(current, ()))
+
+    def component(self, code: str) -> Optional[Any]:
+        """Metadata (description, uom, allergen) for a leaf component."""
+
+        return self._leaves.get(code)
+
+    def unit_requirements(self, item: str) -> Requirements:
+        """Leaf quantities needed for one unit of ``item``.
+
+        Returns a copy; the cached resolution is shared by every parent.
+        """
+
+        return dict(self._resolve(item))
+
+    def explode(self, item: str, quantity: float) -> Requirements:
+        return {
+            code: qty * quantity
+            for code, qty in self._resolve(item).items()
+        }
+
+    def _resolve(self, item: str) -> Requirements:
+        revision = self._active.get(item)
+        if revision is None:
+            raise BOMNotFoundError(item)
+        key = (item, revision.revision)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        self.cache_misses += 1
+
+        scale = 1.0 / (revision.output_qty * revision.yield_pct)
+        requirements: Requirements = defaultdict(float)
+        for component in revision.components:
+            qty = component.quantity_per_batch * scale
+            if component.code in self._active:
+                child = self._resolve(component.code)
+                for code, child_qty in child.items():
+                    requirements[code] += child_qty * qty
+            else:
+                requirements[component.code] += qty
+
+        resolved = dict(requirements)
+        self._cache[key] = resolved
+        return resolved
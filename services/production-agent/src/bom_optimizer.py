@@ -5,8 +5,9 @@ import sys
 from dataclasses import dataclass
 from datetime import date
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Union
 
+import numpy as np
 import pandas as pd
 
 REPO_ROOT = Path(__file__).resolve().parents[3]
@@ -18,6 +19,40 @@ agent_sdk_module = importlib.import_module("oru_agent_sdk")
 AgentContext = agent_sdk_module.AgentContext
 BaseAgent = agent_sdk_module.BaseAgent
 
+SRC_PATH = Path(__file__).resolve().parent
+if str(SRC_PATH) not in sys.path:
+    sys.path.append(str(SRC_PATH))
+
+availability_module = importlib.import_module("availability_index")
+AvailabilityIndexCache = availability_module.AvailabilityIndexCache
+InventoryAvailabilityIndex = availability_module.InventoryAvailabilityIndex
+
+bom_graph_module = importlib.import_module("bom_graph")
+BOMCycleError = bom_graph_module.BOMCycleError
+BOMGraph = bom_graph_module.BOMGraph
+BOMNotFoundError = bom_graph_module.BOMNotFoundError
+BOMRevision = bom_graph_module.BOMRevision
+
+mrp_module = importlib.import_module("mrp")
+BatchMRPPlanner = mrp_module.BatchMRPPlanner
+MRPResult = mrp_module.MRPResult
+
+capacity_module = importlib.import_module("capacity_allocator")
+CapacityAllocation = capacity_module.CapacityAllocation
+CapacityCalendar = capacity_module.CapacityCalendar
+CapacityWindowIndex = capacity_module.CapacityWindowIndex
+
+sequencing_module = importlib.import_module("sequencing")
+AllergenSequencer = sequencing_module.AllergenSequencer
+SequencePlan = sequencing_module.SequencePlan
+
+yield_spc_module = importlib.import_module("yield_spc")
+YieldSPCMonitor = yield_spc_module.YieldSPCMonitor
+YieldStats = yield_spc_module.YieldStats
+
+planning_module = importlib.import_module("planning_session")
+PlanningSession = planning_module.PlanningSession
+
 
 @dataclass(slots=True)
 class BOMComponent:
@@ -34,6 +69,7 @@ class ProductionOrder:
     batch_size: float
     regulatory_batch_limit: float
     requested_date: date
+    order_id: Optional[str] = None
 
 
 @dataclass(slots=True)
@@ -43,6 +79,13 @@ class AllergenRule:
     requires_dedicated_line: bool
 
 
+@dataclass(slots=True)
+class ProductionRun:
+    run_id: str
+    allergen: Optional[str]
+    duration_minutes: float
+
+
 class ProductionBOMOptimizer(BaseAgent):
     """Co-pilot that assists planners with BOM intelligence."""
 
@@ -62,45 +105,128 @@ class ProductionBOMOptimizer(BaseAgent):
             },
         )
         super().__init__(context=ctx)
+        self._availability = AvailabilityIndexCache()
+        self.bom_graph = BOMGraph()
+        self.mrp_planner = BatchMRPPlanner()
+        self.yield_monitor = YieldSPCMonitor()
+        self._session: Optional[PlanningSession] = None
+
+    def availability_index(
+        self, inventory: pd.DataFrame, snapshot: Optional[Hashable] = None
+    ) -> InventoryAvailabilityIndex:
+        """Aggregate an inventory snapshot once and reuse it across orders.
+
+        ``snapshot`` is the caller's version key for ``inventory``; without
+        one the frame is recognised by a content hash on every call.
+        """
+
+        return self._availability.get(inventory, snapshot)
 
     def explode_bom(
         self,
         order: ProductionOrder,
         bom: Iterable[BOMComponent],
-        inventory: pd.DataFrame,
+        inventory: Union[pd.DataFrame, InventoryAvailabilityIndex],
     ) -> pd.DataFrame:
         """Return component-level requirements with availability deltas."""
 
-        rows: List[Dict[str, Any]] = []
-        for component in bom:
-            required_qty = component.quantity_per_batch * order.batch_size
-            available = float(
-                inventory.loc[inventory["code"] == component.code, "qty"].sum()
-            )
-            rows.append(
-                {
-                    "code": component.code,
-                    "description": component.description,
-                    "required": required_qty,
-                    "available": available,
-                    "delta": available - required_qty,
-                    "uom": component.uom,
-                    "allergen": component.allergen,
-                }
-            )
-        df = pd.DataFrame(rows).sort_values("delta")
-        return df
+        if isinstance(inventory, pd.DataFrame):
+            inventory = self.availability_index(inventory)
+        components = list(bom)
+        df = pd.DataFrame(
+            {
+                "code": [c.code for c in components],
+                "description": [c.description for c in components],
+                "required": np.fromiter(
+                    (c.quantity_per_batch for c in components),
+                    dtype=np.float64,
+                    count=len(components),
+                )
+                * order.batch_size,
+                "uom": [c.uom for c in components],
+                "allergen": [c.allergen for c in components],
+            }
+        )
+        df.insert(3, "available", inventory.lookup(df["code"]))
+        df.insert(4, "delta", df["available"] - df["required"])
+        return df.sort_values("delta")
+
+    def register_bom_revision(self, revision: BOMRevision) -> None:
+        """Add or replace a (sub-)assembly recipe in the multi-level graph."""
+
+        self.bom_graph.register(revision)
+
+    def explode_multilevel(
+        self,
+        order: ProductionOrder,
+        inventory: Union[pd.DataFrame, InventoryAvailabilityIndex],
+    ) -> pd.DataFrame:
+        """Explode ``order.sku`` through every sub-assembly level to leaves."""
+
+        if isinstance(inventory, pd.DataFrame):
+            inventory = self.availability_index(inventory)
+        requirements = self.bom_graph.explode(order.sku, order.batch_size)
+        codes = list(requirements)
+        meta = [self.bom_graph.component(code) for code in codes]
+        df = pd.DataFrame(
+            {
+                "code": codes,
+                "description": [m.description for m in meta],
+                "required": np.fromiter(
+                    requirements.values(), dtype=np.float64, count=len(codes)
+                ),
+                "uom": [m.uom for m in meta],
+                "allergen": [m.allergen for m in meta],
+            }
+        )
+        df.insert(3, "available", inventory.lookup(df["code"]))
+        df.insert(4, "delta", df["available"] - df["required"])
+        return df.sort_values("delta")
+
+    def plan_mrp(
+        self,
+        orders: List[ProductionOrder],
+        inventory: Union[pd.DataFrame, InventoryAvailabilityIndex],
+        boms: Optional[Dict[str, Iterable[BOMComponent]]] = None,
+    ) -> MRPResult:
+        """Net an entire order book in one pass.
+
+        Flat ``boms`` keyed by SKU take precedence; SKUs without one are
+        exploded through the multi-level ``bom_graph``.
+        """
+
+        if isinstance(inventory, pd.DataFrame):
+            inventory = self.availability_index(inventory)
+        boms = boms or {}
+        coefficients: Dict[str, Dict[str, float]] = {}
+        for sku in {order.sku for order in orders}:
+            if sku in boms:
+                flat: Dict[str, float] = {}
+                for component in boms[sku]:
+                    flat[component.code] = (
+                        flat.get(component.code, 0.0)
+                        + component.quantity_per_batch
+                    )
+                coefficients[sku] = flat
+            elif sku in self.bom_graph:
+                coefficients[sku] = self.bom_graph.unit_requirements(sku)
+        return self.mrp_planner.plan(orders, coefficients, inventory)
+
+    def capacity_window_index(
+        self, capacity: pd.DataFrame
+    ) -> CapacityWindowIndex:
+        return CapacityWindowIndex.from_frame(capacity)
 
     def recommend_capacity_plan(
         self,
         order: ProductionOrder,
-        capacity: pd.DataFrame,
+        capacity: Union[pd.DataFrame, CapacityWindowIndex],
     ) -> Dict[str, Any]:
         """Suggest shifts/lines that can absorb the batch."""
 
-        window = capacity[capacity["date"] >= order.requested_date.isoformat()]
-        window = window.sort_values("available_hours", ascending=False)
-        best_option = window.iloc[0].to_dict() if not window.empty else {}
+        if isinstance(capacity, pd.DataFrame):
+            capacity = CapacityWindowIndex.from_frame(capacity)
+        best_option = capacity.best_from(order.requested_date)
         utilization = (
             order.batch_size / best_option.get("max_batch", order.batch_size)
             if best_option
@@ -113,31 +239,102 @@ class ProductionBOMOptimizer(BaseAgent):
             "notes": "Allocate overtime" if utilization > 0.9 else "On-plan",
         }
 
+    def allocate_capacity(
+        self,
+        orders: List[ProductionOrder],
+        capacity: Union[pd.DataFrame, CapacityCalendar],
+        strategy: str = "due_date",
+        priorities: Optional[List[float]] = None,
+    ) -> CapacityAllocation:
+        """Finite-capacity assignment of a whole order batch to lines."""
+
+        if isinstance(capacity, pd.DataFrame):
+            calendar = CapacityCalendar.from_frame(capacity)
+        else:
+            calendar = capacity.copy()
+        return calendar.allocate(
+            orders, strategy=strategy, priorities=priorities
+        )
+
+    def record_yield(
+        self,
+        sku: str,
+        process: str,
+        actual_yield: float,
+        golden_yield: Optional[float] = None,
+    ) -> YieldStats:
+        """Feed one batch result into the streaming SPC charts."""
+
+        return self.yield_monitor.observe(
+            sku, process, actual_yield, golden_yield
+        )
+
+    def record_yields(self, yield_df: pd.DataFrame) -> int:
+        """Feed yield rows not seen before into the SPC charts, in order.
+
+        Rows are identified by ``batch_id`` when the frame has that column,
+        otherwise by a hash of the row and its index label, so overlapping
+        or repeated frames only contribute their new batches. Returns the
+        number of batches ingested.
+        """
+
+        if "batch_id" in yield_df.columns:
+            batch_ids = yield_df["batch_id"].to_numpy()
+        else:
+            batch_ids = pd.util.hash_pandas_object(
+                yield_df, index=True
+            ).to_numpy()
+        return self.yield_monitor.observe_batches(
+            batch_ids,
+            yield_df["sku"].to_numpy(),
+            yield_df["process"].to_numpy(),
+            yield_df["actual_yield"].to_numpy(dtype=np.float64),
+            yield_df["golden_yield"].to_numpy(dtype=np.float64),
+        )
+
     def recommend_yield_actions(
-        self, yield_df: pd.DataFrame
+        self, yield_df: Optional[pd.DataFrame] = None
     ) -> List[Dict[str, Any]]:
-        """Highlight SKUs with drift versus golden batch."""
+        """Highlight SKUs with drift versus golden batch.
 
-        variance = yield_df.copy()
-        variance["gap_pct"] = (
-            variance["actual_yield"] - variance["golden_yield"]
-        )
-        variance = variance.sort_values("gap_pct")
-        recommendations: List[Dict[str, Any]] = []
-        for row in variance.itertuples():
-            if row.gap_pct < -0.02:
-                recommendations.append(
-                    {
-                        "sku": row.sku,
-                        "gap_pct": round(row.gap_pct * 100, 2),
-                        "action": (
-                            "Tighten hydration"
-                            if row.process == "dough"
-                            else "Audit proofing"
-                        ),
-                    }
-                )
-        return recommendations
+        Without a frame the answer comes from the streaming monitor's drift
+        index; a frame is treated as a one-off snapshot, row by row.
+        """
+
+        if yield_df is None:
+            return [
+                {
+                    "sku": stats.sku,
+                    "process": stats.process,
+                    "gap_pct": round(stats.gap * 100, 2),
+                    "mean_yield": round(stats.mean, 4),
+                    "std_yield": round(stats.std, 4),
+                    "cusum": round(stats.cusum_low, 4),
+                    "batches": stats.count,
+                    "action": self._yield_action(stats.process),
+                }
+                for stats in self.yield_monitor.drifting()
+            ]
+
+        gap = yield_df["actual_yield"].to_numpy(
+            dtype=np.float64
+        ) - yield_df["golden_yield"].to_numpy(dtype=np.float64)
+        flagged = np.flatnonzero(gap < -self.yield_monitor.gap_threshold)
+        flagged = flagged[np.argsort(gap[flagged], kind="stable")]
+        skus = yield_df["sku"].to_numpy()
+        processes = yield_df["process"].to_numpy()
+        return [
+            {
+                "sku": skus[row],
+                "gap_pct": round(float(gap[row]) * 100, 2),
+                "action": self._yield_action(processes[row]),
+            }
+            for row in flagged
+        ]
+
+    @staticmethod
+    def _yield_action(process: str) -> str:
+        return "Tighten hydration" if process == "dough" else "Audit proofing"
 
     def detect_allergen_risk(
         self,
@@ -172,6 +369,27 @@ class ProductionBOMOptimizer(BaseAgent):
                 )
         return alerts
 
+    def sequence_runs(
+        self,
+        runs: List[ProductionRun],
+        lines: List[str],
+        allergen_rules: Iterable[AllergenRule],
+        last_run_allergen: Optional[Dict[str, Optional[str]]] = None,
+        line_minutes: Union[float, Dict[str, float]] = 24 * 60,
+        time_budget_s: float = 1.0,
+    ) -> SequencePlan:
+        """Order a day's runs across lines to minimise allergen changeovers."""
+
+        sequencer = AllergenSequencer(
+            allergen_rules, time_budget_s=time_budget_s
+        )
+        return sequencer.sequence(
+            runs,
+            lines,
+            last_run_allergen=last_run_allergen,
+            line_minutes=line_minutes,
+        )
+
     def recommend_batch_size(self, order: ProductionOrder) -> Dict[str, Any]:
         """Respect regulatory batch size ceilings for F&B."""
 
@@ -189,6 +407,19 @@ class ProductionBOMOptimizer(BaseAgent):
             "notes": "Split lots to comply with USDA guidance",
         }
 
+    def planning_session(self) -> PlanningSession:
+        """Session that caches frame-derived indexes across plan calls."""
+
+        if self._session is None:
+            self._session = PlanningSession(self)
+        return self._session
+
+    def close(self) -> None:
+        """Shut down the planning session's worker threads, if any."""
+
+        if self._session is not None:
+            self._session.close()
+
     async def orchestrate_plan(
         self,
         order: ProductionOrder,
@@ -198,20 +429,24 @@ class ProductionBOMOptimizer(BaseAgent):
         yield_df: pd.DataFrame,
         allergen_rules: Iterable[AllergenRule],
         last_run_allergen: Optional[str] = None,
+        inventory_snapshot: Optional[Hashable] = None,
     ) -> Dict[str, Any]:
-        """High-level orchestration entry point used by the FastAPI surface."""
+        """High-level orchestration entry point used by the FastAPI surface.
+
+        ``yield`` flags the rows of ``yield_df`` itself; its batches are
+        also fed into the streaming SPC monitor (each batch once) and
+        ``yield_drift`` lists the monitor's drifting SKU/process pairs.
+        Pass ``inventory_snapshot`` to reuse the availability index
+        without hashing ``inventory`` on every order.
+        """
 
-        exploded = self.explode_bom(order, bom, inventory)
-        capacity_plan = self.recommend_capacity_plan(order, capacity)
-        yield_actions = self.recommend_yield_actions(yield_df)
-        allergen_alerts = self.detect_allergen_risk(
-            bom, allergen_rules, last_run_allergen
+        return await self.planning_session().run(
+            order,
+            bom,
+            inventory,
+            capacity,
+            yield_df,
+            allergen_rules,
+            last_run_allergen,
+            inventory_snapshot,
         )
-        batch_guidance = self.recommend_batch_size(order)
-        return {
-            "bom": exploded.to_dict(orient="records"),
-            "capacity": capacity_plan,
-            "yield": yield_actions,
-            "allergens": allergen_alerts,
-            "batching": batch_guidance,
-        }
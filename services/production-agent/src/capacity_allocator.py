@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@dataclass(slots=True)
+class CapacityAllocation:
+    """Per-order line assignments plus line x day utilization."""
+
+    order_ids: np.ndarray
+    lines: np.ndarray
+    dates: np.ndarray
+    hours: np.ndarray
+    utilization: np.ndarray
+    line_utilization: pd.DataFrame
+
+    @property
+    def unassigned(self) -> np.ndarray:
+        return np.flatnonzero(pd.isna(self.lines))
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        return pd.DataFrame(
+            {
+                "order_id": self.order_ids,
+                "line": self.lines,
+                "date": self.dates,
+                "hours": self.hours,
+                "utilization": np.round(self.utilization, 2),
+            }
+        ).to_dict(orient="records")
+
+
+class CapacityCalendar:
+    """Remaining line hours in a ``lines x days`` array keyed by date ordinal.
+
+    Built once from the capacity frame (``date``, ``line``,
+    ``available_hours``, ``max_batch``); allocations consume hours in place.
+    """
+
+    def __init__(
+        self,
+        lines: pd.Index,
+        first_day: int,
+        hours: np.ndarray,
+        max_batch: np.ndarray,
+    ) -> None:
+        self.lines = lines
+        self.first_day = first_day
+        self.capacity = hours
+        self.remaining = hours.copy()
+        self.max_batch = max_batch
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.hours_per_unit = np.where(
+                max_batch > 0, hours / max_batch, np.inf
+            )
+
+    @classmethod
+    def from_frame(cls, capacity: pd.DataFrame) -> "CapacityCalendar":
+        days = (
+            pd.to_datetime(capacity["date"])
+            .to_numpy(dtype="datetime64[D]")
+            .astype(np.int64)
+            + EPOCH_ORDINAL
+        )
+        line_codes, lines = pd.factorize(capacity["line"])
+        first_day = int(days.min()) if days.size else 0
+        n_days = int(days.max()) - first_day + 1 if days.size else 0
+        hours = np.zeros((len(lines), n_days))
+        max_batch = np.zeros((len(lines), n_days))
+        offsets = days - first_day
+        np.add.at(
+            hours,
+            (line_codes, offsets),
+            capacity["available_hours"].to_numpy(dtype=np.float64),
+        )
+        np.maximum.at(
+            max_batch,
+            (line_codes, offsets),
+            capacity["max_batch"].to_numpy(dtype=np.float64),
+        )
+        return cls(pd.Index(lines), first_day, hours, max_batch)
+
+    def reset(self) -> None:
+        self.remaining = self.capacity.copy()
+
+    def copy(self) -> "CapacityCalendar":
+        clone = CapacityCalendar(
+            self.lines, self.first_day, self.capacity, self.max_batch
+        )
+        clone.remaining = self.remaining.copy()
+        return clone
+
+    def allocate(
+        self,
+        orders: Sequence[Any],
+        strategy: str = "due_date",
+        priorities: Optional[Sequence[float]] = None,
+        order_hours: Optional[Sequence[float]] = None,
+    ) -> CapacityAllocation:
+        """Assign every order to the earliest line-day that can absorb it.
+
+        ``strategy="due_date"`` walks orders by requested date (largest batch
+        first on ties); ``"priority"`` walks by descending ``priorities``. On
+        the chosen day the line with the most remaining hours wins. Orders
+        that fit nowhere stay unassigned and need overtime.
+        """
+
+        n_orders = len(orders)
+        due = np.fromiter(
+            (order.requested_date.toordinal() for order in orders),
+            dtype=np.int64,
+            count=n_orders,
+        )
+        batch = np.fromiter(
+            (order.batch_size for order in orders),
+            dtype=np.float64,
+            count=n_orders,
+        )
+        if strategy == "priority":
+            if priorities is None:
+                raise ValueError("priority strategy requires priorities")
+            rank = -np.asarray(priorities, dtype=np.float64)
+            sequence = np.lexsort((due, rank))
+        elif strategy == "due_date":
+            sequence = np.lexsort((-batch, due))
+        else:
+            raise ValueError(f"Unknown strategy: {strategy}")
+        fixed_hours = (
+            np.asarray(order_hours, dtype=np.float64)
+            if order_hours is not None
+            else None
+        )
+
+        line_idx = np.full(n_orders, -1, dtype=np.int64)
+        day_idx = np.full(n_orders, -1, dtype=np.int64)
+        hours = np.zeros(n_orders)
+        utilization = np.ones(n_orders)
+        n_days = self.remaining.shape[1]
+
+        for position in sequence:
+            start = max(int(due[position]) - self.first_day, 0)
+            if start >= n_days:
+                continue
+            window = self.remaining[:, start:]
+            if fixed_hours is not None:
+                need = np.full(window.shape, fixed_hours[position])
+            else:
+                need = batch[position] * self.hours_per_unit[:, start:]
+            feasible = (window >= need) & (window > 0)
+            open_days = feasible.any(axis=0)
+            if not open_days.any():
+                continue
+            offset = int(np.argmax(open_days))
+            candidates = np.where(
+                feasible[:, offset], window[:, offset], -1.0
+            )
+            line = int(np.argmax(candidates))
+            day = start + offset
+            consumed = float(need[line, offset])
+            self.remaining[line, day] -= consumed
+            line_idx[position] = line
+            day_idx[position] = day
+            hours[position] = consumed
+            utilization[position] = (
+                batch[position] / self.max_batch[line, day]
+            )
+
+        assigned = line_idx >= 0
+        lines = np.full(n_orders, None, dtype=object)
+        line_names = np.asarray(self.lines, dtype=object)
+        lines[assigned] = line_names[line_idx[assigned]]
+        dates = np.full(n_orders, np.datetime64("NaT"), dtype="datetime64[D]")
+        dates[assigned] = (
+            np.datetime64(date.fromordinal(self.first_day), "D")
+            + day_idx[assigned].astype("timedelta64[D]")
+        )
+        return CapacityAllocation(
+            order_ids=np.asarray(
+                [
+                    getattr(order, "order_id", None) or f"ORDER-{idx}"
+                    for idx, order in enumerate(orders)
+                ],
+                dtype=object,
+            ),
+            lines=lines,
+            dates=dates,
+            hours=hours,
+            utilization=utilization,
+            line_utilization=self.utilization_frame(),
+        )
+
+    def utilization_frame(self) -> pd.DataFrame:
+        """Long-format ``line/date/capacity/used/utilization`` frame."""
+
+        n_lines, n_days = self.capacity.shape
+        used = self.capacity - self.remaining
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(self.capacity > 0, used / self.capacity, 0.0)
+        first = np.datetime64(date.fromordinal(self.first_day), "D")
+        days = first + np.arange(n_days).astype("timedelta64[D]")
+        frame = pd.DataFrame(
+            {
+                "line": np.repeat(
+                    np.asarray(self.lines, dtype=object), n_days
+                ),
+                "date": np.tile(days, n_lines),
+                "capacity": self.capacity.ravel(),
+                "used": used.ravel(),
+                "utilization": ratio.ravel(),
+            }
+        )
+        return frame[frame["capacity"] > 0].reset_index(drop=True)
+
+
+class CapacityWindowIndex:
+    """Roomiest line-day on or after any date, from one capacity snapshot.
+
+    Rows are sorted by date once and a suffix argmax over
+    ``available_hours`` is precomputed, so each lookup is a binary search.
+    """
+
+    def __init__(self, days: np.ndarray, rows: List[Dict[str, Any]]) -> None:
+        self.days = days
+        self.rows = rows
+        hours = np.asarray(
+            [row["available_hours"] for row in rows], dtype=np.float64
+        )
+        reverse = hours[::-1]
+        running = np.maximum.accumulate(reverse) if reverse.size else reverse
+        leader = np.where(reverse >= running, np.arange(reverse.size), 0)
+        best = np.maximum.accumulate(leader) if leader.size else leader
+        self._best = (reverse.size - 1 - best)[::-1]
+
+    @classmethod
+    def from_frame(cls, capacity: pd.DataFrame) -> "CapacityWindowIndex":
+        days = pd.to_datetime(capacity["date"]).to_numpy(
+            dtype="datetime64[D]"
+        )
+        order = np.argsort(days, kind="stable")
+        rows = capacity.iloc[order].to_dict(orient="records")
+        return cls(days[order], rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def best_from(self, day: date) -> Dict[str, Any]:
+        position = int(
+            np.searchsorted(self.days, np.datetime64(day, "D"), side="left")
+        )
+        if position >= len(self.rows):
+            return {}
+        return self.rows[int(self._best[position])]
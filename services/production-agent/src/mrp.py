@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+@dataclass(slots=True)
+class MRPResult:
+    """Gross and net requirements for an order book, rows in input order."""
+
+    order_ids: np.ndarray
+    components: pd.Index
+    gross: sparse.csr_matrix
+    shortage: sparse.csr_matrix
+    available: np.ndarray
+
+    @property
+    def allocated(self) -> sparse.csr_matrix:
+        return sparse.csr_matrix(
+            (
+                self.gross.data - self.shortage.data,
+                self.gross.indices,
+                self.gross.indptr,
+            ),
+            shape=self.gross.shape,
+        )
+
+    def order_shortages(self, row: int) -> Dict[str, float]:
+        start, end = self.shortage.indptr[row], self.shortage.indptr[row + 1]
+        cols = self.shortage.indices[start:end]
+        values = self.shortage.data[start:end]
+        return {
+            self.components[col]: float(value)
+            for col, value in zip(cols, values)
+            if value > 0
+        }
+
+    def short_orders(self) -> np.ndarray:
+        """Row positions of orders with at least one component short."""
+
+        totals = np.asarray(self.shortage.sum(axis=1)).ravel()
+        return np.flatnonzero(totals > 0)
+
+    def shortage_frame(self) -> pd.DataFrame:
+        """Long-format ``order_id/code/required/allocated/shortage`` rows."""
+
+        # ``gross`` and ``shortage`` share one canonical sparsity pattern.
+        rows = np.repeat(
+            np.arange(self.gross.shape[0]), np.diff(self.gross.indptr)
+        )
+        short = self.shortage.data
+        mask = short > 0
+        required = self.gross.data[mask]
+        return pd.DataFrame(
+            {
+                "order_id": self.order_ids[rows[mask]],
+                "code": self.components[self.gross.indices[mask]],
+                "required": required,
+                "allocated": required - short[mask],
+                "shortage": short[mask],
+            }
+        )
+
+    def component_summary(self) -> pd.DataFrame:
+        gross = np.asarray(self.gross.sum(axis=0)).ravel()
+        short = np.asarray(self.shortage.sum(axis=0)).ravel()
+        return pd.DataFrame(
+            {
+                "code": self.components,
+                "gross": gross,
+                "available": self.available,
+                "shortage": short,
+            }
+        ).sort_values("shortage", ascending=False)
+
+
+class BatchMRPPlanner:
+    """Nets a whole order book against one availability snapshot.
+
+    Orders x finished SKU quantities and SKU x component coefficients are
+    sparse matrices, so gross requirements are a single product. Netting walks
+    each component column in due-date order with a cumulative sum: an order is
+    short by whatever its requirement pushes the running total past stock.
+    """
+
+    def plan(
+        self,
+        orders: Sequence[Any],
+        coefficients: Mapping[str, Mapping[str, float]],
+        availability: Any,
+    ) -> MRPResult:
+        n_orders = len(orders)
+        skus = [order.sku for order in orders]
+        sku_codes, sku_index = pd.factorize(pd.Index(skus))
+        missing = [sku for sku in sku_index if sku not in coefficients]
+        if missing:
+            raise KeyError(f"No BOM coefficients for SKUs: {missing}")
+
+        batch = np.fromiter(
+            (order.batch_size for order in orders),
+            dtype=np.float64,
+            count=n_orders,
+        )
+        order_matrix = sparse.csr_matrix(
+            (batch, (np.arange(n_orders), sku_codes)),
+            shape=(n_orders, len(sku_index)),
+        )
+
+        bom_rows, bom_codes, bom_values = [], [], []
+        for row, sku in enumerate(sku_index):
+            for code, qty in coefficients[sku].items():
+                bom_rows.append(row)
+                bom_codes.append(code)
+                bom_values.append(qty)
+        comp_codes, components = pd.factorize(pd.Index(bom_codes))
+        bom_matrix = sparse.csr_matrix(
+            (bom_values, (bom_rows, comp_codes)),
+            shape=(len(sku_index), len(components)),
+        )
+
+        gross = (order_matrix @ bom_matrix).tocsr()
+        gross.eliminate_zeros()
+        gross.sort_indices()
+        available = availability.lookup(components)
+        shortage = self._net(gross, orders, available)
+
+        order_ids = np.asarray(
+            [
+                getattr(order, "order_id", None) or f"ORDER-{idx}"
+                for idx, order in enumerate(orders)
+            ],
+            dtype=object,
+        )
+        return MRPResult(
+            order_ids=order_ids,
+            components=components,
+            gross=gross,
+            shortage=shortage,
+            available=available,
+        )
+
+    def _net(
+        self,
+        gross: sparse.csr_matrix,
+        orders: Sequence[Any],
+        available: np.ndarray,
+    ) -> sparse.csr_matrix:
+        due = np.fromiter(
+            (order.requested_date.toordinal() for order in orders),
+            dtype=np.int64,
+            count=len(orders),
+        )
+        priority = np.argsort(due, kind="stable")
+        rank = np.empty_like(priority)
+        rank[priority] = np.arange(len(priority))
+
+        by_due = gross[priority].tocsc()
+        by_due.sort_indices()
+        data = by_due.data
+        if not data.size:
+            return gross.copy()
+        running = np.cumsum(data)
+        starts = by_due.indptr[:-1]
+        counts = np.diff(by_due.indptr)
+        offset = np.where(starts > 0, running[np.maximum(starts - 1, 0)], 0.0)
+        cumulative = running - np.repeat(offset, counts)
+        stock = np.repeat(available, counts)
+        short = np.clip(cumulative - stock, 0.0, data)
+
+        netted = sparse.csc_matrix(
+            (short, by_due.indices, by_due.indptr), shape=by_due.shape
+        ).tocsr()[rank]
+        netted.sort_indices()
+        return netted
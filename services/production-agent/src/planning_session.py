@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Optional,
+    Tuple,
+)
+
+import pandas as pd
+
+from availability_index import frame_fingerprint
+
+
+class PlanningSession:
+    """Reusable context for repeated ``orchestrate_plan`` calls.
+
+    The capacity frame is fingerprinted by content, so its window index is
+    rebuilt only when the frame changes; the availability index is cached
+    by the optimizer, keyed by ``inventory_snapshot`` if given. Yield rows
+    go to the optimizer's SPC monitor, which skips batches it has already
+    seen, so repeated or overlapping plans do not count the same batches
+    twice; each run reports flags for its own frame and the monitor's drift
+    index. The memo is guarded by a lock since steps run on pool threads
+    and plans may overlap. The order-dependent steps run concurrently on a
+    small thread pool and every step reports its wall time. ``close()``
+    (or leaving a ``with`` block) releases the pool; cached indexes are
+    kept and a later run starts a fresh pool.
+    """
+
+    def __init__(self, optimizer: Any, max_workers: int = 3) -> None:
+        self.optimizer = optimizer
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._memo: Dict[str, Tuple[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.last_timings: Dict[str, float] = {}
+
+    def __enter__(self) -> "PlanningSession":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Wait for in-flight steps and stop the worker pool."""
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="production-plan",
+            )
+        return self._executor
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self._memo.clear()
+            else:
+                self._memo.pop(name, None)
+
+    def memoized(
+        self, name: str, frame: pd.DataFrame, build: Callable[[], Any]
+    ) -> Any:
+        """``build()`` cached under ``name`` for this frame content."""
+
+        fingerprint = frame_fingerprint(frame)
+        with self._lock:
+            cached = self._memo.get(name)
+            if cached is not None and cached[0] == fingerprint:
+                self.cache_hits += 1
+                return cached[1]
+            self.cache_misses += 1
+        # Built outside the lock; a concurrent miss just builds it twice.
+        value = build()
+        with self._lock:
+            self._memo[name] = (fingerprint, value)
+        return value
+
+    async def run(
+        self,
+        order: Any,
+        bom: Iterable[Any],
+        inventory: pd.DataFrame,
+        capacity: pd.DataFrame,
+        yield_df: pd.DataFrame,
+        allergen_rules: Iterable[Any],
+        last_run_allergen: Optional[str] = None,
+        inventory_snapshot: Optional[Hashable] = None,
+    ) -> Dict[str, Any]:
+        optimizer = self.optimizer
+        components = list(bom)
+        timings: Dict[str, float] = {}
+
+        def timed(name: str, step: Callable[[], Any]) -> Callable[[], Any]:
+            def wrapper() -> Any:
+                started = time.perf_counter()
+                try:
+                    return step()
+                finally:
+                    timings[name] = round(
+                        (time.perf_counter() - started) * 1000, 3
+                    )
+
+            return wrapper
+
+        def bom_step() -> Any:
+            # The optimizer keeps its own availability cache.
+            index = optimizer.availability_index(inventory, inventory_snapshot)
+            exploded = optimizer.explode_bom(order, components, index)
+            return exploded.to_dict(orient="records")
+
+        def capacity_step() -> Any:
+            index = self.memoized(
+                "capacity",
+                capacity,
+                lambda: optimizer.capacity_window_index(capacity),
+            )
+            return optimizer.recommend_capacity_plan(order, index)
+
+        def yield_step() -> Any:
+            optimizer.record_yields(yield_df)
+            return (
+                optimizer.recommend_yield_actions(yield_df),
+                optimizer.recommend_yield_actions(),
+            )
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        executor = self._pool()
+        pending = [
+            loop.run_in_executor(executor, timed(name, step))
+            for name, step in (
+                ("bom", bom_step),
+                ("capacity", capacity_step),
+                ("yield", yield_step),
+            )
+        ]
+        allergen_alerts = timed(
+            "allergens",
+            lambda: optimizer.detect_allergen_risk(
+                components, allergen_rules, last_run_allergen
+            ),
+        )()
+        batch_guidance = timed(
+            "batching", lambda: optimizer.recommend_batch_size(order)
+        )()
+        exploded, capacity_plan, (yield_flags, yield_drift) = (
+            await asyncio.gather(*pending)
+        )
+        timings["total"] = round((time.perf_counter() - started) * 1000, 3)
+        self.last_timings = timings
+        return {
+            "bom": exploded,
+            "capacity": capacity_plan,
+            "yield": yield_flags,
+            "yield_drift": yield_drift,
+            "allergens": allergen_alerts,
+            "batching": batch_guidance,
+            "timings_ms": dict(timings),
+        }
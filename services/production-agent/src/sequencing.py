@@ -0,0 +1,595 @@
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+INF = float("inf")
+
+
+@dataclass(slots=True)
+class SequencePlan:
+    """Run order per line plus the changeover bill it implies."""
+
+    lines: Dict[str, List[str]]
+    line_allergens: Dict[str, List[Optional[str]]]
+    line_minutes: Dict[str, float]
+    sanitation_minutes: float
+    dedicated_switches: int
+    overflow_minutes: float
+    objective: float
+    method: str
+    optimal: bool
+    elapsed_ms: float
+    iterations: int = 0
+    notes: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class _Problem:
+    classes: List[Optional[str]]
+    transition: List[List[float]]
+    sanitation: List[List[float]]
+    switches: List[List[int]]
+    run_ids: List[str]
+    run_class: List[int]
+    durations: List[float]
+    line_ids: List[str]
+    line_init: List[int]
+    capacity: List[float]
+
+
+def _copy_lines(
+    lines: List[Dict[int, List[int]]]
+) -> List[Dict[int, List[int]]]:
+    return [{cls: list(runs) for cls, runs in ln.items()} for ln in lines]
+
+
+def _runs(blocks: Dict[int, List[int]]) -> Iterable[int]:
+    for runs in blocks.values():
+        yield from runs
+
+
+class AllergenSequencer:
+    """Sequences a day's runs across lines to minimise allergen changeovers.
+
+    A changeover from class ``a`` to a different class ``b`` costs the
+    sanitation minutes of ``a`` (or an explicit override for the pair), and
+    entering a class that requires a dedicated line counts as a switch worth
+    ``switch_penalty_minutes``.
+
+    The exact path is a small-instance mode: it keeps every allergen class
+    in one block on one line and solves class-to-line assignments with
+    Held-Karp plus a subset-partition DP. It runs only with at most
+    ``exact_max_classes`` classes when every class fits on some line, and
+    gives up at the time budget. Otherwise greedy construction is followed
+    by local search, which may split a class across lines to respect
+    capacity, and the best plan found is returned when the wall-clock
+    budget runs out. Runs that cannot be placed on any line count as
+    overflow.
+    """
+
+    def __init__(
+        self,
+        allergen_rules: Iterable[Any],
+        switch_penalty_minutes: float = 30.0,
+        overflow_penalty: float = 100.0,
+        changeover_overrides: Optional[
+            Mapping[Tuple[Optional[str], Optional[str]], float]
+        ] = None,
+        exact_max_classes: int = 8,
+        time_budget_s: float = 1.0,
+        max_restarts: int = 200,
+        seed: int = 0,
+    ) -> None:
+        self.rules = {rule.allergen: rule for rule in allergen_rules}
+        self.switch_penalty_minutes = switch_penalty_minutes
+        self.overflow_penalty = overflow_penalty
+        self.changeover_overrides = dict(changeover_overrides or {})
+        self.exact_max_classes = exact_max_classes
+        self.time_budget_s = time_budget_s
+        self.max_restarts = max_restarts
+        self.seed = seed
+
+    def sequence(
+        self,
+        runs: Sequence[Any],
+        lines: Sequence[str],
+        last_run_allergen: Optional[Mapping[str, Optional[str]]] = None,
+        line_minutes: Any = 24 * 60,
+        time_budget_s: Optional[float] = None,
+    ) -> SequencePlan:
+        started = time.perf_counter()
+        budget = self.time_budget_s if time_budget_s is None else time_budget_s
+        deadline = started + budget
+        problem = self._build(
+            runs, lines, last_run_allergen or {}, line_minutes
+        )
+        run_classes = sorted(set(problem.run_class))
+        if not problem.line_ids:
+            return self._plan(
+                problem, [], "infeasible", False, started, 0,
+                ["no lines to sequence on"],
+            )
+
+        assignment: Optional[List[List[int]]] = None
+        method, optimal, iterations = "heuristic", False, 0
+        notes: List[str] = []
+        if len(run_classes) <= self.exact_max_classes:
+            reason = self._exact_blocker(problem, run_classes)
+            if reason is None:
+                assignment = self._solve_exact(
+                    problem, run_classes, deadline
+                )
+                if assignment is not None:
+                    method, optimal = "exact", True
+                elif time.perf_counter() >= deadline:
+                    reason = "exact DP hit the time budget"
+                else:
+                    reason = "no whole-class assignment fits capacity"
+            if reason is not None:
+                notes.append(f"{reason}; heuristic")
+        if assignment is None:
+            assignment, iterations = self._solve_heuristic(
+                problem, run_classes, deadline
+            )
+            if time.perf_counter() >= deadline:
+                notes.append("time budget exhausted; best plan so far")
+        return self._plan(
+            problem, assignment, method, optimal, started, iterations, notes
+        )
+
+    # ------------------------------------------------------------------ setup
+    def _build(
+        self,
+        runs: Sequence[Any],
+        lines: Sequence[str],
+        last_run_allergen: Mapping[str, Optional[str]],
+        line_minutes: Any,
+    ) -> _Problem:
+        labels: List[Optional[str]] = [None]
+        index: Dict[Optional[str], int] = {None: 0}
+
+        def class_of(allergen: Optional[str]) -> int:
+            if allergen not in index:
+                index[allergen] = len(labels)
+                labels.append(allergen)
+            return index[allergen]
+
+        run_class = [class_of(run.allergen) for run in runs]
+        line_init = [class_of(last_run_allergen.get(line)) for line in lines]
+        size = len(labels)
+        transition = [[0.0] * size for _ in range(size)]
+        sanitation = [[0.0] * size for _ in range(size)]
+        switches = [[0] * size for _ in range(size)]
+        for a, source in enumerate(labels):
+            source_rule = self.rules.get(source)
+            for b, target in enumerate(labels):
+                if a == b:
+                    continue
+                minutes = self.changeover_overrides.get(
+                    (source, target),
+                    source_rule.sanitation_minutes if source_rule else 0.0,
+                )
+                target_rule = self.rules.get(target)
+                dedicated = int(
+                    bool(target_rule and target_rule.requires_dedicated_line)
+                )
+                sanitation[a][b] = float(minutes)
+                switches[a][b] = dedicated
+                transition[a][b] = (
+                    minutes + dedicated * self.switch_penalty_minutes
+                )
+
+        if isinstance(line_minutes, Mapping):
+            capacity = [float(line_minutes.get(line, INF)) for line in lines]
+        else:
+            capacity = [float(line_minutes)] * len(lines)
+        return _Problem(
+            classes=labels,
+            transition=transition,
+            sanitation=sanitation,
+            switches=switches,
+            run_ids=[run.run_id for run in runs],
+            run_class=run_class,
+            durations=[float(run.duration_minutes) for run in runs],
+            line_ids=list(lines),
+            line_init=line_init,
+            capacity=capacity,
+        )
+
+    # ------------------------------------------------------------------ exact
+    @staticmethod
+    def _exact_blocker(
+        problem: _Problem, run_classes: List[int]
+    ) -> Optional[str]:
+        """Why whole-class blocks cannot fit, checked before any DP work."""
+
+        class_load = dict.fromkeys(run_classes, 0.0)
+        for cls, duration in zip(problem.run_class, problem.durations):
+            class_load[cls] += duration
+        largest = max(problem.capacity)
+        for cls, load in class_load.items():
+            if load > largest:
+                label = problem.classes[cls] or "allergen-free"
+                return f"class {label} exceeds every line's capacity"
+        if sum(class_load.values()) > sum(problem.capacity):
+            return "total load exceeds line capacity"
+        return None
+
+    def _solve_exact(
+        self, problem: _Problem, run_classes: List[int], deadline: float
+    ) -> Optional[List[List[int]]]:
+        k = len(run_classes)
+        full = (1 << k) - 1
+        class_load = [0.0] * k
+        for cls, duration in zip(problem.run_class, problem.durations):
+            class_load[run_classes.index(cls)] += duration
+        load = [0.0] * (1 << k)
+        for mask in range(1, 1 << k):
+            low = (mask & -mask).bit_length() - 1
+            load[mask] = load[mask & (mask - 1)] + class_load[low]
+
+        paths: Dict[int, Tuple[List[float], List[Tuple[int, ...]]]] = {}
+        for init in set(problem.line_init):
+            paths[init] = self._held_karp(problem, init, run_classes)
+
+        n_lines = len(problem.line_ids)
+        best = [0.0] + [INF] * full
+        choices: List[List[int]] = []
+        for line in range(n_lines):
+            costs, _ = paths[problem.line_init[line]]
+            cap = problem.capacity[line]
+            current = [INF] * (full + 1)
+            pick = [0] * (full + 1)
+            for mask in range(full + 1):
+                if not mask & 255 and time.perf_counter() >= deadline:
+                    return None
+                sub = mask
+                while True:
+                    rest = best[mask ^ sub]
+                    if rest < INF and load[sub] <= cap:
+                        value = rest + costs[sub]
+                        if value < current[mask]:
+                            current[mask] = value
+                            pick[mask] = sub
+                    if sub == 0:
+                        break
+                    sub = (sub - 1) & mask
+            best = current
+            choices.append(pick)
+        if best[full] == INF:
+            return None
+
+        by_class: Dict[int, List[int]] = {}
+        for run, cls in enumerate(problem.run_class):
+            by_class.setdefault(cls, []).append(run)
+        assignment: List[List[int]] = [[] for _ in range(n_lines)]
+        mask = full
+        for line in range(n_lines - 1, -1, -1):
+            sub = choices[line][mask]
+            _, orders = paths[problem.line_init[line]]
+            for pos in orders[sub]:
+                assignment[line].extend(by_class[run_classes[pos]])
+            mask ^= sub
+        return assignment
+
+    def _held_karp(
+        self, problem: _Problem, init: int, run_classes: List[int]
+    ) -> Tuple[List[float], List[Tuple[int, ...]]]:
+        """Cheapest class order from ``init`` for every subset of classes."""
+
+        k = len(run_classes)
+        size = 1 << k
+        cost = problem.transition
+        dp = [[INF] * k for _ in range(size)]
+        parent = [[-1] * k for _ in range(size)]
+        for j in range(k):
+            dp[1 << j][j] = cost[init][run_classes[j]]
+        for mask in range(1, size):
+            row = dp[mask]
+            for j in range(k):
+                here = row[j]
+                if here == INF:
+                    continue
+                source = run_classes[j]
+                for nxt in range(k):
+                    bit = 1 << nxt
+                    if mask & bit:
+                        continue
+                    value = here + cost[source][run_classes[nxt]]
+                    if value < dp[mask | bit][nxt]:
+                        dp[mask | bit][nxt] = value
+                        parent[mask | bit][nxt] = j
+        totals = [0.0] * size
+        orders: List[Tuple[int, ...]] = [()] * size
+        for mask in range(1, size):
+            row = dp[mask]
+            last = min(range(k), key=row.__getitem__)
+            totals[mask] = row[last]
+            order: List[int] = []
+            cursor, position = mask, last
+            while position != -1:
+                order.append(position)
+                previous = parent[cursor][position]
+                cursor ^= 1 << position
+                position = previous
+            orders[mask] = tuple(reversed(order))
+        return totals, orders
+
+    # -------------------------------------------------------------- heuristic
+    def _solve_heuristic(
+        self, problem: _Problem, run_classes: List[int], deadline: float
+    ) -> Tuple[List[List[int]], int]:
+        rng = random.Random(self.seed)
+        n_lines = len(problem.line_ids)
+        order_cache: Dict[Tuple[int, frozenset], Tuple[float, List[int]]] = {}
+
+        def order_blocks(
+            line: int, classes: frozenset
+        ) -> Tuple[float, List[int]]:
+            key = (problem.line_init[line], classes)
+            cached = order_cache.get(key)
+            if cached is None:
+                cached = self._order_blocks(problem, key[0], classes)
+                order_cache[key] = cached
+            return cached
+
+        def line_cost(
+            line: int, blocks: Dict[int, List[int]], load: float
+        ) -> float:
+            changeover, _ = order_blocks(line, frozenset(blocks))
+            overflow = max(0.0, load - problem.capacity[line])
+            return changeover + self.overflow_penalty * overflow
+
+        # Greedy construction: heaviest classes first, each kept whole on the
+        # line with the lowest incremental cost where it fits.
+        lines: List[Dict[int, List[int]]] = [{} for _ in range(n_lines)]
+        loads = [0.0] * n_lines
+        by_class: Dict[int, List[int]] = {}
+        for run, cls in enumerate(problem.run_class):
+            by_class.setdefault(cls, []).append(run)
+        class_load = {
+            cls: sum(problem.durations[run] for run in runs)
+            for cls, runs in by_class.items()
+        }
+        for cls in sorted(by_class, key=class_load.__getitem__, reverse=True):
+            best_line, best_delta = 0, INF
+            for line in range(n_lines):
+                before = line_cost(line, lines[line], loads[line])
+                trial = dict(lines[line])
+                trial[cls] = trial.get(cls, []) + by_class[cls]
+                delta = (
+                    line_cost(line, trial, loads[line] + class_load[cls])
+                    - before
+                )
+                if delta < best_delta - 1e-9 or (
+                    abs(delta - best_delta) <= 1e-9
+                    and loads[line] < loads[best_line]
+                ):
+                    best_line, best_delta = line, delta
+            lines[best_line].setdefault(cls, []).extend(by_class[cls])
+            loads[best_line] += class_load[cls]
+
+        costs = [line_cost(i, lines[i], loads[i]) for i in range(n_lines)]
+        iterations = 0
+
+        def descend() -> None:
+            nonlocal iterations
+            improved = True
+            while improved and time.perf_counter() < deadline:
+                improved = False
+                sources = list(range(n_lines))
+                rng.shuffle(sources)
+                for src in sources:
+                    for cls in list(lines[src]):
+                        runs = lines[src][cls]
+                        for dst in range(n_lines):
+                            if dst == src:
+                                continue
+                            iterations += 1
+                            if self._try_move(
+                                lines, loads, costs, src, dst, cls, runs,
+                                problem, line_cost,
+                            ):
+                                improved = True
+                                break
+                        if improved or time.perf_counter() >= deadline:
+                            break
+                    if improved or time.perf_counter() >= deadline:
+                        break
+
+        descend()
+        best_total = sum(costs)
+        best_lines = _copy_lines(lines)
+        restarts = 0
+        while restarts < self.max_restarts and time.perf_counter() < deadline:
+            restarts += 1
+            src = rng.randrange(n_lines)
+            if not lines[src] or n_lines < 2:
+                continue
+            cls = rng.choice(list(lines[src]))
+            runs = lines[src][cls]
+            split = rng.randint(1, len(runs))
+            moved = runs[:split]
+            dst = rng.randrange(n_lines - 1)
+            dst = dst + 1 if dst >= src else dst
+            self._apply(lines, loads, src, dst, cls, moved, problem)
+            costs[src] = line_cost(src, lines[src], loads[src])
+            costs[dst] = line_cost(dst, lines[dst], loads[dst])
+            descend()
+            total = sum(costs)
+            if total < best_total - 1e-9:
+                best_total = total
+                best_lines = _copy_lines(lines)
+            else:
+                lines[:] = _copy_lines(best_lines)
+                loads[:] = [
+                    sum(problem.durations[run] for run in _runs(blocks))
+                    for blocks in lines
+                ]
+                costs[:] = [
+                    line_cost(i, lines[i], loads[i]) for i in range(n_lines)
+                ]
+
+        assignment: List[List[int]] = []
+        for line, blocks in enumerate(best_lines):
+            _, order = order_blocks(line, frozenset(blocks))
+            assignment.append([run for cls in order for run in blocks[cls]])
+        return assignment, iterations
+
+    def _try_move(
+        self,
+        lines: List[Dict[int, List[int]]],
+        loads: List[float],
+        costs: List[float],
+        src: int,
+        dst: int,
+        cls: int,
+        runs: List[int],
+        problem: _Problem,
+        line_cost: Any,
+    ) -> bool:
+        moved = sum(problem.durations[run] for run in runs)
+        src_blocks = {c: r for c, r in lines[src].items() if c != cls}
+        dst_blocks = dict(lines[dst])
+        dst_blocks[cls] = dst_blocks.get(cls, []) + runs
+        new_src = line_cost(src, src_blocks, loads[src] - moved)
+        new_dst = line_cost(dst, dst_blocks, loads[dst] + moved)
+        if new_src + new_dst < costs[src] + costs[dst] - 1e-9:
+            self._apply(lines, loads, src, dst, cls, list(runs), problem)
+            costs[src], costs[dst] = new_src, new_dst
+            return True
+        return False
+
+    def _apply(
+        self,
+        lines: List[Dict[int, List[int]]],
+        loads: List[float],
+        src: int,
+        dst: int,
+        cls: int,
+        runs: List[int],
+        problem: _Problem,
+    ) -> None:
+        moved = set(runs)
+        remaining = [run for run in lines[src][cls] if run not in moved]
+        if remaining:
+            lines[src][cls] = remaining
+        else:
+            del lines[src][cls]
+        lines[dst].setdefault(cls, []).extend(runs)
+        shift = sum(problem.durations[run] for run in runs)
+        loads[src] -= shift
+        loads[dst] += shift
+
+    def _order_blocks(
+        self, problem: _Problem, init: int, classes: frozenset
+    ) -> Tuple[float, List[int]]:
+        """Best block order on one line: exact for few blocks, else 2-opt."""
+
+        members = sorted(classes)
+        if not members:
+            return 0.0, []
+        cost = problem.transition
+        if len(members) <= 6:
+            totals, orders = self._held_karp(problem, init, members)
+            full = (1 << len(members)) - 1
+            return totals[full], [members[pos] for pos in orders[full]]
+
+        order: List[int] = []
+        pending = set(members)
+        current = init
+        while pending:
+            nxt = min(pending, key=lambda cls: cost[current][cls])
+            order.append(nxt)
+            pending.discard(nxt)
+            current = nxt
+
+        def path_cost(seq: List[int]) -> float:
+            total, prev = 0.0, init
+            for cls in seq:
+                total += cost[prev][cls]
+                prev = cls
+            return total
+
+        best = path_cost(order)
+        improved = True
+        while improved:
+            improved = False
+            for i in range(len(order) - 1):
+                for j in range(i + 1, len(order)):
+                    trial = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                    value = path_cost(trial)
+                    if value < best - 1e-9:
+                        order, best, improved = trial, value, True
+        return best, order
+
+    # ----------------------------------------------------------------- report
+    def _plan(
+        self,
+        problem: _Problem,
+        assignment: List[List[int]],
+        method: str,
+        optimal: bool,
+        started: float,
+        iterations: int,
+        notes: List[str],
+    ) -> SequencePlan:
+        sanitation, switches = 0.0, 0
+        # Runs left off every line count as overflow.
+        placed = {run for runs in assignment for run in runs}
+        overflow = sum(
+            duration
+            for run, duration in enumerate(problem.durations)
+            if run not in placed
+        )
+        lines: Dict[str, List[str]] = {}
+        allergens: Dict[str, List[Optional[str]]] = {}
+        minutes: Dict[str, float] = {}
+        for line, runs in enumerate(assignment):
+            line_id = problem.line_ids[line]
+            previous = problem.line_init[line]
+            sequence: List[Optional[str]] = []
+            for run in runs:
+                cls = problem.run_class[run]
+                if cls != previous:
+                    sanitation += problem.sanitation[previous][cls]
+                    switches += problem.switches[previous][cls]
+                if not sequence or cls != previous:
+                    sequence.append(problem.classes[cls])
+                previous = cls
+            load = sum(problem.durations[run] for run in runs)
+            overflow += max(0.0, load - problem.capacity[line])
+            lines[line_id] = [problem.run_ids[run] for run in runs]
+            allergens[line_id] = sequence
+            minutes[line_id] = load
+        objective = (
+            sanitation
+            + switches * self.switch_penalty_minutes
+            + overflow * self.overflow_penalty
+        )
+        return SequencePlan(
+            lines=lines,
+            line_allergens=allergens,
+            line_minutes=minutes,
+            sanitation_minutes=sanitation,
+            dedicated_switches=switches,
+            overflow_minutes=overflow,
+            objective=objective,
+            method=method,
+            optimal=optimal,
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+            iterations=iterations,
+            notes=notes,
+        )
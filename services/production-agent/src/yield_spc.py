@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+Key = Tuple[str, str]
+
+
+@dataclass(slots=True)
+class YieldStats:
+    """Running SPC state for one SKU on one process step."""
+
+    sku: str
+    process: str
+    golden_yield: float
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    ewma: float = 0.0
+    cusum_low: float = 0.0
+    last_yield: float = 0.0
+    drifting: bool = False
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def gap(self) -> float:
+        """Smoothed yield minus golden yield (negative means losing yield)."""
+
+        return self.ewma - self.golden_yield
+
+
+class YieldSPCMonitor:
+    """Streaming golden-batch control charts keyed by ``(sku, process)``.
+
+    Each batch result updates Welford mean/variance, an EWMA of yield and a
+    lower one-sided CUSUM against ``golden_yield`` in O(1). A key is flagged
+    when the EWMA sits more than ``gap_threshold`` below golden or the CUSUM
+    crosses ``cusum_limit``; flagged keys live in an index so listing every
+    drifting SKU never scans the healthy ones. ``observe_batches`` remembers
+    batch ids so a batch replayed in a later feed is counted once. Updates
+    and reads are serialised by a lock; planning runs on a thread pool.
+    """
+
+    def __init__(
+        self,
+        gap_threshold: float = 0.02,
+        ewma_lambda: float = 0.2,
+        cusum_slack: float = 0.005,
+        cusum_limit: float = 0.05,
+    ) -> None:
+        if not 0 < ewma_lambda <= 1:
+            raise ValueError("ewma_lambda must be in (0, 1]")
+        self.gap_threshold = gap_threshold
+        self.ewma_lambda = ewma_lambda
+        self.cusum_slack = cusum_slack
+        self.cusum_limit = cusum_limit
+        self._stats: Dict[Key, YieldStats] = {}
+        self._drifting: Dict[Key, YieldStats] = {}
+        self._batches: Set[Hashable] = set()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def observe(
+        self,
+        sku: str,
+        process: str,
+        actual_yield: float,
+        golden_yield: Optional[float] = None,
+    ) -> YieldStats:
+        with self._lock:
+            return self._observe(sku, process, actual_yield, golden_yield)
+
+    def _observe(
+        self,
+        sku: str,
+        process: str,
+        actual_yield: float,
+        golden_yield: Optional[float],
+    ) -> YieldStats:
+        key = (sku, process)
+        stats = self._stats.get(key)
+        if stats is None:
+            if golden_yield is None:
+                raise KeyError(f"No golden yield for {sku}/{process}")
+            stats = YieldStats(sku, process, float(golden_yield))
+            self._stats[key] = stats
+        elif golden_yield is not None:
+            stats.golden_yield = float(golden_yield)
+
+        value = float(actual_yield)
+        stats.count += 1
+        delta = value - stats.mean
+        stats.mean += delta / stats.count
+        stats.m2 += delta * (value - stats.mean)
+        if stats.count == 1:
+            stats.ewma = value
+        else:
+            stats.ewma += self.ewma_lambda * (value - stats.ewma)
+        stats.cusum_low = max(
+            0.0,
+            stats.cusum_low + (stats.golden_yield - value) - self.cusum_slack,
+        )
+        stats.last_yield = value
+
+        stats.drifting = (
+            stats.gap < -self.gap_threshold
+            or stats.cusum_low > self.cusum_limit
+        )
+        if stats.drifting:
+            self._drifting[key] = stats
+        else:
+            self._drifting.pop(key, None)
+        return stats
+
+    def observe_many(
+        self,
+        skus: Iterable[str],
+        processes: Iterable[str],
+        actual_yields: Iterable[float],
+        golden_yields: Iterable[float],
+    ) -> None:
+        with self._lock:
+            for sku, process, actual, golden in zip(
+                skus, processes, actual_yields, golden_yields
+            ):
+                self._observe(sku, process, actual, golden)
+
+    def observe_batches(
+        self,
+        batch_ids: Iterable[Hashable],
+        skus: Iterable[str],
+        processes: Iterable[str],
+        actual_yields: Iterable[float],
+        golden_yields: Iterable[float],
+    ) -> int:
+        """Observe only batches not seen before; returns how many were new."""
+
+        added = 0
+        with self._lock:
+            for batch_id, sku, process, actual, golden in zip(
+                batch_ids, skus, processes, actual_yields, golden_yields
+            ):
+                if batch_id in self._batches:
+                    continue
+                self._batches.add(batch_id)
+                self._observe(sku, process, actual, golden)
+                added += 1
+        return added
+
+    def stats(self, sku: str, process: str) -> Optional[YieldStats]:
+        with self._lock:
+            return self._stats.get((sku, process))
+
+    def reset(self, sku: str, process: str) -> None:
+        """Restart the charts after a corrective action."""
+
+        key = (sku, process)
+        with self._lock:
+            self._drifting.pop(key, None)
+            stats = self._stats.get(key)
+            if stats is not None:
+                self._stats[key] = YieldStats(
+                    sku, process, stats.golden_yield
+                )
+
+    def drifting(self) -> List[YieldStats]:
+        """Snapshots of every flagged key, worst smoothed gap first."""
+
+        with self._lock:
+            flagged = [replace(stats) for stats in self._drifting.values()]
+        return sorted(flagged, key=lambda stats: stats.gap)
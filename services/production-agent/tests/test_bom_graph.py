@@ -0,0 +1,55 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from bom_optimizer import (  # noqa: E402
+    BOMComponent,
+    BOMCycleError,
+    BOMGraph,
+    BOMNotFoundError,
+    BOMRevision,
+)
+
+
+def recipe(item, *codes, revision="A", yield_pct=1.0):
+    return BOMRevision(
+        item,
+        revision,
+        [BOMComponent(code, code, 2.0, "kg") for code in codes],
+        yield_pct=yield_pct,
+    )
+
+
+def test_unregistered_item_raises_descriptive_error():
+    graph = BOMGraph()
+    graph.register(recipe("bread", "dough"))
+    assert graph.explode("bread", 3) == {"dough": 6.0}
+    with pytest.raises(BOMNotFoundError, match="cake"):
+        graph.explode("cake", 1)
+
+
+@pytest.mark.parametrize("yield_pct", [0.0, -0.5, 1.5, float("nan")])
+def test_register_rejects_bad_yield(yield_pct):
+    graph = BOMGraph()
+    with pytest.raises(ValueError, match="yield_pct"):
+        graph.register(recipe("bread", "dough", yield_pct=yield_pct))
+    assert "bread" not in graph
+
+
+def test_register_rejects_cycles_before_storing():
+    graph = BOMGraph()
+    graph.register(recipe("bread", "dough"))
+    graph.register(recipe("dough", "flour"))
+    with pytest.raises(BOMCycleError) as info:
+        graph.register(recipe("flour", "bread", revision="B"))
+    assert info.value.path == ["flour", "bread", "dough", "flour"]
+    assert "flour" not in graph
+    with pytest.raises(BOMCycleError):
+        graph.register(recipe("dough", "dough", revision="B"))
+    assert graph.revision("dough").revision == "A"
+    assert graph.unit_requirements("bread") == {"flour": 4.0}
@@ -0,0 +1,75 @@
+from datetime import date
+from pathlib import Path
+import asyncio
+import sys
+
+import pandas as pd
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from bom_optimizer import (  # noqa: E402
+    BOMComponent,
+    ProductionBOMOptimizer,
+    ProductionOrder,
+)
+
+
+def yields(*rows):
+    return pd.DataFrame(
+        rows, columns=["sku", "process", "actual_yield", "golden_yield"]
+    )
+
+
+def plan(optimizer, yield_df):
+    return asyncio.run(
+        optimizer.orchestrate_plan(
+            ProductionOrder("SKU1", 100, 500, date(2024, 1, 2)),
+            [BOMComponent("flour", "Flour", 10, "kg")],
+            pd.DataFrame({"code": ["flour"], "qty": [2000.0]}),
+            pd.DataFrame(
+                {
+                    "date": ["2024-01-02"],
+                    "line": ["L1"],
+                    "available_hours": [8.0],
+                    "max_batch": [400.0],
+                }
+            ),
+            yield_df,
+            [],
+        )
+    )
+
+
+def test_overlapping_frames_count_each_batch_once():
+    optimizer = ProductionBOMOptimizer()
+    first = yields(("SKU1", "dough", 0.70, 0.95))
+    grown = yields(
+        ("SKU1", "dough", 0.70, 0.95), ("SKU1", "dough", 0.60, 0.95)
+    )
+    counts = []
+    for frame in (first, grown, first, grown.copy()):
+        plan(optimizer, frame)
+        counts.append(optimizer.yield_monitor.stats("SKU1", "dough").count)
+    optimizer.close()
+    assert counts == [1, 2, 2, 2]
+
+
+def test_batch_ids_identify_replayed_batches():
+    optimizer = ProductionBOMOptimizer()
+    frame = yields(
+        ("SKU1", "dough", 0.90, 0.95), ("SKU2", "proof", 0.96, 0.95)
+    ).assign(batch_id=["B1", "B2"])
+    assert optimizer.record_yields(frame) == 2
+    assert optimizer.record_yields(frame.iloc[::-1]) == 0
+    assert optimizer.yield_monitor.stats("SKU1", "dough").count == 1
+
+
+def test_plan_flags_rows_of_the_supplied_frame():
+    optimizer = ProductionBOMOptimizer()
+    plan(optimizer, yields(("SKU1", "dough", 0.60, 0.95)))
+    result = plan(optimizer, yields(("SKU2", "proof", 0.80, 0.95)))
+    optimizer.close()
+    assert [row["sku"] for row in result["yield"]] == ["SKU2"]
+    assert {row["sku"] for row in result["yield_drift"]} == {"SKU1", "SKU2"}